@@ -1,20 +1,21 @@
 """Question Answering agent for RAG pipeline."""
 
+import asyncio
+import hashlib
 import logging
-import sys
-from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
 
-# Ensure app directory is in path
-_app_path = str(Path(__file__).parent.parent.absolute())
-if _app_path not in sys.path:
-    sys.path.insert(0, _app_path)
-
-from services.retriever import retrieve_context, index_documents, search_similar, get_store_stats
-from services.llm_service import generate_answer, rephrase_question
+from services.retriever import retrieve_context_parts, aretrieve_context_parts, aindex_documents, search_similar, get_store_stats
+from services.llm_service import generate_answer, agenerate_answer, rephrase_question, arephrase_question, stream_answer
 
 logger = logging.getLogger(__name__)
 
+# BLAKE3 hashes whole documents with SIMD across chunks; blake2b otherwise
+try:
+    from blake3 import blake3  # type: ignore
+except ImportError:
+    blake3 = None
+
 
 def answer_question(question: str, k: int = 5, use_rephrasing: bool = False) -> str:
     """
@@ -36,7 +37,7 @@ def answer_question(question: str, k: int = 5, use_rephrasing: bool = False) ->
             logger.info(f"Rephrased question: {search_query}")
         
         # Retrieve relevant context
-        context = retrieve_context(search_query, k=k)
+        context = retrieve_context_parts(search_query, k=k)
         logger.info(f"Retrieved context for question: {question}")
         
         # Generate answer based on context
@@ -49,6 +50,94 @@ def answer_question(question: str, k: int = 5, use_rephrasing: bool = False) ->
         return f"Error processing question: {str(e)}"
 
 
+def stream_answer_question(question: str, k: int = 5, use_rephrasing: bool = False) -> Iterator[str]:
+    """
+    Answer a question using RAG, yielding the answer as it is generated.
+    
+    Args:
+        question: User's question
+        k: Number of documents to retrieve
+        use_rephrasing: Whether to rephrase the question for better retrieval
+        
+    Yields:
+        Chunks of the generated answer
+    """
+    try:
+        search_query = question
+        if use_rephrasing:
+            search_query = rephrase_question(question)
+            logger.info(f"Rephrased question: {search_query}")
+        
+        context = retrieve_context_parts(search_query, k=k)
+        logger.info(f"Retrieved context for question: {question}")
+        
+        yield from stream_answer(question, context)
+        
+    except Exception as e:
+        logger.error(f"Error answering question: {str(e)}")
+        yield f"Error processing question: {str(e)}"
+
+
+# Upper bound on questions answered concurrently, to respect API rate limits
+BATCH_CONCURRENCY = 16
+
+
+async def a_answer_question(question: str, k: int = 5, use_rephrasing: bool = False) -> str:
+    """
+    Answer a question without blocking the event loop.
+    
+    Retrieval goes through the shared query collapser, so concurrent calls
+    share embedding requests and vector searches.
+    
+    Args:
+        question: User's question
+        k: Number of documents to retrieve
+        use_rephrasing: Whether to rephrase the question for better retrieval
+        
+    Returns:
+        Generated answer
+    """
+    try:
+        search_query = question
+        if use_rephrasing:
+            search_query = await arephrase_question(question)
+            logger.info(f"Rephrased question: {search_query}")
+        
+        context = await aretrieve_context_parts(search_query, k=k)
+        logger.info(f"Retrieved context for question: {question}")
+        
+        return await agenerate_answer(question, context)
+        
+    except Exception as e:
+        logger.error(f"Error answering question: {str(e)}")
+        return f"Error processing question: {str(e)}"
+
+
+async def abatch_answer_questions(questions: list[str], k: int = 5, concurrency: int = BATCH_CONCURRENCY) -> list[dict]:
+    """
+    Answer multiple questions concurrently.
+    
+    Args:
+        questions: List of questions
+        k: Number of documents to retrieve per question
+        concurrency: Maximum number of questions in flight at once
+        
+    Returns:
+        List of dicts with question and answer, in input order
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _answer(question: str) -> dict:
+        async with semaphore:
+            answer = await a_answer_question(question, k=k)
+        return {
+            "question": question,
+            "answer": answer
+        }
+
+    return list(await asyncio.gather(*[_answer(q) for q in questions]))
+
+
 def batch_answer_questions(questions: list[str], k: int = 5) -> list[dict]:
     """
     Answer multiple questions in batch.
@@ -60,20 +149,60 @@ def batch_answer_questions(questions: list[str], k: int = 5) -> list[dict]:
     Returns:
         List of dicts with question and answer
     """
-    results = []
-    for question in questions:
-        answer = answer_question(question, k=k)
-        results.append({
-            "question": question,
-            "answer": answer
-        })
-    return results
+    return asyncio.run(abatch_answer_questions(questions, k=k))
+
+
+def _content_hash(text: str) -> bytes:
+    """Hash a document's whitespace-normalized text."""
+    normalized = " ".join(text.split()).encode("utf-8")
+    if blake3 is not None:
+        return blake3(normalized).digest(length=16)
+    return hashlib.blake2b(normalized, digest_size=16).digest()
+
+
+def _deduplicate(documents: list[str], metadata: list[dict] = None) -> tuple[list[str], Optional[list[dict]]]:
+    """
+    Drop documents whose normalized content was already seen in the batch.
+    
+    Args:
+        documents: List of documents
+        metadata: Optional metadata aligned with documents
+        
+    Returns:
+        Tuple of (unique_documents, metadata_for_unique_documents)
+    """
+    seen: dict[bytes, int] = {}
+    unique_docs = []
+    unique_metadata = [] if metadata else None
+    for i, doc in enumerate(documents):
+        key = _content_hash(doc)
+        if key in seen:
+            continue
+        seen[key] = i
+        unique_docs.append(doc)
+        if unique_metadata is not None:
+            unique_metadata.append(metadata[i] if i < len(metadata) else {})
+    return unique_docs, unique_metadata
 
 
 def index_knowledge_base(documents: list[str], metadata: list[dict] = None) -> dict:
     """
     Index documents into the knowledge base.
     
+    Args:
+        documents: List of documents to index
+        metadata: Optional metadata for documents
+        
+    Returns:
+        Indexing result with count
+    """
+    return asyncio.run(aindex_knowledge_base(documents, metadata))
+
+
+async def aindex_knowledge_base(documents: list[str], metadata: list[dict] = None) -> dict:
+    """
+    Index documents into the knowledge base, embedding batches concurrently.
+    
     Args:
         documents: List of documents to index
         metadata: Optional metadata for documents
@@ -82,9 +211,13 @@ def index_knowledge_base(documents: list[str], metadata: list[dict] = None) -> d
         Indexing result with count
     """
     try:
-        count = index_documents(documents, metadata)
+        unique_docs, unique_metadata = _deduplicate(documents, metadata)
+        skipped = len(documents) - len(unique_docs)
+        if skipped:
+            logger.info(f"Skipped {skipped} duplicate documents")
+        count = await aindex_documents(unique_docs, unique_metadata) if unique_docs else 0
         logger.info(f"Indexed {count} documents")
-        return {"status": "success", "indexed_count": count}
+        return {"status": "success", "indexed_count": count, "skipped_duplicates": skipped}
     except Exception as e:
         logger.error(f"Error indexing documents: {str(e)}")
         return {"status": "error", "message": str(e)}
@@ -1,17 +1,23 @@
-from fastapi import FastAPI, HTTPException, File, UploadFile
+import os
+
+# Requests are served concurrently, so keep OpenMP (FAISS, BLAS) to one thread
+# per call instead of every request fanning out over all cores. Must be set
+# before numpy/faiss are first imported; an explicit OMP_NUM_THREADS wins
+os.environ.setdefault("OMP_NUM_THREADS", "1")
+
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, File, UploadFile, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import Iterable, Iterator, List, Optional, Dict, Any, Tuple
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
 import logging
-import os
-import sys
+import uuid
+from collections import OrderedDict
 from pathlib import Path
-import tempfile
-import shutil
-
-# Ensure app directory is in path for imports
-app_dir = Path(__file__).parent.parent
-if str(app_dir) not in sys.path:
-    sys.path.insert(0, str(app_dir))
+import orjson
+from datetime import date
 
 # Load environment first
 try:
@@ -21,22 +27,63 @@ try:
 except ImportError:
     pass
 
-from agents.qa_agent import answer_question, index_knowledge_base, search_knowledge_base, get_qa_stats
-from services.retriever import get_vector_store
+from agents.qa_agent import answer_question, stream_answer_question, index_knowledge_base, aindex_knowledge_base, search_knowledge_base, get_qa_stats
+from services.retriever import clear_store as clear_vector_store
+from services.llm_service import _get_demo_answer
+from services import redis_cache
+from services.llm_cache import get_llm_cache
+
+# Document parsing is optional; uploads fall back to plain-text decoding without it
+try:
+    from frontend_streamlit.document_processor import DocumentProcessor
+except Exception:
+    DocumentProcessor = None
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Connect to the shared Redis cache at startup and stop parse workers on shutdown."""
+    if redis_cache.REDIS_CACHE_ENABLED:
+        if redis_cache.ping():
+            logger.info("Connected to Redis cache")
+        else:
+            logger.warning("Redis cache enabled but unreachable; continuing without it")
+    yield
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+
+
 app = FastAPI(
     title="Enterprise LLMOps RAG API",
     description="Production-ready RAG API with vector search and LLM-based QA",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Configuration
 USE_DEMO_MODE = os.getenv("USE_DEMO_MODE", "true").lower() == "true"
-TEMP_UPLOAD_DIR = Path(tempfile.gettempdir()) / "rag_uploads"
-TEMP_UPLOAD_DIR.mkdir(exist_ok=True)
+# Document parsing is CPU-bound, so it runs in worker processes
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+_process_pool: Optional[ProcessPoolExecutor] = None
+# Characters of document text returned per search result unless include_full is set
+SNIPPET_CHARS = 800
+
+
+# Formatted date for the demo /ask context, recomputed only when the day changes
+_TODAY_CACHE = {"date": None, "str": ""}
+
+
+def _today_str() -> str:
+    """Return today's date formatted like 'February 13, 2026'."""
+    today = date.today()
+    if _TODAY_CACHE["date"] != today:
+        _TODAY_CACHE["str"] = today.strftime('%B %d, %Y')
+        _TODAY_CACHE["date"] = today
+    return _TODAY_CACHE["str"]
 
 
 class AskRequest(BaseModel):
@@ -70,7 +117,12 @@ def health():
 def stats():
     """Get vector store statistics."""
     try:
-        return get_qa_stats()
+        llm_cache = get_llm_cache()
+        return {
+            **get_qa_stats(),
+            "cache": redis_cache.get_cache_stats(),
+            "llm_cache": llm_cache.get_stats() if llm_cache is not None else {"enabled": False},
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -81,6 +133,7 @@ def index_docs(req: IndexRequest):
     try:
         result = index_knowledge_base(req.documents, req.metadata)
         if result["status"] == "success":
+            redis_cache.bump_store_version()
             return {
                 "status": "success",
                 "indexed": result["indexed_count"],
@@ -99,11 +152,8 @@ def ask(req: AskRequest):
     try:
         # In demo mode, use demo answers
         if USE_DEMO_MODE:
-            from services.llm_service import _get_demo_answer
-            from datetime import datetime
-            
             # Build context from the question itself for demo
-            context = f"Current date: {datetime.now().strftime('%B %d, %Y')}"
+            context = f"Current date: {_today_str()}"
             answer = _get_demo_answer(req.question, context)
             
             return {
@@ -112,25 +162,85 @@ def ask(req: AskRequest):
                 "mode": "demo"
             }
         else:
+            version = redis_cache.get_store_version()
+            cache_key = redis_cache.make_key("ask", version, req.question, req.k, req.use_rephrasing)
+            cached = redis_cache.get(cache_key) if version is not None else None
+            if cached is not None:
+                return orjson.loads(cached)
+
             answer = answer_question(
                 question=req.question,
                 k=req.k,
                 use_rephrasing=req.use_rephrasing
             )
-            return {
+            response = {
                 "question": req.question,
                 "answer": answer
             }
+            # Errors (e.g. an OpenAI outage) are not worth sharing across workers
+            if version is not None and not answer.startswith("Error "):
+                redis_cache.put(cache_key, orjson.dumps(response), redis_cache.ASK_TTL_SECONDS)
+            return response
     except Exception as e:
         logger.error(f"Error answering question: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _sse_frames(chunks: Iterable[str]) -> Iterator[bytes]:
+    """Wrap text chunks as server-sent events, ending with a [DONE] frame."""
+    for chunk in chunks:
+        # JSON-encode so newlines inside a chunk cannot break the frame
+        yield b"data: " + orjson.dumps(chunk) + b"\n\n"
+    yield b"data: [DONE]\n\n"
+
+
+@app.post("/ask/stream")
+def ask_stream(req: AskRequest, request: Request):
+    """
+    Answer a question using RAG, streaming the answer as it is generated.
+
+    Plain text chunks by default; clients sending ``Accept: text/event-stream``
+    get server-sent events with one JSON string per token batch.
+    """
+    if USE_DEMO_MODE:
+        context = f"Current date: {_today_str()}"
+        chunks = iter([_get_demo_answer(req.question, context)])
+    else:
+        chunks = stream_answer_question(
+            question=req.question,
+            k=req.k,
+            use_rephrasing=req.use_rephrasing
+        )
+    headers = {"X-RAG-Mode": "demo" if USE_DEMO_MODE else "production"}
+    if "text/event-stream" in request.headers.get("accept", ""):
+        return StreamingResponse(
+            _sse_frames(chunks),
+            media_type="text/event-stream",
+            headers={**headers, "Cache-Control": "no-cache"}
+        )
+    return StreamingResponse(
+        chunks,
+        media_type="text/plain; charset=utf-8",
+        headers=headers
+    )
+
+
+def _with_snippets(results: List[dict], include_full: bool = False) -> List[dict]:
+    """Add a truncated ``snippet`` to each result, dropping the full text unless requested."""
+    trimmed = []
+    for result in results:
+        result = dict(result)
+        text = result.get("text", "") if include_full else result.pop("text", "")
+        result["snippet"] = text[:SNIPPET_CHARS]
+        trimmed.append(result)
+    return trimmed
+
+
 @app.post("/search")
-def search(req: SearchRequest):
+def search(req: SearchRequest, include_full: bool = False):
     """Search for similar documents."""
     try:
-        results = search_knowledge_base(req.query, k=req.k)
+        results = _with_snippets(search_knowledge_base(req.query, k=req.k), include_full)
         return {
             "query": req.query,
             "results": results,
@@ -145,14 +255,60 @@ def search(req: SearchRequest):
 def clear_store():
     """Clear all documents from the vector store."""
     try:
-        store = get_vector_store()
-        store.clear()
+        clear_vector_store()
+        redis_cache.bump_store_version()
         return {"status": "success", "message": "Vector store cleared"}
     except Exception as e:
         logger.error(f"Error clearing store: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _get_process_pool() -> ProcessPoolExecutor:
+    """Get or create the worker pool used for CPU-bound document parsing."""
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=PARSE_WORKERS)
+    return _process_pool
+
+
+async def _parse_upload(filename: str, content: bytes, content_type: Optional[str] = None) -> Tuple[List[str], List[dict]]:
+    """Extract chunks and metadata from one uploaded file's bytes without touching disk."""
+    try:
+        # Try to process with document processor; parsing runs in a worker process
+        if DocumentProcessor is not None:
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(
+                    _get_process_pool(), DocumentProcessor.process_bytes, content, filename
+                )
+            except Exception as e:
+                logger.warning(f"Could not process {filename} with DocumentProcessor: {str(e)}")
+        
+        # Fallback: just use file content as text
+        content_str = content.decode('utf-8', errors='ignore')
+        if content_str.strip():
+            return [content_str], [{
+                "filename": filename,
+                "file_size": len(content),
+                "type": content_type
+            }]
+        return [], []
+    
+    except Exception as e:
+        logger.error(f"Error processing file {filename}: {str(e)}")
+        return [], []
+
+
+async def _process_one(file: UploadFile) -> Tuple[List[str], List[dict]]:
+    """Read one uploaded file and extract its chunks and metadata."""
+    try:
+        content = await file.read()
+    except Exception as e:
+        logger.error(f"Error processing file {file.filename}: {str(e)}")
+        return [], []
+    return await _parse_upload(file.filename, content, file.content_type)
+
+
 @app.post("/upload_documents")
 async def upload_documents(files: List[UploadFile] = File(...)):
     """Upload and index documents from files."""
@@ -160,43 +316,15 @@ async def upload_documents(files: List[UploadFile] = File(...)):
         uploaded_docs = []
         uploaded_metadata = []
         
-        for file in files:
-            try:
-                # Save file temporarily
-                temp_path = TEMP_UPLOAD_DIR / file.filename
-                
-                with open(temp_path, "wb") as f:
-                    content = await file.read()
-                    f.write(content)
-                
-                # Try to process with document processor
-                try:
-                    from frontend_streamlit.document_processor import DocumentProcessor
-                    chunks, metadata = DocumentProcessor.process_file(str(temp_path))
-                    uploaded_docs.extend(chunks)
-                    uploaded_metadata.extend(metadata)
-                except Exception as e:
-                    # Fallback: just use file content as text
-                    logger.warning(f"Could not process {file.filename} with DocumentProcessor: {str(e)}")
-                    content_str = content.decode('utf-8', errors='ignore')
-                    if content_str.strip():
-                        uploaded_docs.append(content_str)
-                        uploaded_metadata.append({
-                            "filename": file.filename,
-                            "file_size": len(content),
-                            "type": file.content_type
-                        })
-                
-                # Clean up temp file
-                temp_path.unlink(missing_ok=True)
-                
-            except Exception as e:
-                logger.error(f"Error processing file {file.filename}: {str(e)}")
-                continue
+        # Process all files concurrently
+        for chunks, metadata in await asyncio.gather(*[_process_one(file) for file in files]):
+            uploaded_docs.extend(chunks)
+            uploaded_metadata.extend(metadata)
         
         # Index documents
         if uploaded_docs:
-            result = index_knowledge_base(uploaded_docs, uploaded_metadata)
+            result = await aindex_knowledge_base(uploaded_docs, uploaded_metadata)
+            redis_cache.bump_store_version()
             
             return {
                 "status": "success",
@@ -216,6 +344,74 @@ async def upload_documents(files: List[UploadFile] = File(...)):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Background upload jobs, most recent last; progress is kept per API worker process
+MAX_UPLOAD_JOBS = 100
+_upload_jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_upload_tasks: set = set()
+
+
+async def _run_upload_job(job_id: str, uploads: List[Tuple[str, bytes, Optional[str]]]) -> None:
+    """Parse and index uploaded files, recording progress on the job as each file finishes."""
+    job = _upload_jobs[job_id]
+    try:
+        uploaded_docs = []
+        uploaded_metadata = []
+        for parsed in asyncio.as_completed([_parse_upload(*upload) for upload in uploads]):
+            chunks, metadata = await parsed
+            uploaded_docs.extend(chunks)
+            uploaded_metadata.extend(metadata)
+            job["done"] += 1
+        
+        if uploaded_docs:
+            job["status"] = "indexing"
+            await aindex_knowledge_base(uploaded_docs, uploaded_metadata)
+            redis_cache.bump_store_version()
+            job.update({
+                "status": "complete",
+                "files_processed": len(uploads),
+                "chunks_created": len(uploaded_docs),
+                "message": f"Indexed {len(uploaded_docs)} document chunks from {len(uploads)} files"
+            })
+        else:
+            job.update({"status": "error", "message": "No valid documents found in uploaded files"})
+    except Exception as e:
+        logger.error(f"Error in upload job {job_id}: {str(e)}")
+        job.update({"status": "error", "message": str(e)})
+
+
+@app.post("/upload_documents/start")
+async def start_upload_job(files: List[UploadFile] = File(...)):
+    """Accept files and index them in the background; poll the returned job for progress."""
+    uploads = [(file.filename, await file.read(), file.content_type) for file in files]
+    job_id = uuid.uuid4().hex
+    _upload_jobs[job_id] = {
+        "job_id": job_id,
+        "status": "processing",
+        "done": 0,
+        "total": len(uploads),
+        "files_processed": 0,
+        "chunks_created": 0,
+        "message": ""
+    }
+    while len(_upload_jobs) > MAX_UPLOAD_JOBS:
+        _upload_jobs.popitem(last=False)
+    
+    # Keep a reference so the task is not garbage collected mid-run
+    task = asyncio.create_task(_run_upload_job(job_id, uploads))
+    _upload_tasks.add(task)
+    task.add_done_callback(_upload_tasks.discard)
+    return {"job_id": job_id, "total": len(uploads)}
+
+
+@app.get("/upload_documents/{job_id}/progress")
+def upload_job_progress(job_id: str):
+    """Report progress of a background upload job."""
+    job = _upload_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown upload job: {job_id}")
+    return job
+
+
 @app.get("/")
 def root():
     """Root endpoint with API info."""
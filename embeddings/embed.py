@@ -1,5 +1,12 @@
+import asyncio
+import base64
+import hashlib
+import logging
 import os
+import threading
 import numpy as np
+import orjson
+from collections import OrderedDict
 from typing import List, Union
 from pathlib import Path
 
@@ -12,99 +19,303 @@ try:
 except ImportError:
     pass
 
+logger = logging.getLogger(__name__)
+
 # Lazy load OpenAI client only when needed
 _client = None
+_client_lock = threading.Lock()
+
+# Pooled keep-alive HTTP session for the direct-HTTP fallback
+_http_session = None
+_http_session_lock = threading.Lock()
+HTTP_POOL_CONNECTIONS = 16
+HTTP_POOL_MAXSIZE = 32
+
+EMBEDDING_MODEL = "text-embedding-3-large"
+# OpenAI accepts up to 2048 inputs per embeddings request
+EMBEDDING_BATCH_SIZE = 2048
+OPENAI_EMBEDDINGS_URL = "https://api.openai.com/v1/embeddings"
+
+# Ask for raw little-endian fp32 buffers instead of JSON float arrays
+EMBEDDING_ENCODING_FORMAT = "base64"
+
+# In-process LRU cache for embed_text, keyed by a hash of model + text
+EMBED_CACHE_MAX_ENTRIES = 10_000
+_embed_cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+
+# Async path: smaller batches, several requests in flight at once
+ASYNC_EMBEDDING_BATCH_SIZE = 256
+ASYNC_EMBEDDING_CONCURRENCY = 8
+
+# Rate limits and server errors are retried with exponential backoff
+EMBED_MAX_RETRIES = 3
+EMBED_RETRY_BACKOFF = 0.5
+TRANSIENT_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def is_transient_error(error: Exception) -> bool:
+    """Whether an embedding error is a rate limit or server error worth retrying."""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status in TRANSIENT_STATUS_CODES
 
 
 def _get_client():
     """Get or initialize OpenAI client."""
     global _client
     if _client is None:
-        from openai import OpenAI
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError(
-                "OPENAI_API_KEY environment variable not set. "
-                "Please set your OpenAI API key to use embedding functions."
-            )
-        _client = OpenAI(api_key=api_key)
+        # Double-checked so concurrent first calls build a single client
+        with _client_lock:
+            if _client is None:
+                from openai import OpenAI
+                api_key = os.getenv("OPENAI_API_KEY")
+                if not api_key:
+                    raise ValueError(
+                        "OPENAI_API_KEY environment variable not set. "
+                        "Please set your OpenAI API key to use embedding functions."
+                    )
+                _client = OpenAI(api_key=api_key)
     return _client
 
 
-def _fallback_embedding(texts, model="text-embedding-3-large"):
+def _get_http_session():
+    """Get or initialize the pooled requests session used by the fallback path."""
+    global _http_session
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                session.mount("https://", HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE))
+                _http_session = session
+    return _http_session
+
+
+def _cache_key(text: str, model: str = EMBEDDING_MODEL) -> bytes:
+    """Build the embedding cache key for a text."""
+    return hashlib.blake2b(f"{model}\0{text}".encode("utf-8"), digest_size=16).digest()
+
+
+def _cache_get(key: bytes):
+    """Return a copy of a cached embedding, or None on a miss."""
+    vec = _embed_cache.get(key)
+    if vec is None:
+        return None
+    _embed_cache.move_to_end(key)
+    return vec.copy()
+
+
+def _cache_put(key: bytes, vec: np.ndarray) -> None:
+    """Store an embedding, evicting the least recently used entry when full."""
+    _embed_cache[key] = vec.copy()
+    _embed_cache.move_to_end(key)
+    while len(_embed_cache) > EMBED_CACHE_MAX_ENTRIES:
+        _embed_cache.popitem(last=False)
+
+
+def clear_embedding_cache() -> None:
+    """Drop all cached embeddings."""
+    _embed_cache.clear()
+
+
+def _decode_embedding(embedding) -> np.ndarray:
+    """Decode an API embedding that is either a base64 fp32 buffer or a list of floats."""
+    if isinstance(embedding, str):
+        return np.frombuffer(base64.b64decode(embedding), dtype=np.float32)
+    return np.asarray(embedding, dtype=np.float32)
+
+
+def _fallback_embedding(texts, model=EMBEDDING_MODEL):
     """
     Fallback to direct HTTP call to OpenAI embeddings endpoint.
     """
-    import requests
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         raise ValueError("OPENAI_API_KEY environment variable not set for fallback embedding call.")
-    url = "https://api.openai.com/v1/embeddings"
+    session = _get_http_session()
+    url = OPENAI_EMBEDDINGS_URL
     headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+    # Bodies are serialized straight to UTF-8 bytes by orjson: no intermediate
+    # str to re-encode, and non-ASCII text is not expanded to \u escapes
     # Accept either single string or list
     if isinstance(texts, str):
-        payload = {"model": model, "input": texts}
-        resp = requests.post(url, headers=headers, json=payload, timeout=30)
+        payload = {"model": model, "input": texts, "encoding_format": EMBEDDING_ENCODING_FORMAT}
+        resp = session.post(url, headers=headers, data=orjson.dumps(payload), timeout=30)
         resp.raise_for_status()
-        data = resp.json()
-        return data["data"][0]["embedding"]
+        data = orjson.loads(resp.content)
+        return _decode_embedding(data["data"][0]["embedding"])
     else:
-        payload = {"model": model, "input": texts}
-        resp = requests.post(url, headers=headers, json=payload, timeout=30)
-        resp.raise_for_status()
-        data = resp.json()
-        return [item["embedding"] for item in data.get("data", [])]
+        vectors = []
+        for start in range(0, len(texts), EMBEDDING_BATCH_SIZE):
+            payload = {
+                "model": model,
+                "input": texts[start:start + EMBEDDING_BATCH_SIZE],
+                "encoding_format": EMBEDDING_ENCODING_FORMAT,
+            }
+            resp = session.post(url, headers=headers, data=orjson.dumps(payload), timeout=30)
+            resp.raise_for_status()
+            data = orjson.loads(resp.content).get("data", [])
+            # Results carry their input position; restore request order
+            data = sorted(enumerate(data), key=lambda pair: pair[1].get("index", pair[0]))
+            vectors.extend(_decode_embedding(item["embedding"]) for _, item in data)
+        return vectors
 
 
 def embed_text(text: str) -> np.ndarray:
     """
     Embed a single text string.
     
+    Results are kept in an in-process LRU cache and, when enabled, in the
+    shared Redis cache, so repeated texts do not hit the API again.
+    
     Args:
         text: Text to embed
         
     Returns:
-        Embedding vector as numpy array
+        Embedding vector as float32 numpy array
     """
+    key = _cache_key(text)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+
+    from services import redis_cache
+    redis_key = f"embed:{key.hex()}"
+    shared = redis_cache.get(redis_key)
+    if shared is not None:
+        vec = np.frombuffer(shared, dtype=np.float32)
+        _cache_put(key, vec)
+        return vec.copy()
+
     try:
         client = _get_client()
-        resp = client.embeddings.create(model="text-embedding-3-large", input=text)
-        return np.array(resp.data[0].embedding)
+        resp = client.embeddings.create(
+            model=EMBEDDING_MODEL, input=text, encoding_format=EMBEDDING_ENCODING_FORMAT
+        )
+        vec = _decode_embedding(resp.data[0].embedding)
     except Exception as e:
         msg = str(e)
         if isinstance(e, TypeError) or "proxies" in msg.lower():
-            emb = _fallback_embedding(text)
-            return np.array(emb)
-        raise
+            vec = np.asarray(_fallback_embedding(text), dtype=np.float32)
+        else:
+            raise
 
+    _cache_put(key, vec)
+    redis_cache.put(redis_key, vec.tobytes(), redis_cache.EMBED_TTL_SECONDS)
+    return vec.copy()
 
-def embed_texts(texts: Union[List[str], str]) -> np.ndarray:
+
+def embed_texts(texts: Union[List[str], str], model: str = EMBEDDING_MODEL) -> np.ndarray:
     """
     Embed one or more texts.
     
+    Texts are sent to the API in batches of up to ``EMBEDDING_BATCH_SIZE``
+    inputs per request rather than one request per text.
+    
     Args:
         texts: Single text string or list of texts
+        model: Embedding model name
         
     Returns:
-        Embedding vector(s) as numpy array of shape (n, embedding_dim)
+        Embedding vector(s) as float32 numpy array of shape (n, embedding_dim)
     """
+    # Handle single string
+    if isinstance(texts, str):
+        texts = [texts]
+    texts = list(texts)
+
     try:
         client = _get_client()
-        # Handle single string
-        if isinstance(texts, str):
-            texts = [texts]
 
-        vectors = []
-        for text in texts:
-            resp = client.embeddings.create(model="text-embedding-3-large", input=text)
-            vectors.append(resp.data[0].embedding)
+        # Output matrix is allocated once the first response reveals the dimension
+        out = None
+        for start in range(0, len(texts), EMBEDDING_BATCH_SIZE):
+            batch = texts[start:start + EMBEDDING_BATCH_SIZE]
+            resp = client.embeddings.create(
+                model=model, input=batch, encoding_format=EMBEDDING_ENCODING_FORMAT
+            )
+            for d in resp.data:
+                vec = _decode_embedding(d.embedding)
+                if out is None:
+                    out = np.empty((len(texts), vec.shape[0]), dtype=np.float32)
+                out[start + d.index] = vec
 
-        return np.array(vectors)
+        return out if out is not None else np.empty((0,), dtype=np.float32)
     except Exception as e:
         msg = str(e)
         if isinstance(e, TypeError) or "proxies" in msg.lower():
-            emb = _fallback_embedding(texts)
-            return np.array(emb)
+            emb = _fallback_embedding(texts, model=model)
+            return np.asarray(emb, dtype=np.float32)
         raise
 
 
+async def aembed_texts(
+    texts: Union[List[str], str],
+    model: str = EMBEDDING_MODEL,
+    batch_size: int = ASYNC_EMBEDDING_BATCH_SIZE,
+    concurrency: int = ASYNC_EMBEDDING_CONCURRENCY,
+) -> np.ndarray:
+    """
+    Embed one or more texts with concurrent batched HTTP requests.
+    
+    Texts are split into batches of ``batch_size`` and up to ``concurrency``
+    batches are in flight at once. Output order matches input order.
+    
+    Args:
+        texts: Single text string or list of texts
+        model: Embedding model name
+        batch_size: Number of inputs per request
+        concurrency: Maximum number of concurrent requests
+        
+    Returns:
+        Embedding vector(s) as float32 numpy array of shape (n, embedding_dim)
+    """
+    import httpx
+
+    if isinstance(texts, str):
+        texts = [texts]
+    texts = list(texts)
+
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY environment variable not set for async embedding call.")
+    headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _embed_batch(http, batch):
+        payload = orjson.dumps({"model": model, "input": batch, "encoding_format": EMBEDDING_ENCODING_FORMAT})
+        for attempt in range(EMBED_MAX_RETRIES + 1):
+            try:
+                async with semaphore:
+                    resp = await http.post(OPENAI_EMBEDDINGS_URL, headers=headers, content=payload)
+                    resp.raise_for_status()
+                    data = orjson.loads(resp.content).get("data", [])
+                break
+            except Exception as e:
+                if attempt == EMBED_MAX_RETRIES or not is_transient_error(e):
+                    raise
+                # Back off outside the semaphore so other batches keep their slots
+                delay = EMBED_RETRY_BACKOFF * (2 ** attempt)
+                logger.warning(f"Embedding request failed ({str(e)}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+        data = sorted(enumerate(data), key=lambda pair: pair[1].get("index", pair[0]))
+        return [_decode_embedding(item["embedding"]) for _, item in data]
+
+    async with httpx.AsyncClient(timeout=30) as http:
+        batches = await asyncio.gather(*[
+            _embed_batch(http, texts[start:start + batch_size])
+            for start in range(0, len(texts), batch_size)
+        ])
+
+    if not texts:
+        return np.empty((0,), dtype=np.float32)
+    out = np.empty((len(texts), batches[0][0].shape[0]), dtype=np.float32)
+    row = 0
+    for batch in batches:
+        for vec in batch:
+            out[row] = vec
+            row += 1
+    return out
@@ -0,0 +1,84 @@
+"""Vectorized similarity search kernels for embedding matrices."""
+
+import numpy as np
+
+# SimSIMD provides SIMD distance kernels; fall back to BLAS via numpy
+try:
+    import simsimd  # type: ignore
+    SIMSIMD_AVAILABLE = True
+except ImportError:
+    SIMSIMD_AVAILABLE = False
+
+# Numba compiles an int8 L2 scan for when simsimd is missing
+try:
+    from numba import njit, prange  # type: ignore
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+def sqeuclidean_distances(q: np.ndarray, mat: np.ndarray) -> np.ndarray:
+    """
+    Exact squared L2 distance between one query vector and every row of a matrix.
+    
+    Args:
+        q: Query vector of shape (dim,)
+        mat: Matrix of shape (n, dim)
+        
+    Returns:
+        Squared distances of shape (n,)
+    """
+    q = np.ascontiguousarray(q, dtype=np.float32).reshape(-1)
+    mat = np.ascontiguousarray(mat, dtype=np.float32)
+    if SIMSIMD_AVAILABLE:
+        return np.asarray(simsimd.cdist(q[None, :], mat, metric="sqeuclidean"), dtype=np.float32)[0]
+    diff = mat - q
+    return np.einsum("ij,ij->i", diff, diff)
+
+
+# Rows upcast at a time when scoring quantized matrices without simsimd
+QUANTIZED_BLOCK_ROWS = 16384
+# Smallest matrix worth handing to the compiled int8 kernel
+NUMBA_MIN_ROWS = 4096
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _int8_sqeuclidean(codes, q, out):  # pragma: no cover - compiled
+        for i in prange(codes.shape[0]):
+            acc = 0
+            for j in range(codes.shape[1]):
+                d = np.int32(codes[i, j]) - np.int32(q[j])
+                acc += d * d
+            out[i] = acc
+
+
+def quantized_sqeuclidean_distances(q: np.ndarray, mat: np.ndarray) -> np.ndarray:
+    """
+    Squared L2 distance computed directly on float16 or int8 storage.
+    
+    simsimd scores the narrow types natively, reading 2-4x fewer bytes than
+    float32; without it, large int8 matrices go through a Numba kernel with
+    int32 accumulators and anything else is upcast to float32 a block at a time.
+    
+    Args:
+        q: Query vector of shape (dim,), in the same dtype as ``mat``
+        mat: Matrix of shape (n, dim)
+        
+    Returns:
+        Squared distances of shape (n,), in the quantized units
+    """
+    q = np.ascontiguousarray(q, dtype=mat.dtype).reshape(-1)
+    if SIMSIMD_AVAILABLE:
+        return np.asarray(simsimd.cdist(q[None, :], mat, metric="sqeuclidean"), dtype=np.float32)[0]
+    if NUMBA_AVAILABLE and mat.dtype == np.int8 and mat.shape[0] >= NUMBA_MIN_ROWS:
+        out = np.empty(mat.shape[0], dtype=np.int32)
+        _int8_sqeuclidean(mat, q, out)
+        return out.astype(np.float32)
+    out = np.empty(mat.shape[0], dtype=np.float32)
+    qf = q.astype(np.float32)
+    for start in range(0, mat.shape[0], QUANTIZED_BLOCK_ROWS):
+        block = mat[start:start + QUANTIZED_BLOCK_ROWS].astype(np.float32)
+        block -= qf
+        out[start:start + block.shape[0]] = np.einsum("ij,ij->i", block, block)
+    return out
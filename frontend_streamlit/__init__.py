@@ -0,0 +1 @@
+"""Streamlit frontend and document processing utilities."""
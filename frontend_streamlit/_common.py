@@ -0,0 +1,445 @@
+"""Shared configuration, API client and cached helpers for the Streamlit frontend pages."""
+
+import streamlit as st
+import asyncio
+import httpx
+
+# Persistent on-disk cache for answers; optional
+try:
+    from diskcache import Cache as DiskCache
+except ImportError:
+    DiskCache = None
+
+# HTTP/2 needs the optional h2 package; fall back to HTTP/1.1 keep-alive without it
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+import numpy as np
+import pandas as pd
+from datetime import datetime
+import json
+import orjson
+import html
+import hashlib
+from typing import List, Dict
+import time
+import os
+import socket
+import ipaddress
+import threading
+from pathlib import Path
+from collections import OrderedDict, deque
+
+
+# Custom CSS, read from disk once per process. Streamlit drops elements that a
+# rerun does not emit again, so the <style> tag is still written on every run.
+@st.cache_resource
+def load_css() -> str:
+    """Load the app stylesheet wrapped in a <style> tag."""
+    css = (Path(__file__).parent / "style.css").read_text(encoding="utf-8")
+    return f"<style>\n{css}</style>"
+
+
+MAX_HISTORY = 50  # Conversation entries kept per session
+
+
+def init_session_state() -> None:
+    """Create per-session state on first run."""
+    if "mode" not in st.session_state:
+        st.session_state.mode = "Production"
+    if "messages" not in st.session_state:
+        # Bounded history: the oldest entries are evicted once MAX_HISTORY is reached
+        st.session_state.messages = deque(maxlen=MAX_HISTORY)
+    if "questions_asked" not in st.session_state:
+        st.session_state.questions_asked = 0
+    if "docs_uploaded" not in st.session_state:
+        st.session_state.docs_uploaded = 0
+
+
+# API Configuration
+API_BASE_URL = os.getenv("API_URL", "http://localhost:8000")
+DEMO_MODE = False  # Set to True for demo mode
+UPLOAD_POLL_INTERVAL = 0.5  # Seconds between upload job progress checks
+MAX_UPLOAD_BATCH_BYTES = 500 * 1024 * 1024
+# Memoized /ask and /search responses
+QUERY_CACHE_TTL = 300
+QUERY_CACHE_MAX_ENTRIES = 256
+STATUS_POLL_INTERVAL = 10  # Seconds between background /health and /stats polls
+DNS_CACHE_TTL = 60  # Seconds a resolved backend address is reused
+# On-disk answer/search cache that survives restarts (needs diskcache)
+DISK_CACHE_DIR = os.getenv("RAG_APP_CACHE_DIR", "/tmp/rag-cache")
+DISK_CACHE_SIZE_LIMIT = 1 << 30
+DISK_CACHE_TTL = 3600
+
+
+# Process-wide cache of resolved backend addresses, keyed by (host, port). A plain
+# module global (this module is imported once) so the status poller thread can use it.
+_dns_cache: Dict = {"lock": threading.Lock(), "entries": {}}
+
+
+def get_dns_cache() -> Dict:
+    """Return the resolved-address cache."""
+    return _dns_cache
+
+
+def resolve_pinned(host: str, port: int) -> str:
+    """
+    Resolve a backend host once and reuse the address until DNS_CACHE_TTL expires.
+
+    Loopback hosts are left alone: "localhost" often resolves to ::1 first
+    while the API listens on IPv4 only, and only the socket layer tries
+    every address.
+    """
+    if host == "localhost" or host.endswith(".localhost"):
+        return host
+    try:
+        ipaddress.ip_address(host)
+        return host
+    except ValueError:
+        pass
+    cache = get_dns_cache()
+    now = time.monotonic()
+    with cache["lock"]:
+        entry = cache["entries"].get((host, port))
+        if entry is not None and entry[1] > now:
+            return entry[0]
+    try:
+        addr = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)[0][4][0]
+    except OSError:
+        # Leave the hostname in place and let the connection report the failure
+        return host
+    if ipaddress.ip_address(addr.split("%")[0]).is_loopback:
+        addr = host
+    with cache["lock"]:
+        cache["entries"][(host, port)] = (addr, now + DNS_CACHE_TTL)
+    return addr
+
+
+def _pin_request(request: httpx.Request) -> None:
+    """Send a request to the cached backend address, keeping Host and TLS SNI on the hostname."""
+    host = request.url.host
+    addr = resolve_pinned(host, request.url.port or (443 if request.url.scheme == "https" else 80))
+    if addr == host:
+        return
+    request.headers["Host"] = request.url.netloc.decode("ascii")
+    request.extensions["sni_hostname"] = host
+    request.url = request.url.copy_with(host=addr)
+
+
+async def _apin_request(request: httpx.Request) -> None:
+    """Async event-hook wrapper for _pin_request."""
+    _pin_request(request)
+
+
+@st.cache_resource
+def get_client() -> httpx.Client:
+    """Shared keep-alive HTTP client (HTTP/2 when available), kept across Streamlit reruns."""
+    transport = httpx.HTTPTransport(
+        http2=HTTP2_AVAILABLE,
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=40),
+        retries=3,  # connection failures only
+    )
+    return httpx.Client(
+        base_url=API_BASE_URL,
+        timeout=30.0,
+        transport=transport,
+        event_hooks={"request": [_pin_request]},
+    )
+
+
+CLIENT = get_client()
+
+def call_api(endpoint: str, method: str = "GET", json_data: Dict = None, files: Dict = None):
+    """Make API calls with error handling."""
+    try:
+        if method == "GET":
+            resp = CLIENT.get(endpoint)
+        elif method == "POST":
+            if files:
+                resp = CLIENT.post(endpoint, data=json_data, files=files, timeout=60)
+            else:
+                resp = CLIENT.post(endpoint, json=json_data)
+        
+        if resp.status_code == 200:
+            return orjson.loads(resp.content), None
+        else:
+            return None, f"Error {resp.status_code}: {resp.text}"
+    except httpx.ConnectError:
+        return None, "⚠️ API server not running. Make sure to start: uvicorn api_gateway.main:app --reload"
+    except httpx.TimeoutException:
+        return None, "⚠️ API request timeout"
+    except Exception as e:
+        return None, f"Error: {str(e)}"
+
+
+def start_upload_job(files):
+    """POST files to /upload_documents/start; httpx streams file objects into the multipart body."""
+    fields = []
+    for file in files:
+        file.seek(0)
+        fields.append(("files", (file.name, file, file.type)))
+    return CLIENT.post("/upload_documents/start", files=fields, timeout=120)
+
+
+async def stream_ask(payload: Dict, meta: Dict):
+    """Yield answer text chunks from the streaming /ask endpoint."""
+    async with httpx.AsyncClient(timeout=None, event_hooks={"request": [_apin_request]}) as client:
+        async with client.stream("POST", f"{API_BASE_URL}/ask/stream", json=payload) as resp:
+            if resp.status_code != 200:
+                await resp.aread()
+                raise httpx.HTTPStatusError(f"Error {resp.status_code}: {resp.text}", request=resp.request, response=resp)
+            meta["mode"] = resp.headers.get("X-RAG-Mode", "production")
+            async for chunk in resp.aiter_text():
+                yield chunk
+
+
+def iter_stream_ask(payload: Dict, meta: Dict):
+    """Drive the async answer stream from Streamlit's synchronous script."""
+    loop = asyncio.new_event_loop()
+    agen = stream_ask(payload, meta)
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(agen.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        loop.run_until_complete(agen.aclose())
+        loop.close()
+
+
+def stream_answer_into(placeholder, payload: Dict):
+    """Render a streamed answer into a placeholder; returns (data, error) like call_api."""
+    meta = {}
+    try:
+        with placeholder.container():
+            answer = st.write_stream(iter_stream_ask(payload, meta))
+        return {"question": payload["question"], "answer": answer, "mode": meta.get("mode", "production")}, None
+    except httpx.ConnectError:
+        return None, "⚠️ API server not running. Make sure to start: uvicorn api_gateway.main:app --reload"
+    except httpx.HTTPStatusError as e:
+        return None, str(e)
+    except Exception as e:
+        return None, f"Error: {str(e)}"
+
+
+@st.cache_resource
+def get_answer_cache() -> Dict:
+    """Process-wide store of completed streamed answers, keyed by (question, k, rephrase)."""
+    return {"lock": threading.Lock(), "entries": OrderedDict()}
+
+
+@st.cache_resource
+def get_disk_cache():
+    """On-disk L2 cache shared across restarts and processes, or None without diskcache."""
+    if DiskCache is None:
+        return None
+    try:
+        return DiskCache(DISK_CACHE_DIR, size_limit=DISK_CACHE_SIZE_LIMIT)
+    except Exception:
+        return None
+
+
+def _disk_key(kind: str, *parts) -> str:
+    """Stable disk-cache key for a query."""
+    raw = "|".join([kind, *map(str, parts)]).encode("utf-8")
+    return f"{kind}:{hashlib.blake2b(raw, digest_size=16).hexdigest()}"
+
+
+def cached_answer(question: str, k: int, rephrase: bool):
+    """Return a memoized /ask response that is still within its TTL, or None."""
+    cache = get_answer_cache()
+    key = (question, k, rephrase)
+    with cache["lock"]:
+        entry = cache["entries"].get(key)
+        if entry is not None:
+            stored_at, data = entry
+            if time.monotonic() - stored_at <= QUERY_CACHE_TTL:
+                cache["entries"].move_to_end(key)
+                return data
+            del cache["entries"][key]
+    
+    # L1 miss: fall back to the on-disk cache and promote a hit
+    disk = get_disk_cache()
+    if disk is None:
+        return None
+    data = disk.get(_disk_key("ask", question, k, rephrase))
+    if data is not None:
+        _remember_in_memory(key, data)
+    return data
+
+
+def _remember_in_memory(key, data: Dict) -> None:
+    """Store an /ask response in the in-process LRU."""
+    cache = get_answer_cache()
+    with cache["lock"]:
+        cache["entries"][key] = (time.monotonic(), data)
+        cache["entries"].move_to_end(key)
+        while len(cache["entries"]) > QUERY_CACHE_MAX_ENTRIES:
+            cache["entries"].popitem(last=False)
+
+
+def remember_answer(question: str, k: int, rephrase: bool, data: Dict) -> None:
+    """Memoize an /ask response in memory and, when available, on disk (error answers are skipped)."""
+    # /ask/stream reports generation failures as 200 responses with error text
+    if str(data.get("answer", "")).startswith("Error"):
+        return
+    _remember_in_memory((question, k, rephrase), data)
+    disk = get_disk_cache()
+    if disk is not None:
+        disk.set(_disk_key("ask", question, k, rephrase), data, expire=DISK_CACHE_TTL, tag="ask")
+
+
+def clear_answer_cache() -> None:
+    """Drop all memoized /ask responses."""
+    cache = get_answer_cache()
+    with cache["lock"]:
+        cache["entries"].clear()
+    disk = get_disk_cache()
+    if disk is not None:
+        disk.evict("ask")
+
+
+@st.cache_data(ttl=QUERY_CACHE_TTL, max_entries=QUERY_CACHE_MAX_ENTRIES, show_spinner=False)
+def cached_search(query: str, k: int) -> Dict:
+    """Memoized /search call backed by the disk cache. Errors raise so they are not cached."""
+    disk = get_disk_cache()
+    key = _disk_key("search", query, k)
+    if disk is not None:
+        data = disk.get(key)
+        if data is not None:
+            return data
+    data, error = call_api("/search", method="POST", json_data={"query": query, "k": k})
+    if error:
+        raise RuntimeError(error)
+    if disk is not None:
+        disk.set(key, data, expire=DISK_CACHE_TTL, tag="search")
+    return data
+
+
+def clear_search_cache() -> None:
+    """Drop all memoized /search responses."""
+    cached_search.clear()
+    disk = get_disk_cache()
+    if disk is not None:
+        disk.evict("search")
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def fetch_stats():
+    """Cached /stats call so reruns within the TTL skip the backend."""
+    return call_api("/stats")
+
+
+@st.cache_resource
+def get_status_poller() -> Dict:
+    """Start one background thread polling /health and /stats; returns the dict it keeps updated."""
+    status = {"health": None, "stats": None, "checked_at": None}
+    
+    def _poll():
+        while True:
+            try:
+                status["health"] = CLIENT.get("/health", timeout=2).is_success
+                resp = CLIENT.get("/stats", timeout=5)
+                status["stats"] = orjson.loads(resp.content) if resp.is_success else None
+            except httpx.HTTPError:
+                status["health"] = False
+            except orjson.JSONDecodeError:
+                # Backend is up but /stats returned a non-JSON body
+                status["stats"] = None
+            status["checked_at"] = time.time()
+            time.sleep(STATUS_POLL_INTERVAL)
+    
+    threading.Thread(target=_poll, name="api-status-poller", daemon=True).start()
+    return status
+
+
+@st.cache_resource
+def app_start_time() -> str:
+    """Time the frontend process first ran, formatted for display."""
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+@st.cache_data(ttl=1, show_spinner=False)
+def current_time_str() -> str:
+    """Wall-clock time for the Home page, formatted at most once per second."""
+    return datetime.now().strftime("%H:%M:%S")
+
+
+@st.cache_data(show_spinner=False)
+def build_usage_df(n_messages: int, n_docs: int) -> pd.DataFrame:
+    """One-row usage summary for the Analytics page."""
+    return pd.DataFrame([{
+        "Questions Asked": n_messages,
+        "Documents Uploaded": n_docs,
+        "Session Active": "Yes",
+    }])
+
+
+@st.cache_data(show_spinner=False)
+def build_system_info_df(mode: str, api_url: str, start_time: str) -> pd.DataFrame:
+    """One-row system summary for the Settings page."""
+    return pd.DataFrame([{
+        "Current Mode": mode,
+        "API Server": api_url,
+        "Frontend": "Streamlit",
+        "Python Version": "3.12",
+        "Start Time": start_time,
+    }])
+
+
+def render_retrieved_docs_html(docs: List[Dict]) -> str:
+    """Build collapsible HTML blocks for retrieved documents, colored by relevance."""
+    distances = np.fromiter((doc.get('distance', 0.0) for doc in docs), dtype=np.float32, count=len(docs))
+    scores = 1.0 / (1.0 + distances)
+    
+    # Color code by relevance score: green, orange, then blue
+    conditions = [scores > 0.7, scores > 0.5]
+    colors = np.select(conditions, ["#4CAF50", "#FFA500"], default="#2196F3")
+    emojis = np.select(conditions, ["🔥", "⭐"], default="📌")
+    
+    html_parts = []
+    for idx, (doc, score, color, emoji) in enumerate(zip(docs, scores, colors, emojis), 1):
+        metadata_html = ""
+        if doc.get('metadata'):
+            metadata_html = (
+                '<details style="margin-top: 10px;"><summary><b>Metadata</b></summary>'
+                f'<pre>{html.escape(json.dumps(doc["metadata"], indent=2, default=str))}</pre></details>'
+            )
+        html_parts.append(
+            f'<details style="margin-bottom: 8px;"><summary>{emoji} Document {idx} - Relevance: {score:.2%}</summary>'
+            f'<div style="background-color: {color}20; padding: 15px; border-left: 4px solid {color}; border-radius: 5px;">'
+            f'<b style="color: {color};">Relevance Score: {score:.2%}</b>'
+            f'<p style="color: #333; font-size: 15px; line-height: 1.6; margin-top: 10px;">{html.escape(doc.get("snippet", "N/A"))}</p>'
+            f'{metadata_html}</div></details>'
+        )
+    return "".join(html_parts)
+
+
+def render_sidebar_status() -> None:
+    """Sidebar Status/Stats buttons backed by the background API poller."""
+    with st.sidebar:
+        st.markdown("### System Status")
+        col1, col2 = st.columns(2)
+
+        # Buttons read the latest background poll instead of calling the API on the script thread
+        api_status = get_status_poller()
+
+        with col1:
+            if st.button("🔄 Status"):
+                if api_status["health"] is None:
+                    st.info("… Checking API")
+                elif api_status["health"]:
+                    st.success("✓ API Online")
+                else:
+                    st.error("✗ API Offline")
+
+        with col2:
+            if st.button("📊 Stats"):
+                data = api_status["stats"]
+                if data:
+                    st.session_state.stats = data
+                    st.info(f"Docs: {data.get('vector_store', {}).get('total_vectors', 0)}")
+
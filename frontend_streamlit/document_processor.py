@@ -8,13 +8,106 @@ Handles:
 - Metadata extraction
 """
 
+import hashlib
+import heapq
+import io
+import mmap
 import os
+import queue
+import re
+import threading
+from collections import Counter
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Union, BinaryIO
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Parsers are resolved once at import rather than on every file
+try:
+    import pymupdf  # type: ignore
+except ImportError:
+    try:
+        import fitz as pymupdf  # type: ignore
+    except ImportError:
+        pymupdf = None
+
+try:
+    from pypdf import PdfReader
+except ImportError:
+    PdfReader = None
+
+try:
+    from docx import Document as DocxDocument
+except ImportError:
+    DocxDocument = None
+
+# Parsed-file cache that survives restarts (needs diskcache)
+try:
+    from diskcache import Cache as DiskCache
+except ImportError:
+    DiskCache = None
+
+# Chunk boundaries tried in order: paragraph, line, sentence, word. A tuple
+# groups alternatives of equal rank; the latest one in the window wins
+DEFAULT_SEPARATORS = ("\n\n", "\n", (". ", "! ", "? "), " ")
+
+# File types process_directory picks up, by lowercase extension
+SUPPORTED_EXTENSIONS = frozenset({'pdf', 'txt', 'docx'})
+
+# Ingest cache location and size; bump the version when parsing or
+# chunking output changes so stale entries are not reused
+INGEST_CACHE_DIR = os.getenv("RAG_INGEST_CACHE_DIR", ".ingest_cache")
+INGEST_CACHE_SIZE_LIMIT = 1 << 30
+INGEST_CACHE_VERSION = 1
+_ingest_cache = None
+
+# Keyword candidates: whole words of three or more characters
+_KEYWORD_RE = re.compile(r'\b\w{3,}\b')
+
+STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'from', 'is', 'are', 'was', 'were', 'be', 'being',
+    'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could',
+    'should', 'may', 'might', 'must', 'can', 'this', 'that', 'these',
+    'those', 'it', 'its'
+})
+
+
+class ChunkMetaView(Sequence):
+    """
+    Read-only per-chunk metadata for one document.
+    
+    The document-level fields are stored once and each chunk's dict is built
+    only when indexed, instead of copying the shared fields for every chunk.
+    """
+    
+    __slots__ = ("shared", "chunk_sizes")
+    
+    def __init__(self, shared: Dict, chunk_sizes: List[int]):
+        self.shared = shared
+        self.chunk_sizes = chunk_sizes
+    
+    def __len__(self) -> int:
+        return len(self.chunk_sizes)
+    
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        n = len(self.chunk_sizes)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("chunk index out of range")
+        return {
+            **self.shared,
+            "chunk_index": i,
+            "total_chunks": n,
+            "chunk_size": self.chunk_sizes[i]
+        }
+
 
 class DocumentProcessor:
     """Process and prepare documents for RAG indexing."""
@@ -22,7 +115,7 @@ class DocumentProcessor:
     @staticmethod
     def process_text(text: str, chunk_size: int = 512, overlap: int = 50) -> List[str]:
         """
-        Process plain text and chunk it.
+        Process plain text and chunk it on paragraph, line, sentence or word boundaries.
         
         Args:
             text: Text content
@@ -32,110 +125,179 @@ class DocumentProcessor:
         Returns:
             List of text chunks
         """
-        chunks = []
-        step = chunk_size - overlap
-        
         text = text.strip()
+        chunks = DocumentProcessor.recursive_chunk(text, chunk_size, overlap)
+        return chunks if chunks else [text]
+    
+    @staticmethod
+    def recursive_chunk(
+        text: str,
+        chunk_size: int = 512,
+        overlap: int = 50,
+        separators: Tuple[Union[str, Tuple[str, ...]], ...] = DEFAULT_SEPARATORS,
+    ) -> List[str]:
+        """
+        Split text into overlapping chunks that end on natural boundaries.
         
-        for i in range(0, len(text), step):
-            chunk = text[i : i + chunk_size]
-            if chunk.strip():
-                chunks.append(chunk)
+        Each chunk ends at the last occurrence of the coarsest separator
+        (paragraph, then line, sentence, word) found in the second half of
+        its ``chunk_size`` window, and is cut hard when none is found.
         
-        return chunks if chunks else [text]
+        Args:
+            text: Text content
+            chunk_size: Maximum size of each chunk
+            overlap: Characters shared between consecutive chunks
+            separators: Boundaries to try, coarsest first; a tuple entry
+                groups separators of equal rank
+            
+        Returns:
+            List of text chunks
+        """
+        chunks = []
+        n = len(text)
+        min_cut = max(1, chunk_size // 2)
+        start = 0
+        while start < n:
+            end = min(start + chunk_size, n)
+            if end < n:
+                for level in separators:
+                    best = -1
+                    for sep in ((level,) if isinstance(level, str) else level):
+                        cut = text.rfind(sep, start + min_cut, end)
+                        if cut != -1:
+                            best = max(best, cut + len(sep))
+                    if best != -1:
+                        end = best
+                        break
+            chunk = text[start:end]
+            if chunk and not chunk.isspace():
+                chunks.append(chunk)
+            if end >= n:
+                break
+            start = max(end - overlap, start + 1)
+        return chunks
     
     @staticmethod
-    def extract_from_pdf(file_path: str) -> Tuple[str, Dict]:
+    def extract_from_pdf(file_path: Union[str, BinaryIO], source: Optional[str] = None) -> Tuple[str, Dict]:
         """
         Extract text from PDF file.
         
         Args:
-            file_path: Path to PDF file
+            file_path: Path to PDF file, or a binary file-like object
+            source: Name recorded in metadata (defaults to file_path)
             
         Returns:
             Tuple of (extracted_text, metadata)
         """
-        try:
-            # Try to import pypdf
+        source = source or str(file_path)
+        
+        # Prefer PyMuPDF: its C parser is far faster than pypdf's page walk
+        if pymupdf is not None:
             try:
-                from pypdf import PdfReader
-            except ImportError:
+                if hasattr(file_path, "read"):
+                    doc = pymupdf.open(stream=file_path.read(), filetype="pdf")
+                else:
+                    doc = pymupdf.open(file_path)
+                with doc:
+                    text = "".join(
+                        f"\n\n[Page {page_num + 1}]\n{page_text}"
+                        for page_num, page_text in enumerate(page.get_text("text") for page in doc)
+                        if page_text
+                    )
+                    metadata = {
+                        "source": source,
+                        "type": "pdf",
+                        "pages": doc.page_count,
+                        "extraction_method": "pymupdf"
+                    }
+                return text if text else f"[Empty PDF: {Path(source).name}]", metadata
+            except Exception as e:
+                logger.warning(f"PyMuPDF could not read {source}, falling back to pypdf: {str(e)}")
+                if hasattr(file_path, "seek"):
+                    file_path.seek(0)
+        
+        try:
+            if PdfReader is None:
                 # Fallback for demo
                 logger.warning("pypdf not installed, returning placeholder text")
-                return f"[PDF Content from {Path(file_path).name}]", {
-                    "source": file_path,
+                return f"[PDF Content from {Path(source).name}]", {
+                    "source": source,
                     "type": "pdf",
                     "extraction_method": "placeholder"
                 }
             
             reader = PdfReader(file_path)
-            text = ""
+            parts: List[str] = []
             
             for page_num, page in enumerate(reader.pages):
                 page_text = page.extract_text()
                 if page_text:
-                    text += f"\n\n[Page {page_num + 1}]\n{page_text}"
+                    parts.append(f"\n\n[Page {page_num + 1}]\n{page_text}")
+            text = "".join(parts)
             
             metadata = {
-                "source": file_path,
+                "source": source,
                 "type": "pdf",
                 "pages": len(reader.pages),
                 "extraction_method": "pypdf"
             }
             
-            return text if text else f"[Empty PDF: {Path(file_path).name}]", metadata
+            return text if text else f"[Empty PDF: {Path(source).name}]", metadata
             
         except Exception as e:
             logger.error(f"Error extracting from PDF: {str(e)}")
             return f"[Error extracting PDF: {str(e)}]", {
-                "source": file_path,
+                "source": source,
                 "type": "pdf",
                 "error": str(e)
             }
     
     @staticmethod
-    def extract_from_docx(file_path: str) -> Tuple[str, Dict]:
+    def extract_from_docx(file_path: Union[str, BinaryIO], source: Optional[str] = None) -> Tuple[str, Dict]:
         """
         Extract text from DOCX file.
         
         Args:
-            file_path: Path to DOCX file
+            file_path: Path to DOCX file, or a binary file-like object
+            source: Name recorded in metadata (defaults to file_path)
             
         Returns:
             Tuple of (extracted_text, metadata)
         """
+        source = source or str(file_path)
         try:
-            from docx import Document
+            if DocxDocument is None:
+                raise ImportError("python-docx is not installed")
             
-            doc = Document(file_path)
-            text = "\n".join([para.text for para in doc.paragraphs])
+            doc = DocxDocument(file_path)
+            text = "\n".join(para.text for para in doc.paragraphs)
             
             metadata = {
-                "source": file_path,
+                "source": source,
                 "type": "docx",
                 "paragraphs": len(doc.paragraphs),
                 "extraction_method": "python-docx"
             }
             
-            return text if text else f"[Empty DOCX: {Path(file_path).name}]", metadata
+            return text if text else f"[Empty DOCX: {Path(source).name}]", metadata
             
         except ImportError:
             logger.warning("python-docx not installed, returning placeholder")
-            return f"[DOCX Content from {Path(file_path).name}]", {
-                "source": file_path,
+            return f"[DOCX Content from {Path(source).name}]", {
+                "source": source,
                 "type": "docx",
                 "extraction_method": "placeholder"
             }
         except Exception as e:
             logger.error(f"Error extracting from DOCX: {str(e)}")
             return f"[Error extracting DOCX: {str(e)}]", {
-                "source": file_path,
+                "source": source,
                 "type": "docx",
                 "error": str(e)
             }
     
     @staticmethod
-    def process_file(file_path: str) -> Tuple[List[str], List[Dict]]:
+    def process_file(file_path: str) -> Tuple[List[str], ChunkMetaView]:
         """
         Process any supported file and return chunks with metadata.
         
@@ -145,6 +307,22 @@ class DocumentProcessor:
         Returns:
             Tuple of (chunk_list, metadata_list)
         """
+        # Unchanged files (same path, mtime and size) skip parsing entirely
+        cache = _get_ingest_cache()
+        key = _ingest_key(file_path) if cache is not None else None
+        if key is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+        
+        result = DocumentProcessor._parse_file(file_path)
+        if key is not None:
+            cache.set(key, result)
+        return result
+    
+    @staticmethod
+    def _parse_file(file_path: str) -> Tuple[List[str], ChunkMetaView]:
+        """Extract and chunk a file from disk, bypassing the ingest cache."""
         file_ext = Path(file_path).suffix.lower()
         
         if file_ext == '.pdf':
@@ -152,8 +330,7 @@ class DocumentProcessor:
         elif file_ext == '.docx':
             text, metadata = DocumentProcessor.extract_from_docx(file_path)
         elif file_ext == '.txt':
-            with open(file_path, 'r', encoding='utf-8') as f:
-                text = f.read()
+            text = DocumentProcessor._read_text_file(file_path)
             metadata = {
                 "source": file_path,
                 "type": "txt",
@@ -162,26 +339,75 @@ class DocumentProcessor:
         else:
             raise ValueError(f"Unsupported file type: {file_ext}")
         
+        return DocumentProcessor._chunk_with_metadata(text, metadata)
+    
+    @staticmethod
+    def _read_text_file(file_path: str) -> str:
+        """
+        Read a UTF-8 text file by decoding straight from a memory map.
+        
+        Avoids holding the raw bytes and the decoded string in memory at once.
+        
+        Args:
+            file_path: Path to text file
+            
+        Returns:
+            File content with universal newlines
+        """
+        if os.path.getsize(file_path) == 0:
+            return ""
+        with open(file_path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                text = str(memoryview(mm), 'utf-8')
+        return _universal_newlines(text)
+    
+    @staticmethod
+    def process_bytes(content: bytes, filename: str) -> Tuple[List[str], ChunkMetaView]:
+        """
+        Process an in-memory file and return chunks with metadata.
+        
+        Args:
+            content: Raw file content
+            filename: Original file name, used to pick the parser
+            
+        Returns:
+            Tuple of (chunk_list, metadata_list)
+        """
+        file_ext = Path(filename).suffix.lower()
+        
+        if file_ext == '.pdf':
+            text, metadata = DocumentProcessor.extract_from_pdf(io.BytesIO(content), source=filename)
+        elif file_ext == '.docx':
+            text, metadata = DocumentProcessor.extract_from_docx(io.BytesIO(content), source=filename)
+        elif file_ext == '.txt':
+            text = _universal_newlines(content.decode('utf-8'))
+            metadata = {
+                "source": filename,
+                "type": "txt",
+                "extraction_method": "direct_read"
+            }
+        else:
+            raise ValueError(f"Unsupported file type: {file_ext}")
+        
+        return DocumentProcessor._chunk_with_metadata(text, metadata)
+    
+    @staticmethod
+    def _chunk_with_metadata(text: str, metadata: Dict) -> Tuple[List[str], ChunkMetaView]:
+        """Chunk extracted text and attach per-chunk metadata."""
         # Chunk the text
         chunks = DocumentProcessor.process_text(text)
         
-        # Create metadata for each chunk
-        metadata_list = [{
-            **metadata,
-            "chunk_index": i,
-            "total_chunks": len(chunks),
-            "chunk_size": len(chunk)
-        } for i, chunk in enumerate(chunks)]
-        
-        return chunks, metadata_list
+        # Shared metadata is kept once; per-chunk dicts are built on access
+        return chunks, ChunkMetaView(metadata, [len(chunk) for chunk in chunks])
     
     @staticmethod
-    def process_directory(directory: str) -> Tuple[List[str], List[Dict]]:
+    def process_directory(directory: str, max_workers: Optional[int] = None) -> Tuple[List[str], List[Dict]]:
         """
-        Process all documents in a directory.
+        Process all documents in a directory, parsing files in parallel.
         
         Args:
             directory: Path to directory
+            max_workers: Worker processes to use (defaults to the CPU count)
             
         Returns:
             Tuple of (all_chunks, all_metadata)
@@ -189,21 +415,138 @@ class DocumentProcessor:
         all_chunks = []
         all_metadata = []
         
-        supported_formats = {'.pdf', '.txt', '.docx'}
+        file_paths = list(_iter_supported_files(directory, SUPPORTED_EXTENSIONS))
+        if not file_paths:
+            return all_chunks, all_metadata
+        
+        # Unchanged files are served from the ingest cache; only the rest are parsed
+        cache = _get_ingest_cache()
+        results = {}
+        keys = {}
+        pending = []
+        for file_path in file_paths:
+            key = _ingest_key(file_path) if cache is not None else None
+            cached = cache.get(key) if key is not None else None
+            if cached is not None:
+                results[file_path] = (*cached, None)
+            else:
+                keys[file_path] = key
+                pending.append(file_path)
+        
+        if pending:
+            # Parsing is CPU-bound and independent per file, so spread it over
+            # processes; a reader thread prefetches file bytes so disk reads
+            # overlap parsing instead of stalling each worker
+            max_workers = min(max_workers or os.cpu_count() or 1, len(pending))
+            prefetched: "queue.Queue" = queue.Queue(maxsize=2 * max_workers)
+            reader = threading.Thread(target=_prefetch_files, args=(pending, prefetched), daemon=True)
+            reader.start()
+            
+            # Bound the files held in memory while waiting for a worker
+            in_flight = threading.BoundedSemaphore(2 * max_workers)
+            futures = []
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                while True:
+                    item = prefetched.get()
+                    if item is None:
+                        break
+                    file_path, content, error = item
+                    if error is not None:
+                        results[file_path] = ([], [], error)
+                        continue
+                    in_flight.acquire()
+                    future = executor.submit(_process_bytes_safe, content, file_path)
+                    future.add_done_callback(lambda _: in_flight.release())
+                    futures.append((file_path, future))
+                
+                for file_path, future in futures:
+                    chunks, metadata, error = future.result()
+                    results[file_path] = (chunks, metadata, error)
+                    if error is None and keys[file_path] is not None:
+                        cache.set(keys[file_path], (chunks, metadata))
         
-        for file_path in Path(directory).glob('**/*'):
-            if file_path.suffix.lower() in supported_formats:
-                try:
-                    chunks, metadata = DocumentProcessor.process_file(str(file_path))
-                    all_chunks.extend(chunks)
-                    all_metadata.extend(metadata)
-                    logger.info(f"Processed {file_path.name}: {len(chunks)} chunks")
-                except Exception as e:
-                    logger.error(f"Failed to process {file_path.name}: {str(e)}")
+        for file_path in file_paths:
+            chunks, metadata, error = results[file_path]
+            name = Path(file_path).name
+            if error is not None:
+                logger.error(f"Failed to process {name}: {error}")
+                continue
+            all_chunks.extend(chunks)
+            all_metadata.extend(metadata)
+            logger.info(f"Processed {name}: {len(chunks)} chunks")
         
         return all_chunks, all_metadata
 
 
+def _get_ingest_cache():
+    """Persistent parsed-file cache, or None without diskcache."""
+    global _ingest_cache
+    if _ingest_cache is None:
+        _ingest_cache = False
+        if DiskCache is not None:
+            try:
+                _ingest_cache = DiskCache(INGEST_CACHE_DIR, size_limit=INGEST_CACHE_SIZE_LIMIT)
+            except Exception as e:
+                logger.warning(f"Ingest cache disabled: {e}")
+    return None if _ingest_cache is False else _ingest_cache
+
+
+def _ingest_key(file_path: str) -> Optional[bytes]:
+    """Cache key for a file's current version, or None if it cannot be stat'ed."""
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    raw = f"{INGEST_CACHE_VERSION}|{os.path.abspath(file_path)}|{st.st_mtime_ns}|{st.st_size}"
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).digest()
+
+
+def _iter_supported_files(root: str, extensions: frozenset):
+    """
+    Yield paths of files under root whose extension is in extensions.
+    
+    Walks with os.scandir and an explicit stack, checking the raw entry name
+    before building anything, so unsupported files cost no extra stat.
+    """
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                    continue
+                base, _, ext = entry.name.rpartition('.')
+                # Same rule as Path.suffix: no suffix for "pdf" or ".pdf"
+                if base and ext.lower() in extensions and entry.is_file():
+                    yield entry.path
+
+
+def _universal_newlines(text: str) -> str:
+    """Translate \\r\\n and \\r line endings to \\n, as text-mode open() does."""
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+
+def _prefetch_files(file_paths: List[str], out: "queue.Queue") -> None:
+    """Read files in order onto a bounded queue, ending with None."""
+    for file_path in file_paths:
+        try:
+            out.put((file_path, Path(file_path).read_bytes(), None))
+        except Exception as e:
+            out.put((file_path, None, str(e)))
+    out.put(None)
+
+
+def _process_bytes_safe(content: bytes, file_path: str) -> Tuple[List[str], List[Dict], Optional[str]]:
+    """Process one file's bytes in a worker process, returning the error message instead of raising."""
+    try:
+        chunks, metadata = DocumentProcessor.process_bytes(content, file_path)
+        return chunks, metadata, None
+    except Exception as e:
+        return [], [], str(e)
+
+
 class TextSummarizer:
     """Summarize documents and text."""
     
@@ -228,13 +571,13 @@ class TextSummarizer:
             if words:
                 # Give more weight to early sentences
                 score = len(words) / (i + 1)
-                scored.append((score, sent.strip()))
+                scored.append((score, i, sent.strip()))
         
-        # Get top sentences
-        top_sentences = sorted(scored, key=lambda x: x[0], reverse=True)[:max_sentences]
-        top_sentences = sorted(top_sentences, key=lambda x: sentences.index(x[1] + '.'))
+        # Get top sentences, restored to document order by their position
+        top_sentences = heapq.nlargest(max_sentences, scored, key=lambda x: x[0])
+        top_sentences.sort(key=lambda x: x[1])
         
-        summary = '. '.join([sent for _, sent in top_sentences])
+        summary = '. '.join(sent for _, _, sent in top_sentences)
         return summary + '.'
     
     @staticmethod
@@ -249,25 +592,14 @@ class TextSummarizer:
         Returns:
             List of keywords
         """
-        import re
-        from collections import Counter
-        
-        # Simple keyword extraction: TF-IDF-like scoring
-        words = re.findall(r'\b\w+\b', text.lower())
-        
-        # Filter stop words
-        stop_words = {
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
-            'of', 'with', 'by', 'from', 'is', 'are', 'was', 'were', 'be', 'being',
-            'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could',
-            'should', 'may', 'might', 'must', 'can', 'this', 'that', 'these',
-            'those', 'it', 'its'
-        }
-        
-        filtered = [w for w in words if len(w) > 2 and w not in stop_words]
-        
-        # Count and get top keywords
-        counter = Counter(filtered)
+        # Simple keyword extraction: TF-IDF-like scoring; the regex only
+        # matches words longer than two characters. Tokens are lowercased as
+        # they stream out instead of copying the whole text with lower()
+        counter = Counter()
+        for match in _KEYWORD_RE.finditer(text):
+            word = match.group().lower()
+            if word not in STOP_WORDS:
+                counter[word] += 1
         keywords = [word for word, _ in counter.most_common(num_keywords)]
         
         return keywords
@@ -0,0 +1,83 @@
+"""Analytics page: vector store statistics and session usage."""
+
+import streamlit as st
+
+from _common import (
+    build_usage_df,
+    fetch_stats,
+)
+
+st.title("📈 Analytics & Monitoring")
+
+col1, col2 = st.columns(2)
+
+with col1:
+    if st.button("🔄 Refresh Stats"):
+        fetch_stats.clear()
+        st.rerun()
+
+# System Statistics
+st.markdown("### 📊 System Statistics")
+
+data, error = fetch_stats()
+
+if data:
+    col1, col2, col3, col4 = st.columns(4)
+
+    stats = data.get("vector_store", {})
+
+    with col1:
+        st.metric(
+            "📚 Total Documents",
+            stats.get("total_vectors", 0)
+        )
+
+    with col2:
+        st.metric(
+            "🔍 Embedding Dimension",
+            stats.get("embedding_dimension", 0)
+        )
+
+    with col3:
+        st.metric(
+            "💾 Index Type",
+            stats.get("index_type", "Unknown")
+        )
+
+    with col4:
+        st.metric(
+            "📍 Store Path",
+            stats.get("path", "N/A")[-30:]
+        )
+
+    st.divider()
+
+    # Configuration
+    st.markdown("### ⚙️ Configuration")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.markdown("""
+        **Model Settings**
+        - Model: gpt-4o
+        - Temperature: 0.7
+        - Max Tokens: 1000
+        """)
+
+    with col2:
+        config = data.get("config", {})
+        st.markdown(f"""
+        **Retrieval Settings**
+        - Top-K Results: {config.get('top_k', 5)}
+        - Chunk Size: {config.get('chunk_size', 512)}
+        - Chunk Overlap: {config.get('chunk_overlap', 50)}
+        """)
+
+st.divider()
+
+# Usage Statistics
+st.markdown("### 📊 Usage Statistics")
+
+usage_df = build_usage_df(st.session_state.questions_asked, st.session_state.docs_uploaded)
+st.dataframe(usage_df, hide_index=True)
@@ -0,0 +1,138 @@
+"""Ask page: streamed RAG answers and conversation history."""
+
+import streamlit as st
+from datetime import datetime
+from itertools import islice
+import time
+
+from _common import (
+    cached_answer,
+    clear_answer_cache,
+    remember_answer,
+    render_retrieved_docs_html,
+    stream_answer_into,
+)
+
+st.title("❓ Ask Questions")
+
+st.markdown("Ask questions about your indexed documents. The system will retrieve relevant context and generate answers.")
+
+# Query settings
+col1, col2 = st.columns([3, 1])
+
+with col1:
+    question = st.text_area(
+        "Your Question",
+        height=100,
+        placeholder="Ask a question about your documents...",
+        help="Be specific for better results"
+    )
+
+with col2:
+    st.markdown("### Settings")
+    k = st.slider("Results Count", 1, 10, 5, help="Number of documents to retrieve")
+    rephrase = st.checkbox("Rephrase Question", value=False)
+    bypass_cache = st.checkbox("Bypass cache", value=False, help="Always query the backend for a fresh answer")
+
+st.divider()
+
+# Submit button
+col1, col2, col3 = st.columns([1, 1, 2])
+
+with col1:
+    submit = st.button("🔍 Ask", type="primary", use_container_width=True)
+
+with col2:
+    if st.button("🔄 Clear", use_container_width=True):
+        st.session_state.messages.clear()
+        st.rerun()
+
+if submit and question:
+    with st.container():
+        payload = {
+            "question": question,
+            "k": k,
+            "use_rephrasing": rephrase
+        }
+
+        # Tokens render as they arrive, then the final answer is restyled in place
+        st.markdown('<div class="response-header">📋 RESPONSE</div>', unsafe_allow_html=True)
+        answer_placeholder = st.empty()
+        if bypass_cache:
+            clear_answer_cache()
+        data = cached_answer(question, k, rephrase)
+        error = None
+        if data is None:
+            data, error = stream_answer_into(answer_placeholder, payload)
+            if data:
+                remember_answer(question, k, rephrase, data)
+
+        if data:
+            # Add to message history
+            st.session_state.questions_asked += 1
+            st.session_state.messages.append({
+                "timestamp": time.time_ns(),
+                "question": question,
+                "response": data
+            })
+
+            # Display answer with prominent styling
+            answer_placeholder.markdown(f"""
+            <div class="success-box">
+            <h3 style="margin-top: 0;">✓ Answer</h3>
+            <p style="font-size: 16px; line-height: 1.8; margin: 15px 0;">
+            {data.get('answer', 'No answer generated')}
+            </p>
+            </div>
+            """, unsafe_allow_html=True)
+
+            # Display metadata in highlighted boxes
+            st.markdown("### 🔧 Response Details")
+            details = [
+                ("🤖 MODEL", data.get('model', 'Unknown')),
+                ("⚙️ MODE", data.get('mode', 'Production').upper()),
+                ("📚 RETRIEVED", f"{len(data.get('retrieved_docs', []))} Documents"),
+            ]
+            st.markdown(
+                '<div class="metric-grid">' + "".join(
+                    f'<div class="metric-box"><div class="info-label">{label}</div>'
+                    f'<div style="font-size: 18px; color: #333; margin-top: 8px; font-weight: bold;">{value}</div></div>'
+                    for label, value in details
+                ) + '</div>',
+                unsafe_allow_html=True
+            )
+
+            # Show retrieved documents
+            if data.get('retrieved_docs'):
+                st.markdown("---")
+                st.markdown('<div class="response-header">📚 RETRIEVED DOCUMENTS</div>', unsafe_allow_html=True)
+
+                # One markdown call for all documents instead of an expander per document
+                st.markdown(render_retrieved_docs_html(data['retrieved_docs']), unsafe_allow_html=True)
+        else:
+            st.error(f"Error: {error}")
+
+# Message history
+if st.session_state.messages:
+    st.divider()
+    st.markdown('<div class="response-header">📜 CONVERSATION HISTORY</div>', unsafe_allow_html=True)
+
+    history = st.session_state.messages
+    recent = islice(history, max(0, len(history) - 5), None)  # Show last 5
+    for i, msg in enumerate(recent, 1):
+        with st.expander(f"💬 Q{i}: {msg['question'][:60]}..."):
+            st.markdown(f"""
+            <div style="background-color: #E3F2FD; padding: 15px; border-left: 4px solid #2196F3; border-radius: 5px; margin-bottom: 15px;">
+            <b style="color: #1976D2;">Question:</b>
+            <p style="color: #333; margin: 8px 0;">{msg['question']}</p>
+            </div>
+            """, unsafe_allow_html=True)
+
+            st.markdown(f"""
+            <div style="background-color: #E8F5E9; padding: 15px; border-left: 4px solid #4CAF50; border-radius: 5px;">
+            <b style="color: #2E7D32;">Answer:</b>
+            <p style="color: #333; margin: 8px 0; line-height: 1.6;">{msg['response'].get('answer', 'N/A')}</p>
+            </div>
+            """, unsafe_allow_html=True)
+
+            st.caption(f"⏰ {datetime.fromtimestamp(msg['timestamp'] / 1e9).strftime('%H:%M:%S')}")
@@ -0,0 +1,75 @@
+"""Home page: overview, features and quick stats."""
+
+import streamlit as st
+
+from _common import (
+    current_time_str,
+    fetch_stats,
+)
+
+st.markdown("""
+<div class="header">
+    <h1>🤖 Enterprise LLMOps RAG System</h1>
+    <p>Production-Ready Retrieval-Augmented Generation with Document Management</p>
+</div>
+""", unsafe_allow_html=True)
+
+st.markdown("### Features")
+col1, col2, col3 = st.columns(3)
+
+with col1:
+    st.markdown("""
+    **📄 Document Management**
+    - Upload PDFs, Word, Text
+    - Automatic chunking
+    - Vector embedding
+    - Persistent storage
+    """)
+
+with col2:
+    st.markdown("""
+    **❓ Smart Q&A**
+    - Real-time retrieval
+    - Context-aware answers
+    - Multi-document synthesis
+    - Question rephrasing
+    """)
+
+with col3:
+    st.markdown("""
+    **📊 Enterprise Features**
+    - Usage analytics
+    - Document indexing
+    - Search capabilities
+    - Performance monitoring
+    """)
+
+st.divider()
+
+# Quick Stats
+st.markdown("### System Overview")
+col1, col2, col3, col4 = st.columns(4)
+
+data, _ = fetch_stats()
+
+if data:
+    stats = data.get("vector_store", {})
+    with col1:
+        st.metric("📚 Documents Indexed", stats.get("total_vectors", 0))
+    with col2:
+        st.metric("🔍 Embedding Dimension", stats.get("embedding_dimension", 1536))
+    with col3:
+        st.metric("💾 Index Type", stats.get("index_type", "Unknown"))
+    with col4:
+        st.metric("⏰ Current Time", current_time_str())
+
+st.divider()
+
+# Getting Started
+st.markdown("### 🚀 Getting Started")
+st.markdown("""
+1. **Upload Documents** - Go to "Upload Documents" tab to add PDFs or text files
+2. **Ask Questions** - Ask questions in the "Ask Questions" tab
+3. **Get Answers** - System retrieves relevant documents and generates answers
+4. **Monitor Usage** - View analytics and performance metrics
+""")
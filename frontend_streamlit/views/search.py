@@ -0,0 +1,46 @@
+"""Search page: semantic document search."""
+
+import streamlit as st
+
+from _common import (
+    cached_search,
+    clear_search_cache,
+)
+
+st.title("🔍 Search Documents")
+
+st.markdown("Search for documents semantically similar to your query.")
+
+col1, col2 = st.columns([3, 1])
+
+with col1:
+    search_query = st.text_input(
+        "Search Query",
+        placeholder="Enter search terms or concepts..."
+    )
+
+with col2:
+    st.markdown("### Options")
+    num_results = st.slider("Top Results", 1, 20, 5)
+    bypass_search_cache = st.checkbox("Bypass cache", value=False, key="bypass_search_cache")
+
+if search_query and st.button("🔎 Search", type="primary"):
+    with st.spinner("Searching..."):
+        if bypass_search_cache:
+            clear_search_cache()
+        try:
+            data, error = cached_search(search_query, num_results), None
+        except RuntimeError as e:
+            data, error = None, str(e)
+
+        if data:
+            results = data.get('results', [])
+            st.markdown(f"### Found {len(results)} Results")
+
+            for idx, result in enumerate(results, 1):
+                with st.expander(f"📄 Result {idx} - Score: {result.get('distance', 0):.3f}"):
+                    st.text(result.get('snippet', 'N/A'))
+                    if result.get('metadata'):
+                        st.json(result['metadata'])
+        else:
+            st.error(f"Search failed: {error}")
@@ -0,0 +1,71 @@
+"""Settings page: mode, API configuration and store maintenance."""
+
+import streamlit as st
+
+from _common import (
+    API_BASE_URL,
+    app_start_time,
+    build_system_info_df,
+    call_api,
+    clear_answer_cache,
+    clear_search_cache,
+    fetch_stats,
+)
+
+st.title("⚙️ Settings & Configuration")
+
+col1, col2 = st.columns(2)
+
+with col1:
+    st.markdown("### 🎯 Mode")
+    mode = st.selectbox(
+        "System Mode",
+        ["Production", "Demo"],
+        index=0 if st.session_state.mode == "Production" else 1,
+        help="Production uses real document retrieval. Demo uses static responses."
+    )
+    st.session_state.mode = mode
+
+with col2:
+    st.markdown("### 🔑 API Configuration")
+    api_url = st.text_input(
+        "API Base URL",
+        value=API_BASE_URL,
+        help="URL of the FastAPI server"
+    )
+    if api_url != API_BASE_URL:
+        st.warning("Please restart app to apply changes")
+
+st.divider()
+
+st.markdown("### 📋 System Information")
+
+info_df = build_system_info_df(st.session_state.mode, API_BASE_URL, app_start_time())
+st.dataframe(info_df, hide_index=True)
+
+st.divider()
+
+# Danger Zone
+st.markdown("### ⚠️ Danger Zone")
+
+if st.button("🗑️ Clear All Documents", help="This cannot be undone"):
+    with st.spinner("Clearing..."):
+        data, error = call_api("/clear", method="POST")
+        if data:
+            clear_answer_cache()
+            clear_search_cache()
+            fetch_stats.clear()
+            st.success("✓ Vector store cleared!")
+        else:
+            st.error(f"Error clearing store: {error}")
+
+st.markdown("---")
+st.markdown("""
+**Enterprise LLMOps RAG v1.0**
+
+A production-ready Retrieval-Augmented Generation system with:
+- Document management and indexing
+- Vector similarity search
+- LLM-powered question answering
+- Enterprise analytics and monitoring
+""")
@@ -0,0 +1,99 @@
+"""Upload page: send documents to the API for indexing."""
+
+import streamlit as st
+import httpx
+import orjson
+import time
+
+from _common import (
+    CLIENT,
+    MAX_UPLOAD_BATCH_BYTES,
+    UPLOAD_POLL_INTERVAL,
+    clear_answer_cache,
+    clear_search_cache,
+    fetch_stats,
+    start_upload_job,
+)
+
+st.title("📤 Upload & Index Documents")
+
+st.markdown("Upload documents to build your knowledge base. Supported formats: PDF, TXT, DOCX")
+
+col1, col2 = st.columns([2, 1])
+
+with col1:
+    uploaded_files = st.file_uploader(
+        "Choose files",
+        type=["pdf", "txt", "docx"],
+        accept_multiple_files=True,
+        help="Upload documents to index them into the vector database"
+    )
+
+with col2:
+    st.markdown("### File Info")
+    if uploaded_files:
+        st.info(f"Files selected: {len(uploaded_files)}")
+
+if uploaded_files:
+    st.divider()
+
+    # Process files
+    if st.button("📥 Index Documents", type="primary"):
+        # Reject oversized batches before any file bytes are sent
+        total_bytes = sum(f.size for f in uploaded_files)
+        if total_bytes > MAX_UPLOAD_BATCH_BYTES:
+            st.error(f"Batch exceeds {MAX_UPLOAD_BATCH_BYTES // (1024 * 1024)} MB; split into smaller uploads")
+            st.stop()
+
+        progress_bar = st.progress(0)
+        status_text = st.empty()
+
+        try:
+            status_text.text("Uploading and indexing documents...")
+
+            # The backend indexes in the background; poll it for per-file progress
+            response = start_upload_job(uploaded_files)
+            if response.status_code != 200:
+                st.error(f"Error: {response.text or 'Unknown error'}")
+                st.stop()
+            job_id = orjson.loads(response.content)["job_id"]
+
+            while True:
+                job = orjson.loads(CLIENT.get(f"/upload_documents/{job_id}/progress", timeout=10).content)
+                progress_bar.progress(job["done"] / max(job["total"], 1))
+                if job["status"] == "indexing":
+                    status_text.text("Indexing document chunks...")
+                else:
+                    status_text.text(f"Processed {job['done']}/{job['total']} files...")
+                if job["status"] in ("complete", "error"):
+                    break
+                time.sleep(UPLOAD_POLL_INTERVAL)
+
+            if job["status"] == "complete":
+                st.success(f"""
+                ✓ Successfully indexed documents!
+
+                📊 Results:
+                - Files Processed: {job.get('files_processed', 0)}
+                - Document Chunks: {job.get('chunks_created', 0)}
+                - Message: {job.get('message', 'Indexing complete')}
+                """)
+
+                st.session_state.docs_uploaded += job.get('files_processed', 0)
+                # Cached answers and searches predate the new documents
+                clear_answer_cache()
+                clear_search_cache()
+                fetch_stats.clear()
+            else:
+                st.error(f"Error: {job.get('message') or 'Unknown error'}")
+
+        except httpx.ConnectError:
+            st.error("⚠️ Cannot connect to API server. Make sure it's running on http://localhost:8000")
+        except httpx.TimeoutException:
+            st.error("⚠️ Request timeout. Files may be too large.")
+        except Exception as e:
+            st.error(f"Error: {str(e)}")
+
+        finally:
+            status_text.empty()
+            progress_bar.empty()
@@ -21,12 +21,29 @@ __all__ = [
     "RAGConfig",
 ]
 
+import asyncio
+import hashlib
 import logging
-from typing import List, Optional, Dict, Any
+from collections import OrderedDict
+from functools import partial
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Dict, Any, Tuple, Union
 from pathlib import Path
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
+# Upper bound on completions in flight during batch_ask, to respect API rate limits
+BATCH_CONCURRENCY = 16
+
+# Chunks embedded and added to the store per round in index_documents
+INDEX_BATCH_SIZE = 2048
+
+# Entries kept in each engine's (model, text) -> embedding LRU; matches the
+# module LRU in embeddings.embed (~120 MB at 3072-d float32)
+EMBED_CACHE_MAX_ENTRIES = 10_000
+
 
 class RAGConfig:
     """Configuration class for RAG Engine."""
@@ -42,6 +59,9 @@ class RAGConfig:
         top_k: int = 5,
         chunk_size: int = 512,
         chunk_overlap: int = 50,
+        index_type: str = "sq8",
+        nlist: int = 4096,
+        pq_m: int = 48,
     ):
         """
         Initialize RAG configuration.
@@ -56,6 +76,9 @@ class RAGConfig:
             top_k: Number of documents to retrieve
             chunk_size: Document chunk size
             chunk_overlap: Overlap between chunks
+            index_type: Vector encoding: "flat" (fp32), "sq8" (8-bit) or "ivfpq"
+            nlist: Number of IVF lists for "ivfpq"
+            pq_m: Bytes per vector (PQ sub-quantizers) for "ivfpq"
         """
         self.model_name = model_name
         self.temperature = temperature
@@ -66,6 +89,9 @@ class RAGConfig:
         self.top_k = top_k
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self.index_type = index_type
+        self.nlist = nlist
+        self.pq_m = pq_m
 
 
 class RAGEngine:
@@ -116,10 +142,15 @@ class RAGEngine:
             self.vector_store = FaissStore(
                 dim=self.config.embedding_dim,
                 path=self.config.vector_store_path,
+                index_type=self.config.index_type,
+                nlist=self.config.nlist,
+                pq_m=self.config.pq_m,
             )
             
-            # Store embedding function
-            self.embed_texts = embed_texts
+            # Store embedding function for the configured model, fronted by an
+            # LRU in embed_texts() keyed on that model
+            self._embed_texts = partial(embed_texts, model=self.config.embedding_model)
+            self._emb_cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
             
             # Store LLM client getter
             self._get_llm_client = _get_client
@@ -130,6 +161,50 @@ class RAGEngine:
             self.logger.error(f"Failed to initialize RAG engine: {str(e)}")
             raise
     
+    def embed_texts(self, texts: Union[List[str], str]) -> np.ndarray:
+        """
+        Embed texts, only calling the embedding API for texts not seen before.
+        
+        Args:
+            texts: Single text string or list of texts
+            
+        Returns:
+            Embeddings as float32 numpy array of shape (n, embedding_dim)
+        """
+        if isinstance(texts, str):
+            texts = [texts]
+        texts = list(texts)
+        if not texts:
+            return np.empty((0, self.config.embedding_dim), dtype=np.float32)
+        
+        keys = [self._embedding_key(text) for text in texts]
+        found: Dict[bytes, np.ndarray] = {}
+        missing: Dict[bytes, str] = {}
+        for key, text in zip(keys, texts):
+            vec = self._emb_cache.get(key)
+            if vec is not None:
+                self._emb_cache.move_to_end(key)
+                found[key] = vec
+            else:
+                missing[key] = text
+        
+        if missing:
+            fresh = self._embed_texts(list(missing.values()))
+            for key, vec in zip(missing, fresh):
+                vec = np.array(vec, dtype=np.float32)
+                found[key] = vec
+                self._emb_cache[key] = vec
+            while len(self._emb_cache) > EMBED_CACHE_MAX_ENTRIES:
+                self._emb_cache.popitem(last=False)
+        
+        return np.stack([found[key] for key in keys])
+    
+    def _embedding_key(self, text: str) -> bytes:
+        """Build the embedding cache key for a text."""
+        return hashlib.blake2b(
+            f"{self.config.embedding_model}\0{text}".encode("utf-8"), digest_size=16
+        ).digest()
+    
     def index_documents(
         self,
         documents: List[str],
@@ -148,20 +223,32 @@ class RAGEngine:
             Number of documents indexed
         """
         try:
-            docs_to_index = documents
-            
-            # Optionally chunk documents
+            # Chunks are produced lazily and indexed a batch at a time, so only
+            # one batch of chunk strings is held before it is embedded
             if chunk:
-                docs_to_index = self._chunk_documents(documents)
+                items = self._chunk_documents(documents, metadata)
+            else:
+                items = self._with_metadata(documents, metadata)
             
-            # Embed documents
-            embeddings = self.embed_texts(docs_to_index)
+            total = 0
+            for batch in _batched(items, INDEX_BATCH_SIZE):
+                texts = [text for text, _ in batch]
+                
+                # Embed documents; repeated chunks (headers, boilerplate, overlap
+                # windows) are embedded once by the engine's embedding cache
+                embeddings = self.embed_texts(texts)
+                
+                # Add to vector store, writing it to disk once at the end
+                self.vector_store.add(
+                    embeddings, texts, [dict(meta) if meta else {} for _, meta in batch], persist=False
+                )
+                total += len(texts)
             
-            # Add to vector store
-            self.vector_store.add(embeddings, docs_to_index, metadata)
+            if total:
+                self.vector_store.save()
             
-            self.logger.info(f"Indexed {len(docs_to_index)} documents")
-            return len(docs_to_index)
+            self.logger.info(f"Indexed {total} documents")
+            return total
             
         except Exception as e:
             self.logger.error(f"Error indexing documents: {str(e)}")
@@ -209,13 +296,123 @@ class RAGEngine:
             
         except Exception as e:
             self.logger.error(f"Error answering question: {str(e)}")
+            return self._error_result(question, e)
+    
+    async def ask_async(
+        self,
+        question: str,
+        top_k: Optional[int] = None,
+        use_context: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Answer a question using RAG without blocking the event loop.
+        
+        Args:
+            question: Question to answer
+            top_k: Number of documents to retrieve
+            use_context: Whether to use retrieved context
+            
+        Returns:
+            Dictionary with answer, context, and metadata
+        """
+        try:
+            question_embedding = self.embed_texts([question])[0:1]
+        except Exception as e:
+            self.logger.error(f"Error answering question: {str(e)}")
+            return self._error_result(question, e)
+        return await self._ask_with_embedding(question, question_embedding, top_k, use_context)
+    
+    async def _ask_with_embedding(
+        self,
+        question: str,
+        question_embedding,
+        top_k: Optional[int] = None,
+        use_context: bool = True,
+    ) -> Dict[str, Any]:
+        """Retrieve with a precomputed question embedding and generate the answer."""
+        try:
+            k = top_k or self.config.top_k
+            retrieved = self.vector_store.search_with_metadata(question_embedding, k=k)
+        except Exception as e:
+            self.logger.error(f"Error answering question: {str(e)}")
+            return self._error_result(question, e)
+        return await self._answer_from_retrieved(question, retrieved, use_context)
+    
+    async def _answer_from_retrieved(
+        self,
+        question: str,
+        retrieved: List[Dict[str, Any]],
+        use_context: bool = True,
+    ) -> Dict[str, Any]:
+        """Generate the answer from already retrieved documents."""
+        try:
+            context = "\n".join([r["text"] for r in retrieved])
+            
+            if not use_context or not context:
+                answer = await self._agenerate_answer(question, "")
+            else:
+                answer = await self._agenerate_answer(question, context)
+            
             return {
                 "question": question,
-                "answer": f"Error: {str(e)}",
-                "context": "",
-                "retrieved_docs": [],
-                "error": True,
+                "answer": answer,
+                "context": context,
+                "retrieved_docs": retrieved,
+                "model": self.config.model_name,
             }
+            
+        except Exception as e:
+            self.logger.error(f"Error answering question: {str(e)}")
+            return self._error_result(question, e)
+    
+    @staticmethod
+    def _error_result(question: str, error: Exception) -> Dict[str, Any]:
+        return {
+            "question": question,
+            "answer": f"Error: {str(error)}",
+            "context": "",
+            "retrieved_docs": [],
+            "error": True,
+        }
+    
+    async def abatch_ask(
+        self,
+        questions: List[str],
+        top_k: Optional[int] = None,
+        concurrency: int = BATCH_CONCURRENCY,
+    ) -> List[Dict[str, Any]]:
+        """
+        Answer multiple questions concurrently.
+        
+        All questions are embedded in a single call and searched with a
+        single vector store call; the completions then run concurrently.
+        
+        Args:
+            questions: List of questions
+            top_k: Number of documents per question
+            concurrency: Maximum number of completions in flight at once
+            
+        Returns:
+            List of answer dictionaries, in input order
+        """
+        if not questions:
+            return []
+        try:
+            embeddings = self.embed_texts(questions)
+            retrieved = self.vector_store.search_batch_with_metadata(
+                embeddings, k=top_k or self.config.top_k
+            )
+        except Exception as e:
+            self.logger.error(f"Error retrieving for questions: {str(e)}")
+            return [self._error_result(q, e) for q in questions]
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def _answer(i: int) -> Dict[str, Any]:
+            async with semaphore:
+                return await self._answer_from_retrieved(questions[i], retrieved[i])
+        
+        return list(await asyncio.gather(*[_answer(i) for i in range(len(questions))]))
     
     def batch_ask(
         self,
@@ -232,11 +429,7 @@ class RAGEngine:
         Returns:
             List of answer dictionaries
         """
-        results = []
-        for question in questions:
-            result = self.ask(question, top_k=top_k)
-            results.append(result)
-        return results
+        return asyncio.run(self.abatch_ask(questions, top_k=top_k))
     
     def _generate_answer(self, question: str, context: str) -> str:
         """Generate answer using LLM."""
@@ -246,30 +439,51 @@ class RAGEngine:
         except Exception as e:
             return f"Error generating answer: {str(e)}"
     
-    def _chunk_documents(self, documents: List[str]) -> List[str]:
+    async def _agenerate_answer(self, question: str, context: str) -> str:
+        """Generate answer using LLM without blocking the event loop."""
+        try:
+            from services.llm_service import agenerate_answer
+            return await agenerate_answer(question, context, self.config.model_name, self.config.temperature)
+        except Exception as e:
+            return f"Error generating answer: {str(e)}"
+    
+    def _chunk_documents(
+        self,
+        documents: List[str],
+        metadata: Optional[List[Dict[str, Any]]] = None,
+    ) -> Iterator[Tuple[str, Optional[Dict[str, Any]]]]:
         """
-        Chunk documents into smaller pieces.
+        Chunk documents into smaller pieces, one document at a time.
         
         Args:
             documents: Documents to chunk
+            metadata: Optional metadata for each document
             
-        Returns:
-            Chunked documents
+        Yields:
+            (chunk, metadata of its document) pairs
         """
-        chunked = []
-        for doc in documents:
-            chunks = self._chunk_text(
+        for doc, meta in self._with_metadata(documents, metadata):
+            for chunk in self._chunk_text(
                 doc,
                 chunk_size=self.config.chunk_size,
                 overlap=self.config.chunk_overlap,
-            )
-            chunked.extend(chunks)
-        return chunked
+            ):
+                yield chunk, meta
+    
+    @staticmethod
+    def _with_metadata(
+        documents: List[str],
+        metadata: Optional[List[Dict[str, Any]]] = None,
+    ) -> Iterator[Tuple[str, Optional[Dict[str, Any]]]]:
+        """Pair each document with its metadata entry, or None when missing."""
+        metadata = metadata or []
+        for i, doc in enumerate(documents):
+            yield doc, metadata[i] if i < len(metadata) else None
     
     @staticmethod
     def _chunk_text(text: str, chunk_size: int = 512, overlap: int = 50) -> List[str]:
         """
-        Chunk text into overlapping pieces.
+        Chunk text into overlapping pieces on natural boundaries.
         
         Args:
             text: Text to chunk
@@ -279,15 +493,8 @@ class RAGEngine:
         Returns:
             List of text chunks
         """
-        chunks = []
-        step = chunk_size - overlap
-        
-        for i in range(0, len(text), step):
-            chunk = text[i : i + chunk_size]
-            if chunk.strip():
-                chunks.append(chunk)
-        
-        return chunks
+        from frontend_streamlit.document_processor import DocumentProcessor
+        return DocumentProcessor.recursive_chunk(text, chunk_size=chunk_size, overlap=overlap)
     
     def get_stats(self) -> Dict[str, Any]:
         """Get RAG engine statistics."""
@@ -309,6 +516,16 @@ class RAGEngine:
         self.logger.info("RAG engine cleared")
 
 
+def _batched(items: Iterable, size: int) -> Iterator[List]:
+    """Group an iterable into lists of at most size items."""
+    it = iter(items)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+
 def create_rag_engine(
     model_name: str = "gpt-4o",
     temperature: float = 0.7,
@@ -0,0 +1,187 @@
+"""OpenAI Batch API backend for offline/bulk chat completions.
+
+Batches cost half as much as synchronous requests and draw on a separate
+rate-limit pool, but may take up to the completion window (24h) to finish,
+so they are only suitable for non-interactive work such as re-indexing,
+evaluation runs and nightly summaries.
+"""
+
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+import orjson
+import requests
+
+from services.llm_service import _build_answer_messages, _get_api_key
+
+logger = logging.getLogger(__name__)
+
+OPENAI_API_BASE = "https://api.openai.com/v1"
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_COMPLETION_WINDOW = "24h"
+# Status polling starts fast and backs off exponentially up to the max
+BATCH_POLL_INITIAL_SECONDS = 5.0
+BATCH_POLL_MAX_SECONDS = 300.0
+BATCH_FAILED_STATUSES = {"failed", "expired", "cancelled"}
+
+
+def _auth_headers() -> Dict[str, str]:
+    api_key = _get_api_key()
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY environment variable not set for Batch API call.")
+    return {"Authorization": f"Bearer {api_key}"}
+
+
+def submit_batch(
+    jobs: List[dict],
+    model: str = "gpt-4o",
+    temperature: float = 0.7,
+    max_tokens: int = 1000,
+) -> str:
+    """
+    Upload chat-completion jobs and start a batch.
+
+    Args:
+        jobs: Dicts with "custom_id" and "messages"; "model", "temperature"
+            and "max_tokens" override the defaults per job
+        model: Default model
+        temperature: Default temperature
+        max_tokens: Default output token limit
+
+    Returns:
+        Batch id
+    """
+    headers = _auth_headers()
+    lines = [
+        orjson.dumps({
+            "custom_id": str(job["custom_id"]),
+            "method": "POST",
+            "url": BATCH_ENDPOINT,
+            "body": {
+                "model": job.get("model", model),
+                "messages": job["messages"],
+                "temperature": job.get("temperature", temperature),
+                "max_tokens": job.get("max_tokens", max_tokens),
+            },
+        })
+        for job in jobs
+    ]
+
+    resp = requests.post(
+        f"{OPENAI_API_BASE}/files",
+        headers=headers,
+        files={"file": ("batch.jsonl", b"\n".join(lines) + b"\n", "application/jsonl")},
+        data={"purpose": "batch"},
+        timeout=120,
+    )
+    resp.raise_for_status()
+    input_file_id = resp.json()["id"]
+
+    resp = requests.post(
+        f"{OPENAI_API_BASE}/batches",
+        headers={**headers, "Content-Type": "application/json"},
+        data=orjson.dumps({
+            "input_file_id": input_file_id,
+            "endpoint": BATCH_ENDPOINT,
+            "completion_window": BATCH_COMPLETION_WINDOW,
+        }),
+        timeout=30,
+    )
+    resp.raise_for_status()
+    batch_id = resp.json()["id"]
+    logger.info(f"Submitted batch {batch_id} with {len(jobs)} jobs")
+    return batch_id
+
+
+def _parse_results(content: bytes, results: Dict[str, str]) -> None:
+    """Collect answers (or error strings) from a batch output/error JSONL file."""
+    for line in content.splitlines():
+        if not line.strip():
+            continue
+        record = orjson.loads(line)
+        custom_id = record["custom_id"]
+        error = record.get("error")
+        response = record.get("response") or {}
+        if error or response.get("status_code", 200) != 200:
+            message = (error or {}).get("message") or str(response.get("body", {}).get("error", error))
+            results[custom_id] = f"Error generating answer: {message}"
+            continue
+        choices = response.get("body", {}).get("choices") or []
+        results[custom_id] = choices[0]["message"].get("content", "") if choices else ""
+
+
+def wait_for_batch(
+    batch_id: str,
+    timeout: Optional[float] = None,
+    poll_interval: float = BATCH_POLL_INITIAL_SECONDS,
+    max_poll_interval: float = BATCH_POLL_MAX_SECONDS,
+) -> Dict[str, str]:
+    """
+    Poll a batch until it completes and return its answers.
+
+    Args:
+        batch_id: Id returned by submit_batch
+        timeout: Give up after this many seconds (None waits indefinitely)
+        poll_interval: First delay between status checks
+        max_poll_interval: Upper bound for the backed-off delay
+
+    Returns:
+        Mapping of custom_id to answer; failed requests map to an
+        "Error generating answer: ..." string
+    """
+    headers = _auth_headers()
+    deadline = None if timeout is None else time.monotonic() + timeout
+    delay = poll_interval
+    while True:
+        resp = requests.get(f"{OPENAI_API_BASE}/batches/{batch_id}", headers=headers, timeout=30)
+        resp.raise_for_status()
+        batch = resp.json()
+        status = batch.get("status")
+        if status == "completed":
+            break
+        if status in BATCH_FAILED_STATUSES:
+            raise RuntimeError(f"Batch {batch_id} ended with status {status}")
+        if deadline is not None and time.monotonic() + delay > deadline:
+            raise TimeoutError(f"Batch {batch_id} still {status} after {timeout}s")
+        time.sleep(delay)
+        delay = min(delay * 2, max_poll_interval)
+
+    results: Dict[str, str] = {}
+    for key in ("output_file_id", "error_file_id"):
+        file_id = batch.get(key)
+        if not file_id:
+            continue
+        resp = requests.get(f"{OPENAI_API_BASE}/files/{file_id}/content", headers=headers, timeout=120)
+        resp.raise_for_status()
+        _parse_results(resp.content, results)
+    return results
+
+
+def answer_offline(
+    qas: List[Tuple[str, str]],
+    model: str = "gpt-4o",
+    temperature: float = 0.7,
+    timeout: Optional[float] = None,
+) -> List[str]:
+    """
+    Answer (question, context) pairs through the Batch API.
+
+    Args:
+        qas: (question, context) pairs
+        model: OpenAI model to use
+        temperature: Temperature for generation
+        timeout: Give up waiting after this many seconds
+
+    Returns:
+        One answer per pair, in input order
+    """
+    jobs = [
+        {"custom_id": f"q{i}", "messages": _build_answer_messages(question, context)}
+        for i, (question, context) in enumerate(qas)
+    ]
+    results = wait_for_batch(submit_batch(jobs, model=model, temperature=temperature), timeout=timeout)
+    return [
+        results.get(job["custom_id"], "Error generating answer: no result returned by batch")
+        for job in jobs
+    ]
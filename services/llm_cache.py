@@ -0,0 +1,185 @@
+"""In-process exact + semantic cache for generated answers."""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Disabled unless explicitly turned on
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "false").lower() == "true"
+LLM_CACHE_CAPACITY = int(os.getenv("LLM_CACHE_CAPACITY", "1024"))
+# Cosine similarity at which a previously answered question counts as the same
+LLM_CACHE_SIMILARITY = float(os.getenv("LLM_CACHE_SIMILARITY", "0.95"))
+# Paraphrase matches are only served for (near-)deterministic generations
+LLM_CACHE_SEMANTIC_MAX_TEMPERATURE = 0.2
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+class LLMCache:
+    """
+    Two-tier answer cache.
+
+    Exact hits are served from an LRU keyed by a hash of the full request.
+    On a miss at low temperature, the question embedding is compared with
+    recently answered questions that used the same model and context, and
+    the stored answer is reused above a cosine similarity threshold.
+    """
+
+    def __init__(
+        self,
+        capacity: int = LLM_CACHE_CAPACITY,
+        similarity: float = LLM_CACHE_SIMILARITY,
+        embed_fn: Optional[Callable[[str], np.ndarray]] = None,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            capacity: Maximum entries in each tier
+            similarity: Cosine similarity needed for a semantic hit
+            embed_fn: Text -> embedding function (defaults to embeddings.embed.embed_text)
+        """
+        self.capacity = capacity
+        self.similarity = similarity
+        self._embed_fn = embed_fn
+        self._exact: "OrderedDict[str, str]" = OrderedDict()
+        # Semantic tier: ring buffer of unit question vectors with their scope and answer
+        self._vectors: Optional[np.ndarray] = None
+        self._scopes: List[Optional[str]] = [None] * capacity
+        self._answers: List[Optional[str]] = [None] * capacity
+        self._next_row = 0
+        self._rows = 0
+        self._lock = threading.Lock()
+        self._stats = {"exact_hits": 0, "semantic_hits": 0, "misses": 0}
+
+    @staticmethod
+    def cache_key(*parts) -> str:
+        """Stable hash of the request parts."""
+        raw = json.dumps(parts, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def lookup(self, question: str, context: str, model: str, temperature: float) -> Optional[str]:
+        """
+        Return a cached answer for the request, or None on a miss.
+
+        Args:
+            question: User's question
+            context: Retrieved context
+            model: Model name
+            temperature: Generation temperature
+
+        Returns:
+            Cached answer or None
+        """
+        key = self.cache_key(model, temperature, question, context)
+        with self._lock:
+            answer = self._exact.get(key)
+            if answer is not None:
+                self._exact.move_to_end(key)
+                self._stats["exact_hits"] += 1
+                return answer
+
+        if temperature <= LLM_CACHE_SEMANTIC_MAX_TEMPERATURE and self._rows:
+            answer = self._find_similar(question, self.cache_key(model, temperature, context))
+            if answer is not None:
+                with self._lock:
+                    self._stats["semantic_hits"] += 1
+                return answer
+
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+    def store(self, question: str, context: str, model: str, temperature: float, answer: str) -> None:
+        """
+        Remember an answer for later lookups.
+
+        Args:
+            question: User's question
+            context: Retrieved context
+            model: Model name
+            temperature: Generation temperature
+            answer: Generated answer
+        """
+        key = self.cache_key(model, temperature, question, context)
+        with self._lock:
+            self._exact[key] = answer
+            self._exact.move_to_end(key)
+            while len(self._exact) > self.capacity:
+                self._exact.popitem(last=False)
+
+        if temperature > LLM_CACHE_SEMANTIC_MAX_TEMPERATURE:
+            return
+        vec = self._embed(question)
+        if vec is None:
+            return
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.capacity, vec.shape[0]), dtype=np.float32)
+            row = self._next_row
+            self._vectors[row] = vec
+            self._scopes[row] = self.cache_key(model, temperature, context)
+            self._answers[row] = answer
+            self._next_row = (row + 1) % self.capacity
+            self._rows = min(self._rows + 1, self.capacity)
+
+    def _find_similar(self, question: str, scope: str) -> Optional[str]:
+        """Answer of the most similar stored question with the same scope, if close enough."""
+        vec = self._embed(question)
+        if vec is None:
+            return None
+        with self._lock:
+            sims = self._vectors[:self._rows] @ vec
+            candidates = np.flatnonzero(sims >= self.similarity)
+            for row in candidates[np.argsort(-sims[candidates])]:
+                if self._scopes[row] == scope:
+                    return self._answers[row]
+        return None
+
+    def _embed(self, question: str) -> Optional[np.ndarray]:
+        """Unit-length question embedding, or None if embedding fails."""
+        try:
+            if self._embed_fn is None:
+                from embeddings.embed import embed_text
+                self._embed_fn = embed_text
+            vec = np.asarray(self._embed_fn(question), dtype=np.float32).reshape(-1)
+        except Exception as e:
+            logger.warning(f"LLM cache could not embed question: {e}")
+            return None
+        norm = float(np.linalg.norm(vec))
+        return vec / norm if norm > 0 else None
+
+    def clear(self) -> None:
+        """Drop all cached answers."""
+        with self._lock:
+            self._exact.clear()
+            self._scopes = [None] * self.capacity
+            self._answers = [None] * self.capacity
+            self._next_row = 0
+            self._rows = 0
+
+    def get_stats(self) -> Dict:
+        """Get hit/miss counters."""
+        with self._lock:
+            return {"entries": len(self._exact), **self._stats}
+
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """Get the process-wide answer cache, or None when it is disabled."""
+    global _cache
+    if not LLM_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LLMCache()
+    return _cache
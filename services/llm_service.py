@@ -1,8 +1,14 @@
 """LLM service for generating answers using context."""
 
+import asyncio
+import logging
 import os
+import threading
+import orjson
 import requests
-from typing import Optional
+import re
+from itertools import islice
+from typing import TYPE_CHECKING, Iterator, List, Optional, Tuple, Union
 from pathlib import Path
 from datetime import datetime
 
@@ -15,30 +21,125 @@ try:
 except ImportError:
     pass
 
+if TYPE_CHECKING:
+    from services.retriever import RetrievedContext
+
+logger = logging.getLogger(__name__)
+
 # Lazy load OpenAI client only when needed
 _client = None
+_client_lock = threading.Lock()
+# OPENAI_API_KEY, read from the environment on first use
+_api_key: Optional[str] = None
+# Connection pool, timeouts and connect retries for the shared sync client
+CLIENT_MAX_CONNECTIONS = 64
+CLIENT_MAX_KEEPALIVE = 32
+CLIENT_TIMEOUT_SECONDS = 30.0
+CLIENT_CONNECT_TIMEOUT_SECONDS = 5.0
+CLIENT_CONNECT_RETRIES = 2
+
+# Pooled keep-alive HTTP session for the direct-HTTP fallback
+_http_session = None
+_http_session_lock = threading.Lock()
+HTTP_POOL_CONNECTIONS = 50
+HTTP_POOL_MAXSIZE = 50
+# Retries for rate limits and transient server errors (Retry-After is honoured)
+HTTP_MAX_RETRIES = 3
+HTTP_RETRY_BACKOFF = 0.3
+HTTP_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def _get_api_key() -> Optional[str]:
+    """OpenAI API key, looked up once and then served from the module."""
+    global _api_key
+    if _api_key is None:
+        # Not cached while unset, so a key exported later is still picked up
+        _api_key = os.getenv("OPENAI_API_KEY")
+    return _api_key
 
 
 def _get_client():
     """Get or initialize OpenAI client."""
     global _client
     if _client is None:
-        from openai import OpenAI
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError(
-                "OPENAI_API_KEY environment variable not set. "
-                "Please set your OpenAI API key to use LLM functions."
-            )
-        _client = OpenAI(api_key=api_key)
+        # Double-checked so concurrent first calls build a single client
+        with _client_lock:
+            if _client is None:
+                import httpx
+                from openai import OpenAI
+                api_key = _get_api_key()
+                if not api_key:
+                    raise ValueError(
+                        "OPENAI_API_KEY environment variable not set. "
+                        "Please set your OpenAI API key to use LLM functions."
+                    )
+                # Pool limits belong on the transport: httpx ignores Client(limits=...)
+                # once an explicit transport is given
+                http_client = httpx.Client(
+                    timeout=httpx.Timeout(CLIENT_TIMEOUT_SECONDS, connect=CLIENT_CONNECT_TIMEOUT_SECONDS),
+                    transport=httpx.HTTPTransport(
+                        retries=CLIENT_CONNECT_RETRIES,
+                        limits=httpx.Limits(
+                            max_connections=CLIENT_MAX_CONNECTIONS,
+                            max_keepalive_connections=CLIENT_MAX_KEEPALIVE,
+                        ),
+                    ),
+                )
+                _client = OpenAI(api_key=api_key, http_client=http_client)
     return _client
 
 
+_async_client = None
+
+
+def _get_async_client():
+    """Get or initialize the async OpenAI client."""
+    global _async_client
+    if _async_client is None:
+        with _client_lock:
+            if _async_client is None:
+                from openai import AsyncOpenAI
+                api_key = _get_api_key()
+                if not api_key:
+                    raise ValueError(
+                        "OPENAI_API_KEY environment variable not set. "
+                        "Please set your OpenAI API key to use LLM functions."
+                    )
+                _async_client = AsyncOpenAI(api_key=api_key)
+    return _async_client
+
+
+def _get_http_session() -> requests.Session:
+    """Get or initialize the pooled requests session used by the fallback path."""
+    global _http_session
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                from requests.adapters import HTTPAdapter
+                from urllib3.util.retry import Retry
+                retry = Retry(
+                    total=HTTP_MAX_RETRIES,
+                    backoff_factor=HTTP_RETRY_BACKOFF,
+                    status_forcelist=HTTP_RETRY_STATUSES,
+                    # Chat completions are POSTs, which urllib3 does not retry by default
+                    allowed_methods=frozenset({"POST"}),
+                    raise_on_status=False,
+                )
+                session = requests.Session()
+                session.mount("https://", HTTPAdapter(
+                    pool_connections=HTTP_POOL_CONNECTIONS,
+                    pool_maxsize=HTTP_POOL_MAXSIZE,
+                    max_retries=retry,
+                ))
+                _http_session = session
+    return _http_session
+
+
 def _fallback_chat_completion(messages, model="gpt-4o", temperature=0.7, max_tokens=1000):
     """
     Fallback to direct HTTP call to OpenAI REST API if client instantiation fails.
     """
-    api_key = os.getenv("OPENAI_API_KEY")
+    api_key = _get_api_key()
     if not api_key:
         raise ValueError("OPENAI_API_KEY environment variable not set for fallback HTTP call.")
     url = "https://api.openai.com/v1/chat/completions"
@@ -49,9 +150,9 @@ def _fallback_chat_completion(messages, model="gpt-4o", temperature=0.7, max_tok
         "temperature": temperature,
         "max_tokens": max_tokens,
     }
-    resp = requests.post(url, headers=headers, json=payload, timeout=30)
+    resp = _get_http_session().post(url, headers=headers, data=orjson.dumps(payload), timeout=30)
     resp.raise_for_status()
-    data = resp.json()
+    data = orjson.loads(resp.content)
     # backwards-compatible extraction
     if "choices" in data and len(data["choices"]) > 0:
         # support both new and old shapes
@@ -62,6 +163,61 @@ def _fallback_chat_completion(messages, model="gpt-4o", temperature=0.7, max_tok
     return ""
 
 
+def _fallback_stream_chat_completion(messages, model="gpt-4o", temperature=0.7, max_tokens=1000) -> Iterator[str]:
+    """
+    Streaming variant of _fallback_chat_completion that parses the SSE frames.
+    """
+    api_key = _get_api_key()
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY environment variable not set for fallback HTTP call.")
+    headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+    payload = {
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        "stream": True,
+    }
+    with _get_http_session().post(OPENAI_CHAT_URL, headers=headers, data=orjson.dumps(payload), timeout=30, stream=True) as resp:
+        resp.raise_for_status()
+        for line in resp.iter_lines():
+            if not line.startswith(b"data:"):
+                continue
+            data = line[5:].strip()
+            if data == b"[DONE]":
+                break
+            choices = orjson.loads(data).get("choices") or []
+            content = choices[0].get("delta", {}).get("content") if choices else None
+            if content:
+                yield content
+
+
+def _stream_chat(messages: List[dict], model: str, temperature: float, max_tokens: int, error_label: str) -> Iterator[str]:
+    """Yield completion tokens, using the HTTP fallback when the client cannot be built."""
+    try:
+        client = _get_client()
+        stream = client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True
+        )
+    except Exception as e:
+        # Client construction failed; stream over plain HTTP instead
+        try:
+            yield from _fallback_stream_chat_completion(messages, model=model, temperature=temperature, max_tokens=max_tokens)
+        except Exception as e2:
+            yield f"Error {error_label}: {str(e2) or str(e)}"
+        return
+    try:
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    except Exception as e:
+        yield f"Error {error_label}: {str(e)}"
+
+
 def _get_demo_answer(question: str, context: str) -> str:
     """Generate a demo answer for testing without API calls."""
     # Check for common questions
@@ -73,77 +229,431 @@ def _get_demo_answer(question: str, context: str) -> str:
         return f"Based on the provided context: '{context}', I can help answer your question about '{question}'."
 
 
-def generate_answer(question: str, context: str, model: str = "gpt-4o", temperature: float = 0.7, use_demo: bool = False) -> str:
+# Letter runs (any script) of four or more, for the local keyword heuristic
+_SIMPLE_KEYWORD_RE = re.compile(r"[^\W\d_]{4,}")
+
+# System prompts, shared by the client, HTTP fallback and streaming paths
+ANSWER_SYSTEM_PROMPT = """You are a helpful assistant that answers questions based on provided context.
+Always use the context provided to answer the question accurately. 
+If the context doesn't contain relevant information, say so clearly.
+Provide clear, concise, and accurate answers."""
+SUMMARY_SYSTEM_PROMPT = "You are a helpful assistant that creates concise summaries."
+REPHRASE_SYSTEM_PROMPT = "You are a helpful assistant that rephrases questions to be clearer and more specific for document retrieval."
+KEYWORDS_SYSTEM_PROMPT = "Extract the main keywords from the text and return them as a comma-separated list."
+
+
+def _build_messages(system: str, user: str) -> List[dict]:
+    """System + user chat messages."""
+    return [
+        {"role": "system", "content": system},
+        {"role": "user", "content": user}
+    ]
+
+
+def _answer_user_message(question: str, context: str) -> str:
+    """User turn asking for an answer to a question from context."""
+    return f"""Context:
+{context}
+
+Question: {question}
+
+Based on the context above, please answer the question."""
+
+
+def _context_text(context: Union[str, "RetrievedContext"]) -> str:
+    """Prompt text for a context string or a structured RetrievedContext."""
+    return context if isinstance(context, str) else context.as_prompt()
+
+
+def _build_answer_messages(question: str, context: str) -> List[dict]:
+    """Chat messages asking the model to answer a question from context."""
+    return _build_messages(ANSWER_SYSTEM_PROMPT, _answer_user_message(question, context))
+
+
+def _summary_messages(text: str) -> List[dict]:
+    return _build_messages(SUMMARY_SYSTEM_PROMPT, f"Please provide a concise summary of the following text:\n\n{text}")
+
+
+def _rephrase_messages(question: str) -> List[dict]:
+    return _build_messages(REPHRASE_SYSTEM_PROMPT, f"Rephrase the following question to make it clearer and more specific:\n{question}")
+
+
+def _keywords_messages(text: str) -> List[dict]:
+    return _build_messages(KEYWORDS_SYSTEM_PROMPT, text)
+
+
+def generate_answer(
+    question: str,
+    context: Union[str, "RetrievedContext"],
+    model: str = "gpt-4o",
+    temperature: float = 0.7,
+    use_demo: bool = False,
+    use_batch_api: bool = False,
+) -> str:
     """
     Generate answer to a question using provided context.
     
     Args:
         question: User's question
-        context: Retrieved context to base the answer on
+        context: Retrieved context to base the answer on, as text or as
+            a RetrievedContext (rendered without per-chunk scores)
         model: OpenAI model to use (default: gpt-4o)
         temperature: Temperature for generation (0-1, default: 0.7)
         use_demo: Use demo mode (no API calls) for testing
+        use_batch_api: Submit through the Batch API (half price, may take
+            up to 24h); for offline callers only
         
     Returns:
         Generated answer string
     """
-    try:
-        # Use demo mode if requested (useful for testing without API quota)
-        if use_demo:
-            return _get_demo_answer(question, context)
+    context = _context_text(context)
+    # Use demo mode if requested (useful for testing without API quota)
+    if use_demo:
+        return _get_demo_answer(question, context)
+    
+    from services.llm_cache import get_llm_cache
+    cache = get_llm_cache()
+    if cache is not None:
+        cached = cache.lookup(question, context, model, temperature)
+        if cached is not None:
+            return cached
+    
+    if use_batch_api:
+        from services.llm_batch import answer_offline
+        try:
+            answer = answer_offline([(question, context)], model=model, temperature=temperature)[0]
+        except Exception as e:
+            answer = f"Error generating answer: {str(e)}"
+    else:
+        answer = _generate_answer_uncached(question, context, model, temperature)
+    if cache is not None and answer and not answer.startswith("Error generating answer"):
+        cache.store(question, context, model, temperature, answer)
+    return answer
+
+
+def _call_chat(messages: List[dict], model: str, temperature: float, max_tokens: int) -> str:
+    """
+    Run one chat completion, over plain HTTP if the OpenAI client cannot be built.
+    
+    Args:
+        messages: Chat messages
+        model: OpenAI model to use
+        temperature: Temperature for generation
+        max_tokens: Output token limit
         
+    Returns:
+        Completion text
+    
+    Raises:
+        Exception: Whatever the client or the HTTP fallback raised
+    """
+    try:
         client = _get_client()
-        
-        system_prompt = """You are a helpful assistant that answers questions based on provided context.
-Always use the context provided to answer the question accurately. 
-If the context doesn't contain relevant information, say so clearly.
-Provide clear, concise, and accurate answers."""
+        response = client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+        return response.choices[0].message.content
+    except Exception as e:
+        if isinstance(e, TypeError) or "proxies" in str(e).lower():
+            return _fallback_chat_completion(messages, model=model, temperature=temperature, max_tokens=max_tokens)
+        raise
 
-        user_message = f"""Context:
-{context}
 
-Question: {question}
+def _generate_answer_uncached(question: str, context: str, model: str, temperature: float) -> str:
+    """Call the chat completions API for generate_answer."""
+    try:
+        return _call_chat(_build_answer_messages(question, context), model, temperature, 1000)
+    except Exception as e:
+        return f"Error generating answer: {str(e)}"
 
-Based on the context above, please answer the question."""
 
-        response = client.chat.completions.create(
+async def agenerate_answer(question: str, context: Union[str, "RetrievedContext"], model: str = "gpt-4o", temperature: float = 0.7, use_demo: bool = False) -> str:
+    """
+    Generate an answer without blocking the event loop.
+    
+    Args:
+        question: User's question
+        context: Retrieved context to base the answer on
+        model: OpenAI model to use (default: gpt-4o)
+        temperature: Temperature for generation (0-1, default: 0.7)
+        use_demo: Use demo mode (no API calls) for testing
+        
+    Returns:
+        Generated answer string
+    """
+    context = _context_text(context)
+    if use_demo:
+        return _get_demo_answer(question, context)
+    
+    from services.llm_cache import get_llm_cache
+    cache = get_llm_cache()
+    if cache is not None:
+        # Semantic lookups embed the question; keep that off the event loop
+        cached = await asyncio.to_thread(cache.lookup, question, context, model, temperature)
+        if cached is not None:
+            return cached
+    
+    answer = await _agenerate_answer_uncached(question, context, model, temperature)
+    if cache is not None and answer and not answer.startswith("Error generating answer"):
+        await asyncio.to_thread(cache.store, question, context, model, temperature, answer)
+    return answer
+
+
+async def _agenerate_answer_uncached(question: str, context: str, model: str, temperature: float) -> str:
+    """Call the chat completions API for agenerate_answer."""
+    try:
+        client = _get_async_client()
+    except Exception:
+        # Client construction failed; the sync path carries the HTTP fallback
+        return await asyncio.to_thread(_generate_answer_uncached, question, context, model, temperature)
+    try:
+        response = await client.chat.completions.create(
             model=model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_message}
-            ],
+            messages=_build_answer_messages(question, context),
             temperature=temperature,
             max_tokens=1000
         )
+        return response.choices[0].message.content
+    except Exception as e:
+        return f"Error generating answer: {str(e)}"
+
+
+# Concurrent direct-HTTP chat completions for batch workloads
+OPENAI_CHAT_URL = "https://api.openai.com/v1/chat/completions"
+LLM_CONCURRENCY = 16
+ASYNC_MAX_CONNECTIONS = 100
+ASYNC_MAX_KEEPALIVE = 50
+
+
+async def _achat_completion(
+    http,
+    messages: List[dict],
+    model: str,
+    temperature: float,
+    max_tokens: int = 1000,
+    response_format: Optional[dict] = None,
+) -> str:
+    """POST one chat completion on a shared async HTTP client and return its text."""
+    payload = {
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+    }
+    if response_format is not None:
+        payload["response_format"] = response_format
+    resp = await http.post(OPENAI_CHAT_URL, content=orjson.dumps(payload))
+    resp.raise_for_status()
+    choices = orjson.loads(resp.content).get("choices") or []
+    if not choices:
+        return ""
+    choice = choices[0]
+    if isinstance(choice.get("message"), dict):
+        return choice["message"].get("content", "")
+    return choice.get("text", "")
+
+
+async def a_generate_many(
+    questions: List[str],
+    contexts: List[str],
+    model: str = "gpt-4o",
+    temperature: float = 0.7,
+    concurrency: int = LLM_CONCURRENCY,
+    use_demo: bool = False,
+) -> List[str]:
+    """
+    Answer many (question, context) pairs with concurrent chat completions.
+    
+    Requests share one pooled HTTP client and at most ``concurrency`` are
+    in flight, so total time is close to the slowest request rather than
+    the sum of all of them.
+    
+    Args:
+        questions: User questions
+        contexts: Retrieved context for each question
+        model: OpenAI model to use (default: gpt-4o)
+        temperature: Temperature for generation (0-1, default: 0.7)
+        concurrency: Maximum number of requests in flight at once
+        use_demo: Use demo mode (no API calls) for testing
         
-        answer = response.choices[0].message.content
+    Returns:
+        One answer per question, in input order; failed items hold an
+        "Error generating answer: ..." string
+    """
+    if use_demo:
+        return [_get_demo_answer(q, c) for q, c in zip(questions, contexts)]
+    
+    import httpx
+    
+    api_key = _get_api_key()
+    if not api_key:
+        return ["Error generating answer: OPENAI_API_KEY environment variable not set."] * len(questions)
+    headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+    limits = httpx.Limits(max_connections=ASYNC_MAX_CONNECTIONS, max_keepalive_connections=ASYNC_MAX_KEEPALIVE)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    from services.llm_cache import get_llm_cache
+    cache = get_llm_cache()
+
+    async def _answer(http, question: str, context: str) -> str:
+        if cache is not None:
+            cached = await asyncio.to_thread(cache.lookup, question, context, model, temperature)
+            if cached is not None:
+                return cached
+        async with semaphore:
+            answer = await _achat_completion(http, _build_answer_messages(question, context), model, temperature)
+        if cache is not None and answer:
+            await asyncio.to_thread(cache.store, question, context, model, temperature, answer)
         return answer
+
+    async with httpx.AsyncClient(headers=headers, limits=limits, timeout=30) as http:
+        results = await asyncio.gather(
+            *[_answer(http, q, c) for q, c in zip(questions, contexts)], return_exceptions=True
+        )
+    return [
+        f"Error generating answer: {str(r)}" if isinstance(r, Exception) else r
+        for r in results
+    ]
+
+
+# Questions packed into one completion by generate_answers_batched
+ANSWER_BATCH_SIZE = 20
+# Output token cap for one packed completion (gpt-4o allows 16k)
+BATCH_MAX_TOKENS = 16_000
+
+BATCH_ANSWER_SYSTEM_PROMPT = """You are a helpful assistant that answers questions based on provided context.
+You will receive a JSON list of items, each with an id, a context and a question.
+Answer each question using only its own context; if the context doesn't contain
+relevant information, say so clearly.
+Return only a JSON object of the form {"answers": [{"id": "<id>", "answer": "<answer>"}]}
+with one entry per item."""
+
+
+def _parse_batched_answers(raw: str, ids: List[str]) -> Optional[List[str]]:
+    """Map a JSON batch reply back to the given ids, or None if any is missing."""
+    try:
+        data = orjson.loads(raw)
+        items = data.get("answers", []) if isinstance(data, dict) else data
+        by_id = {str(item["id"]): str(item["answer"]) for item in items}
+        return [by_id[i] for i in ids]
+    except Exception:
+        return None
+
+
+async def a_generate_answers_batched(
+    qas: List[Tuple[str, str]],
+    batch_size: int = ANSWER_BATCH_SIZE,
+    model: str = "gpt-4o",
+    temperature: float = 0.7,
+    concurrency: int = LLM_CONCURRENCY,
+    use_demo: bool = False,
+) -> List[str]:
+    """
+    Answer (question, context) pairs, packing several into each completion.
+    
+    Each group of ``batch_size`` pairs shares one request and one copy of the
+    system prompt; groups are sent concurrently. A group whose reply cannot
+    be parsed is answered item by item instead.
+    
+    Args:
+        qas: (question, context) pairs
+        batch_size: Pairs per completion
+        model: OpenAI model to use (default: gpt-4o)
+        temperature: Temperature for generation (0-1, default: 0.7)
+        concurrency: Maximum number of requests in flight at once
+        use_demo: Use demo mode (no API calls) for testing
         
-    except Exception as e:
-        msg = str(e)
-        if isinstance(e, TypeError) or "proxies" in msg.lower():
-            try:
-                # build prompts here in case _get_client() failed before they were defined
-                system_prompt = """You are a helpful assistant that answers questions based on provided context.
-Always use the context provided to answer the question accurately. 
-If the context doesn't contain relevant information, say so clearly.
-Provide clear, concise, and accurate answers."""
+    Returns:
+        One answer per pair, in input order
+    """
+    if use_demo:
+        return [_get_demo_answer(q, c) for q, c in qas]
+    
+    import httpx
+    
+    api_key = _get_api_key()
+    if not api_key:
+        return ["Error generating answer: OPENAI_API_KEY environment variable not set."] * len(qas)
+    headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+    limits = httpx.Limits(max_connections=ASYNC_MAX_CONNECTIONS, max_keepalive_connections=ASYNC_MAX_KEEPALIVE)
+    semaphore = asyncio.Semaphore(concurrency)
 
-                user_message = f"""Context:
-{context}
+    async def _answer_group(http, start: int) -> List[str]:
+        group = qas[start:start + batch_size]
+        ids = [f"q{start + i + 1}" for i in range(len(group))]
+        items = [{"id": i, "context": c, "question": q} for i, (q, c) in zip(ids, group)]
+        messages = _build_messages(BATCH_ANSWER_SYSTEM_PROMPT, orjson.dumps(items).decode("utf-8"))
+        try:
+            async with semaphore:
+                raw = await _achat_completion(
+                    http, messages, model, temperature,
+                    max_tokens=min(1000 * len(group), BATCH_MAX_TOKENS),
+                    response_format={"type": "json_object"},
+                )
+            answers = _parse_batched_answers(raw, ids)
+        except Exception as e:
+            logger.warning(f"Batched answer request failed, answering individually: {str(e)}")
+            answers = None
+        if answers is None:
+            answers = await asyncio.gather(*[
+                asyncio.to_thread(generate_answer, q, c, model, temperature) for q, c in group
+            ])
+        return list(answers)
 
-Question: {question}
+    async with httpx.AsyncClient(headers=headers, limits=limits, timeout=60) as http:
+        groups = await asyncio.gather(*[
+            _answer_group(http, start) for start in range(0, len(qas), batch_size)
+        ])
+    return [answer for group in groups for answer in group]
 
-Based on the context above, please answer the question."""
 
-                messages = [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_message},
-                ]
-                return _fallback_chat_completion(messages, model=model, temperature=temperature)
-            except Exception as e2:
-                return f"Error generating answer: {str(e2)}"
-        return f"Error generating answer: {msg}"
+def generate_answers_batched(
+    qas: List[Tuple[str, str]],
+    batch_size: int = ANSWER_BATCH_SIZE,
+    model: str = "gpt-4o",
+    temperature: float = 0.7,
+    use_demo: bool = False,
+) -> List[str]:
+    """
+    Answer (question, context) pairs with several pairs per completion.
+    
+    Args:
+        qas: (question, context) pairs
+        batch_size: Pairs per completion
+        model: OpenAI model to use (default: gpt-4o)
+        temperature: Temperature for generation (0-1, default: 0.7)
+        use_demo: Use demo mode (no API calls) for testing
+        
+    Returns:
+        One answer per pair, in input order
+    """
+    return asyncio.run(a_generate_answers_batched(
+        qas, batch_size=batch_size, model=model, temperature=temperature, use_demo=use_demo
+    ))
+
+
+def stream_answer(question: str, context: Union[str, "RetrievedContext"], model: str = "gpt-4o", temperature: float = 0.7, use_demo: bool = False) -> Iterator[str]:
+    """
+    Stream an answer to a question as it is generated.
+    
+    Args:
+        question: User's question
+        context: Retrieved context to base the answer on
+        model: OpenAI model to use (default: gpt-4o)
+        temperature: Temperature for generation (0-1, default: 0.7)
+        use_demo: Use demo mode (no API calls) for testing
+        
+    Yields:
+        Chunks of the generated answer
+    """
+    context = _context_text(context)
+    if use_demo:
+        yield _get_demo_answer(question, context)
+        return
+    yield from _stream_chat(_build_answer_messages(question, context), model, temperature, 1000, "generating answer")
 
 
 def generate_summary(text: str, model: str = "gpt-4o", use_demo: bool = False) -> str:
@@ -158,36 +668,30 @@ def generate_summary(text: str, model: str = "gpt-4o", use_demo: bool = False) -
     Returns:
         Summary string
     """
+    if use_demo:
+        return f"Summary: {text[:200]}..." if len(text) > 200 else f"Summary: {text}"
     try:
-        if use_demo:
-            return f"Summary: {text[:200]}..." if len(text) > 200 else f"Summary: {text}"
-        
-        client = _get_client()
-        
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant that creates concise summaries."},
-                {"role": "user", "content": f"Please provide a concise summary of the following text:\n\n{text}"}
-            ],
-            temperature=0.5,
-            max_tokens=500
-        )
-        
-        return response.choices[0].message.content
-        
+        return _call_chat(_summary_messages(text), model, 0.5, 500)
     except Exception as e:
-        msg = str(e)
-        if isinstance(e, TypeError) or "proxies" in msg.lower():
-            try:
-                messages = [
-                    {"role": "system", "content": "You are a helpful assistant that creates concise summaries."},
-                    {"role": "user", "content": f"Please provide a concise summary of the following text:\n\n{text}"}
-                ]
-                return _fallback_chat_completion(messages, model=model)
-            except Exception as e2:
-                return f"Error generating summary: {str(e2)}"
-        return f"Error generating summary: {msg}"
+        return f"Error generating summary: {str(e)}"
+
+
+def stream_summary(text: str, model: str = "gpt-4o", use_demo: bool = False) -> Iterator[str]:
+    """
+    Stream a summary of the provided text as it is generated.
+    
+    Args:
+        text: Text to summarize
+        model: OpenAI model to use
+        use_demo: Use demo mode for testing
+        
+    Yields:
+        Chunks of the summary
+    """
+    if use_demo:
+        yield f"Summary: {text[:200]}..." if len(text) > 200 else f"Summary: {text}"
+        return
+    yield from _stream_chat(_summary_messages(text), model, 0.5, 500, "generating summary")
 
 
 def rephrase_question(question: str, model: str = "gpt-4o", use_demo: bool = False) -> str:
@@ -202,35 +706,11 @@ def rephrase_question(question: str, model: str = "gpt-4o", use_demo: bool = Fal
     Returns:
         Rephrased question
     """
+    if use_demo:
+        return question  # In demo mode, return original
     try:
-        if use_demo:
-            return question  # In demo mode, return original
-        
-        client = _get_client()
-        
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant that rephrases questions to be clearer and more specific for document retrieval."},
-                {"role": "user", "content": f"Rephrase the following question to make it clearer and more specific:\n{question}"}
-            ],
-            temperature=0.3,
-            max_tokens=200
-        )
-        
-        return response.choices[0].message.content
-        
-    except Exception as e:
-        msg = str(e)
-        if isinstance(e, TypeError) or "proxies" in msg.lower():
-            try:
-                messages = [
-                    {"role": "system", "content": "You are a helpful assistant that rephrases questions to be clearer and more specific for document retrieval."},
-                    {"role": "user", "content": f"Rephrase the following question to make it clearer and more specific:\n{question}"}
-                ]
-                return _fallback_chat_completion(messages, model=model, temperature=0.3)
-            except Exception:
-                return question
+        return _call_chat(_rephrase_messages(question), model, 0.3, 200)
+    except Exception:
         return question  # Return original if rephrasing fails
 
 
@@ -246,40 +726,32 @@ def extract_keywords(text: str, model: str = "gpt-4o", use_demo: bool = False) -
     Returns:
         List of keywords
     """
+    if use_demo:
+        return _simple_keywords(text)
     try:
-        if use_demo:
-            # Simple keyword extraction in demo mode
-            words = text.lower().split()
-            return [w.strip('.,!?;:') for w in words if len(w) > 3][:5]
-        
-        client = _get_client()
-        
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": "Extract the main keywords from the text and return them as a comma-separated list."},
-                {"role": "user", "content": text}
-            ],
-            temperature=0.3,
-            max_tokens=200
-        )
-        
-        keywords_text = response.choices[0].message.content
-        keywords = [kw.strip() for kw in keywords_text.split(",")]
-        return keywords
-        
-    except Exception as e:
-        msg = str(e)
-        if isinstance(e, TypeError) or "proxies" in msg.lower():
-            try:
-                messages = [
-                    {"role": "system", "content": "Extract the main keywords from the text and return them as a comma-separated list."},
-                    {"role": "user", "content": text}
-                ]
-                resp = _fallback_chat_completion(messages, model=model, temperature=0.3)
-                return [kw.strip() for kw in resp.split(",") if kw.strip()]
-            except Exception:
-                return []
-        return []
+        keywords_text = _call_chat(_keywords_messages(text), model, 0.3, 200)
+    except Exception:
+        keywords_text = ""
+    keywords = [kw.strip() for kw in (keywords_text or "").split(",") if kw.strip()]
+    # No usable reply (API outage or empty answer): fall back to the local heuristic
+    return keywords or _simple_keywords(text)
+
+
+def _simple_keywords(text: str, limit: int = 5) -> list:
+    """First ``limit`` words of four or more letters, lowercased, without an LLM call."""
+    return [match.group().lower() for match in islice(_SIMPLE_KEYWORD_RE.finditer(text), limit)]
+
+
+async def agenerate_summary(text: str, model: str = "gpt-4o", use_demo: bool = False) -> str:
+    """Async variant of generate_summary; runs it in a worker thread."""
+    return await asyncio.to_thread(generate_summary, text, model, use_demo)
+
+
+async def arephrase_question(question: str, model: str = "gpt-4o", use_demo: bool = False) -> str:
+    """Async variant of rephrase_question; runs it in a worker thread."""
+    return await asyncio.to_thread(rephrase_question, question, model, use_demo)
 
 
+async def aextract_keywords(text: str, model: str = "gpt-4o", use_demo: bool = False) -> list:
+    """Async variant of extract_keywords; runs it in a worker thread."""
+    return await asyncio.to_thread(extract_keywords, text, model, use_demo)
@@ -0,0 +1,105 @@
+"""Collapse concurrent single-item requests into batched calls."""
+
+import asyncio
+import logging
+from typing import Any, Callable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+COLLAPSE_MAX_BATCH = 32
+COLLAPSE_MAX_WAIT_MS = 20.0
+
+
+class QueryCollapser:
+    """
+    Buffer concurrent ``process`` calls and hand them to ``handler`` together.
+
+    A background task takes the first queued item, keeps collecting for up to
+    ``max_wait_ms`` or until ``max_batch`` items are queued, then runs the
+    blocking ``handler`` on the whole batch in a worker thread and resolves
+    each caller's future with its own result. The next batch starts filling
+    while the previous one is still being handled.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[List[Any]], List[Any]],
+        max_batch: int = COLLAPSE_MAX_BATCH,
+        max_wait_ms: float = COLLAPSE_MAX_WAIT_MS,
+    ):
+        """
+        Initialize the collapser.
+
+        Args:
+            handler: Blocking function mapping a list of items to a list of
+                results of the same length and order
+            max_batch: Maximum items per handler call
+            max_wait_ms: Longest time the first item of a batch waits for company
+        """
+        self.handler = handler
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._inflight: Set[asyncio.Task] = set()
+
+    async def process(self, item: Any) -> Any:
+        """
+        Submit one item and wait for its result.
+
+        Args:
+            item: Single request for the handler
+
+        Returns:
+            The handler's result for this item
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            # Queues and tasks belong to one event loop; rebuild for a new one
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run(self._queue))
+        future = loop.create_future()
+        self._queue.put_nowait((item, future))
+        return await future
+
+    async def _run(self, queue: asyncio.Queue) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                if not queue.empty():
+                    batch.append(queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                # asyncio.wait leaves the item queued if the getter is cancelled,
+                # unlike wait_for on Python < 3.12
+                getter = loop.create_task(queue.get())
+                done, _ = await asyncio.wait({getter}, timeout=remaining)
+                if not done:
+                    getter.cancel()
+                    break
+                batch.append(getter.result())
+            task = loop.create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        items = [item for item, _ in batch]
+        try:
+            results = await asyncio.to_thread(self.handler, items)
+            if len(results) != len(items):
+                raise ValueError(f"Collapser handler returned {len(results)} results for {len(items)} items")
+        except Exception as e:
+            logger.error(f"Error in collapsed batch of {len(items)}: {str(e)}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
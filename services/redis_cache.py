@@ -0,0 +1,118 @@
+"""Shared Redis cache for embeddings and answers across API workers."""
+
+import hashlib
+import logging
+import os
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Disabled unless explicitly turned on; every operation is a no-op then
+REDIS_CACHE_ENABLED = os.getenv("REDIS_CACHE_ENABLED", "false").lower() == "true"
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+EMBED_TTL_SECONDS = int(os.getenv("REDIS_EMBED_TTL_SECONDS", "3600"))
+ASK_TTL_SECONDS = int(os.getenv("REDIS_ASK_TTL_SECONDS", "600"))
+# Counter bumped whenever the indexed corpus changes; answer keys include it so
+# every worker stops serving answers computed against the old documents
+STORE_VERSION_KEY = "store_version"
+# After a Redis error, skip the cache for this long instead of paying a timeout per call
+RETRY_AFTER_SECONDS = 30
+
+_redis = None
+_disabled_until = 0.0
+_stats = {"hits": 0, "misses": 0, "errors": 0}
+
+
+def _get_redis():
+    """Get or initialize the Redis client, or None when the cache is unavailable."""
+    global _redis, _disabled_until
+    if not REDIS_CACHE_ENABLED or time.monotonic() < _disabled_until:
+        return None
+    if _redis is None:
+        try:
+            import redis
+        except ImportError:
+            logger.warning("redis package not installed, shared cache disabled")
+            _disabled_until = float("inf")
+            return None
+        _redis = redis.Redis.from_url(REDIS_URL, socket_timeout=0.5, socket_connect_timeout=0.5)
+    return _redis
+
+
+def _on_error(e: Exception) -> None:
+    global _disabled_until
+    _stats["errors"] += 1
+    _disabled_until = time.monotonic() + RETRY_AFTER_SECONDS
+    logger.warning(f"Redis cache unavailable, bypassing for {RETRY_AFTER_SECONDS}s: {e}")
+
+
+def make_key(prefix: str, *parts) -> str:
+    """Build a namespaced cache key from a hash of the given parts."""
+    digest = hashlib.blake2b("\0".join(str(p) for p in parts).encode("utf-8"), digest_size=16).hexdigest()
+    return f"{prefix}:{digest}"
+
+
+def get(key: str) -> Optional[bytes]:
+    """Return the cached value for key, or None on a miss or when Redis is down."""
+    client = _get_redis()
+    if client is None:
+        return None
+    try:
+        value = client.get(key)
+    except Exception as e:
+        _on_error(e)
+        return None
+    _stats["hits" if value is not None else "misses"] += 1
+    return value
+
+
+def put(key: str, value: bytes, ttl: int) -> None:
+    """Store value under key with a TTL in seconds; errors are swallowed."""
+    client = _get_redis()
+    if client is None:
+        return
+    try:
+        client.set(key, value, ex=ttl)
+    except Exception as e:
+        _on_error(e)
+
+
+def get_store_version() -> Optional[int]:
+    """Return the current corpus version, or None when Redis is down."""
+    client = _get_redis()
+    if client is None:
+        return None
+    try:
+        return int(client.get(STORE_VERSION_KEY) or 0)
+    except Exception as e:
+        _on_error(e)
+        return None
+
+
+def bump_store_version() -> None:
+    """Invalidate cached answers after documents are indexed or cleared."""
+    client = _get_redis()
+    if client is None:
+        return
+    try:
+        client.incr(STORE_VERSION_KEY)
+    except Exception as e:
+        _on_error(e)
+
+
+def ping() -> bool:
+    """Check that Redis is reachable."""
+    client = _get_redis()
+    if client is None:
+        return False
+    try:
+        return bool(client.ping())
+    except Exception as e:
+        _on_error(e)
+        return False
+
+
+def get_cache_stats() -> Dict:
+    """Get hit/miss counters for the shared cache."""
+    return {"enabled": REDIS_CACHE_ENABLED, **_stats}
@@ -1,42 +1,191 @@
 """Document retrieval service for RAG pipeline."""
 
+import atexit
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Iterator, List, Tuple
+
 import numpy as np
-import sys
-from pathlib import Path
-from typing import List
 
-# Ensure /app is in Python path for imports
-_app_path = str(Path(__file__).parent.parent.absolute())
-if _app_path not in sys.path:
-    sys.path.insert(0, _app_path)
+from embeddings.embed import EMBED_MAX_RETRIES, EMBED_RETRY_BACKOFF, is_transient_error
+from services.query_collapser import QueryCollapser
+
+# tiktoken counts prompt tokens exactly; otherwise ~CHARS_PER_TOKEN is assumed
+try:
+    import tiktoken  # type: ignore
+except ImportError:
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on prompt tokens spent on retrieved context
+CONTEXT_TOKEN_BUDGET = int(os.getenv("RAG_CONTEXT_TOKEN_BUDGET", "6000"))
+CONTEXT_TOKEN_MODEL = "gpt-4o"
+CHARS_PER_TOKEN = 4
+_encoder = None
+_encoder_lock = threading.Lock()
 
 # Lazy imports - these will be done when functions are called
 FaissStore = None
 embed_texts = None
+aembed_texts = None
 
 def _ensure_imports():
     """Ensure required modules are imported."""
-    global FaissStore, embed_texts
+    global FaissStore, embed_texts, aembed_texts
     if FaissStore is None:
         from vector_store.faiss_store import FaissStore as FS
         FaissStore = FS
     if embed_texts is None:
         from embeddings.embed import embed_texts as et
         embed_texts = et
+    if aembed_texts is None:
+        from embeddings.embed import aembed_texts as aet
+        aembed_texts = aet
+
+VECTOR_STORE_PATH = "vector_store/documents.index"
+# Serve searches from a read-only mmapped index shared by all worker processes;
+# writes reopen the store under an exclusive file lock
+VECTOR_STORE_MMAP = os.getenv("VECTOR_STORE_MMAP", "false").lower() == "true"
+# Seconds between saves of the shared in-process store during bulk indexing
+# (pending writes are also flushed at exit); 0 saves after every write
+VECTOR_STORE_FLUSH_INTERVAL = float(os.getenv("VECTOR_STORE_FLUSH_INTERVAL", "30"))
+# "cuda" serves searches from a FAISS GPU index when a GPU build is installed
+VECTOR_STORE_DEVICE = os.getenv("VECTOR_STORE_DEVICE", "cpu").lower()
+# OpenMP threads per FAISS search; unset leaves it to OMP_NUM_THREADS (which the
+# API gateway defaults to 1, since it serves many small concurrent queries)
+VECTOR_STORE_SEARCH_THREADS = int(os.getenv("VECTOR_STORE_SEARCH_THREADS", "0")) or None
+
+# Index encoding for new stores: "flat" (rebuilt as IVF-SQ8 past AUTO_IVF_THRESHOLD
+# vectors), "sq8" (4x smaller), or "ivfpq" (IVF_PQ_M bytes per vector once
+# trained; recall@5 typically stays >= 0.98 with nlist=4096, nprobe=16), or
+# "auto" (Flat / HNSW32 / IVF-PQ chosen from RAG_EXPECTED_VECTORS)
+RAG_INDEX_KIND = os.getenv("RAG_INDEX_KIND", "flat").lower().replace("_", "")
+RAG_EXPECTED_VECTORS = int(os.getenv("RAG_EXPECTED_VECTORS", "100000"))
+IVF_NLIST = 4096
+IVF_PQ_M = 64
 
 # Global vector store instance
 _vector_store = None
+_vector_store_lock = threading.Lock()
+
+
+def _open_store(read_only: bool = False, flush_interval: float = 0.0) -> FaissStore:
+    common = dict(
+        dim=1536,
+        path=VECTOR_STORE_PATH,
+        read_only=read_only,
+        flush_interval=flush_interval,
+        device=VECTOR_STORE_DEVICE,
+        search_threads=VECTOR_STORE_SEARCH_THREADS,
+    )
+    if RAG_INDEX_KIND == "flat":
+        from vector_store.faiss_store import AUTO_IVF_THRESHOLD
+        return FaissStore(ivf_threshold=AUTO_IVF_THRESHOLD, **common)
+    if RAG_INDEX_KIND == "auto":
+        return FaissStore(expected_size=RAG_EXPECTED_VECTORS, **common)
+    return FaissStore(index_type=RAG_INDEX_KIND, nlist=IVF_NLIST, pq_m=IVF_PQ_M, **common)
+
+
+def _needs_open() -> bool:
+    return _vector_store is None or (VECTOR_STORE_MMAP and _vector_store.changed_on_disk())
 
 
 def get_vector_store() -> FaissStore:
-    """Get or initialize the global vector store."""
+    """Get or initialize the global vector store (reopened after writes in mmap mode)."""
     global _vector_store
     _ensure_imports()
-    if _vector_store is None:
-        _vector_store = FaissStore(dim=1536, path="vector_store/documents.index")
+    if _needs_open():
+        with _vector_store_lock:
+            if _needs_open():
+                if VECTOR_STORE_MMAP:
+                    from vector_store.faiss_store import index_lock
+                    with index_lock(VECTOR_STORE_PATH, exclusive=False):
+                        _vector_store = _open_store(read_only=True)
+                else:
+                    # mmap mode writes through short-lived private copies, which
+                    # must save before releasing the lock, so only this store debounces
+                    _vector_store = _open_store(flush_interval=VECTOR_STORE_FLUSH_INTERVAL)
+                    atexit.register(_vector_store.flush)
     return _vector_store
 
 
+@contextmanager
+def _writable_store() -> Iterator[FaissStore]:
+    """
+    Store to write through: the shared one, or a locked private copy in mmap mode.
+
+    The shared store debounces saves within one bulk call, but is flushed
+    when the call completes so an acknowledged write is always on disk.
+    """
+    if not VECTOR_STORE_MMAP:
+        store = get_vector_store()
+        try:
+            yield store
+        finally:
+            # Persist whatever the call managed to add, even if it failed partway
+            store.flush()
+        return
+    _ensure_imports()
+    from vector_store.faiss_store import index_lock
+    with index_lock(VECTOR_STORE_PATH, exclusive=True):
+        yield _open_store()
+
+
+NO_CONTEXT = "No relevant context found."
+
+
+class RetrievedContext:
+    """Retrieved chunk texts, best first, with their similarity scores."""
+
+    __slots__ = ("parts", "scores")
+
+    def __init__(self, parts: List[str], scores: np.ndarray):
+        self.parts = parts
+        self.scores = scores
+
+    def as_prompt(self, with_scores: bool = False) -> str:
+        """
+        Render the context for an LLM prompt.
+        
+        Args:
+            with_scores: Prefix each chunk with ``[Score: x.xx]`` (costs a few
+                tokens per chunk)
+            
+        Returns:
+            Newline-joined context
+        """
+        if not self.parts:
+            return NO_CONTEXT
+        if with_scores:
+            return "\n".join(f"[Score: {score:.2f}] {part}" for score, part in zip(self.scores.tolist(), self.parts))
+        return "\n".join(self.parts)
+
+    def __str__(self) -> str:
+        return self.as_prompt(with_scores=True)
+
+
+def retrieve_context_parts(query: str, k: int = 5) -> RetrievedContext:
+    """
+    Retrieve relevant chunks from the vector store based on query.
+    
+    Args:
+        query: User question/query string
+        k: Number of documents to retrieve
+        
+    Returns:
+        RetrievedContext with the top-k chunks that fit the token budget
+    """
+    query_embedding = embed_texts([query])[0:1]  # Shape: (1, 1536)
+    store = get_vector_store()
+    results = store.search_with_metadata(query_embedding, k=k)
+    return _build_context(results)
+
+
 def retrieve_context(query: str, k: int = 5) -> str:
     """
     Retrieve relevant context from the vector store based on query.
@@ -49,31 +198,183 @@ def retrieve_context(query: str, k: int = 5) -> str:
         Concatenated context from top-k similar documents
     """
     try:
-        # Embed the query
-        query_embedding = embed_texts([query])[0:1]  # Shape: (1, 1536)
-        
-        # Get vector store
-        store = get_vector_store()
+        return str(retrieve_context_parts(query, k=k))
         
-        # Search for similar documents
-        results = store.search_with_metadata(query_embedding, k=k)
+    except Exception as e:
+        return f"Error retrieving context: {str(e)}"
+
+
+def _build_context(results: List[dict]) -> RetrievedContext:
+    """Score search results and keep the best ones that fit the token budget."""
+    results = [result for result in results if result.get("text")]
+    distances = np.fromiter((result.get("distance", 0) for result in results), dtype=np.float64, count=len(results))
+    # Clamp so negative (inner-product) distances cannot divide by zero
+    scores = 1.0 / (1.0 + np.maximum(distances, 0.0))
+    parts = _fit_budget([result["text"] for result in results])
+    return RetrievedContext(parts=parts, scores=scores[:len(parts)])
+
+
+def _format_context(results: List[dict]) -> str:
+    """Combine search results into a context string."""
+    return str(_build_context(results))
+
+
+def _get_encoder():
+    """tiktoken encoding for the answer model, or None when unavailable."""
+    global _encoder
+    if _encoder is None:
+        with _encoder_lock:
+            if _encoder is None:
+                try:
+                    _encoder = tiktoken.encoding_for_model(CONTEXT_TOKEN_MODEL) if tiktoken is not None else False
+                except Exception as e:
+                    logger.warning(f"Could not load tokenizer, estimating token counts: {e}")
+                    _encoder = False
+    return _encoder or None
+
+
+def _count_tokens(text: str) -> int:
+    encoder = _get_encoder()
+    if encoder is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(encoder.encode_ordinary(text))
+
+
+def _truncate_tokens(text: str, max_tokens: int) -> str:
+    encoder = _get_encoder()
+    if encoder is None:
+        return text[:max_tokens * CHARS_PER_TOKEN]
+    tokens = encoder.encode_ordinary(text)
+    return text if len(tokens) <= max_tokens else encoder.decode(tokens[:max_tokens])
+
+
+def _fit_budget(parts: List[str], budget: int = CONTEXT_TOKEN_BUDGET) -> List[str]:
+    """
+    Keep the leading context parts that fit in a token budget.
+    
+    Parts arrive best-scored first, so the lowest-scored ones are dropped. A
+    first part that alone exceeds the budget is truncated rather than dropped.
+    
+    Args:
+        parts: Context parts, best first
+        budget: Maximum total tokens
         
-        # Combine results into context string
-        context_parts = []
-        for result in results:
-            text = result.get("text", "")
-            distance = result.get("distance", 0)
-            if text:
-                context_parts.append(f"[Score: {1/(1+distance):.2f}] {text}")
+    Returns:
+        The parts to keep
+    """
+    kept = []
+    used = 0
+    for part in parts:
+        tokens = _count_tokens(part) + (1 if kept else 0)  # newline separator
+        if used + tokens > budget:
+            if not kept:
+                kept.append(_truncate_tokens(part, budget))
+            break
+        kept.append(part)
+        used += tokens
+    return kept
+
+
+def _search_batch(items: List[Tuple[str, int]]) -> List[List[dict]]:
+    """Embed a batch of (query, k) requests in one call and search them together."""
+    queries = [query for query, _ in items]
+    max_k = max(k for _, k in items)
+    query_embeddings = embed_texts(queries)
+    store = get_vector_store()
+    results = store.search_batch_with_metadata(query_embeddings, k=max_k)
+    return [rows[:k] for rows, (_, k) in zip(results, items)]
+
+
+_collapser = None
+_collapser_lock = threading.Lock()
+
+
+def get_query_collapser() -> QueryCollapser:
+    """Get or initialize the collapser shared by concurrent async retrievals."""
+    global _collapser
+    if _collapser is None:
+        with _collapser_lock:
+            if _collapser is None:
+                _collapser = QueryCollapser(_search_batch)
+    return _collapser
+
+
+async def aretrieve_context_parts(query: str, k: int = 5) -> RetrievedContext:
+    """
+    Retrieve relevant chunks without blocking the event loop.
+    
+    Queries arriving together are embedded in one request and searched
+    as one batch.
+    
+    Args:
+        query: User question/query string
+        k: Number of documents to retrieve
         
-        context = "\n".join(context_parts) if context_parts else "No relevant context found."
+    Returns:
+        RetrievedContext with the top-k chunks that fit the token budget
+    """
+    _ensure_imports()
+    results = await get_query_collapser().process((query, k))
+    return _build_context(results)
+
+
+async def aretrieve_context(query: str, k: int = 5) -> str:
+    """
+    Retrieve context without blocking the event loop.
+    
+    Args:
+        query: User question/query string
+        k: Number of documents to retrieve
         
-        return context
+    Returns:
+        Concatenated context from top-k similar documents
+    """
+    try:
+        return str(await aretrieve_context_parts(query, k=k))
         
     except Exception as e:
         return f"Error retrieving context: {str(e)}"
 
 
+# Sync indexing fans embedding requests out over a thread pool
+EMBED_CHUNK_SIZE = 256
+EMBED_WORKERS = 8
+
+
+def _embed_with_retry(texts: List[str]) -> np.ndarray:
+    """embed_texts with exponential backoff on transient failures."""
+    for attempt in range(EMBED_MAX_RETRIES + 1):
+        try:
+            return embed_texts(texts)
+        except Exception as e:
+            if attempt == EMBED_MAX_RETRIES or not is_transient_error(e):
+                raise
+            delay = EMBED_RETRY_BACKOFF * (2 ** attempt)
+            logger.warning(f"Embedding request failed ({str(e)}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+def _embed_parallel(documents: List[str], chunk_size: int = EMBED_CHUNK_SIZE, workers: int = EMBED_WORKERS) -> np.ndarray:
+    """
+    Embed documents in chunks sent concurrently from a thread pool.
+    
+    Args:
+        documents: Texts to embed
+        chunk_size: Texts per embedding request
+        workers: Maximum concurrent requests
+        
+    Returns:
+        float32 embeddings in input order
+    """
+    if len(documents) <= chunk_size:
+        return np.asarray(_embed_with_retry(documents), dtype=np.float32)
+    chunks = [documents[i:i + chunk_size] for i in range(0, len(documents), chunk_size)]
+    with ThreadPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+        # map yields results in submission order
+        shards = list(executor.map(_embed_with_retry, chunks))
+    return np.vstack(shards).astype(np.float32, copy=False)
+
+
 def index_documents(documents: List[str], metadata: List[dict] = None) -> int:
     """
     Index documents into the vector store.
@@ -87,11 +388,35 @@ def index_documents(documents: List[str], metadata: List[dict] = None) -> int:
     """
     try:
         # Embed documents
-        embeddings = embed_texts(documents)
+        embeddings = _embed_parallel(documents)
         
         # Get vector store and add documents
-        store = get_vector_store()
-        store.add(embeddings, documents, metadata)
+        with _writable_store() as store:
+            store.add(embeddings, documents, metadata)
+        
+        return len(documents)
+        
+    except Exception as e:
+        raise Exception(f"Error indexing documents: {str(e)}")
+
+
+async def aindex_documents(documents: List[str], metadata: List[dict] = None) -> int:
+    """
+    Index documents into the vector store using concurrent embedding requests.
+    
+    Args:
+        documents: List of text documents to index
+        metadata: Optional metadata for each document
+        
+    Returns:
+        Number of documents indexed
+    """
+    try:
+        _ensure_imports()
+        embeddings = await aembed_texts(documents)
+        
+        with _writable_store() as store:
+            store.add(embeddings, documents, metadata)
         
         return len(documents)
         
@@ -123,8 +448,8 @@ def search_similar(query: str, k: int = 5) -> List[dict]:
 
 def clear_store() -> None:
     """Clear all documents from the vector store."""
-    store = get_vector_store()
-    store.clear()
+    with _writable_store() as store:
+        store.clear()
 
 
 def get_store_stats() -> dict:
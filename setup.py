@@ -5,7 +5,7 @@ setup(
     version="1.0.0",
     description="Enterprise LLMOps RAG System",
     author="Ayorinde",
-    packages=find_packages(),
+    packages=find_packages(exclude=["tests", "tests.*"]),
     python_requires=">=3.11",
     install_requires=[],  # Dependencies are in requirements.txt
 )
@@ -15,16 +15,40 @@ from pathlib import Path
 def run_command(cmd: str, name: str) -> subprocess.Popen:
     """Run a command in background."""
     print(f"🚀 Starting {name}...")
+    # Output goes straight to our terminal: an undrained PIPE would block the
+    # child once the pipe buffer fills
     process = subprocess.Popen(
         cmd,
         shell=True,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
+        stdout=None,
+        stderr=None,
         preexec_fn=os.setsid if hasattr(os, 'setsid') else None
     )
     return process
 
 
+def wait_for_first_exit(processes) -> None:
+    """Block until any of the processes exits."""
+    # poll() reaps only our own children and keeps their exit status on the
+    # Popen objects, unlike os.wait()
+    while all(process.poll() is None for process in processes):
+        time.sleep(0.5)
+
+
+def stop_processes(processes) -> None:
+    """Terminate each process group, ignoring ones that already exited."""
+    for process in processes:
+        try:
+            if hasattr(os, "killpg"):
+                # setsid made each child a group leader, so its pgid is its pid; this
+                # also works after the leader exited (e.g. uvicorn's --reload worker survives it)
+                os.killpg(process.pid, signal.SIGTERM)
+            else:
+                process.terminate()
+        except (ProcessLookupError, OSError):
+            pass
+
+
 def main():
     print("=" * 60)
     print("🤖 Enterprise LLMOps RAG System")
@@ -58,17 +82,15 @@ def main():
     print("Press Ctrl+C to stop...")
     print()
     
+    processes = [api_process, streamlit_process]
     try:
-        # Wait for processes
-        api_process.wait()
-        streamlit_process.wait()
+        # Either service exiting takes the whole system down
+        wait_for_first_exit(processes)
+        print("\n\n⚠️  A service exited, shutting down...")
     except KeyboardInterrupt:
         print("\n\n⏹️  Shutting down...")
-        try:
-            os.killpg(os.getpgid(api_process.pid), signal.SIGTERM)
-            os.killpg(os.getpgid(streamlit_process.pid), signal.SIGTERM)
-        except:
-            pass
+    finally:
+        stop_processes(processes)
         print("✓ Shutdown complete")
 
 
@@ -1,7 +1,32 @@
 import sys
 import os
 
+import numpy as np
+import pytest
+
 # Ensure project root is on sys.path so tests can import package modules
 ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
+
+# Set before any service module reads it, so client construction never fails on a missing key
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def offline_embeddings():
+    """Zero embeddings for the retriever unless a test patches its own, so no test reaches the API."""
+    import services.retriever as retriever
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(retriever, "embed_texts", lambda texts: np.zeros((len(texts), 1536), dtype=np.float32))
+        yield
+
+
+@pytest.fixture(scope="session")
+def client():
+    """One TestClient for the API app, shared by all tests."""
+    from fastapi.testclient import TestClient
+    from api_gateway.main import app
+
+    return TestClient(app)
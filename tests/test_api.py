@@ -4,16 +4,13 @@ from api_gateway.main import app
 import services.llm_service as lsvc
 
 
-client = TestClient(app)
-
-
-def test_health_endpoint():
+def test_health_endpoint(client):
     r = client.get("/health")
     assert r.status_code == 200
     assert r.json().get("status") == "ok"
 
 
-def test_ask_endpoint_mocked(monkeypatch):
+def test_ask_endpoint_mocked(client, monkeypatch):
     # Ensure non-demo mode so API uses LLM service
     monkeypatch.setattr(main, "USE_DEMO_MODE", False)
     # Mock generate_answer to avoid external calls
@@ -25,3 +22,92 @@ def test_ask_endpoint_mocked(monkeypatch):
     assert r.status_code == 200
     data = r.json()
     assert data.get("answer") == "Mocked answer"
+
+
+def test_ask_cache_skips_errors_and_expires_on_clear(client, monkeypatch):
+    from services import redis_cache
+
+    class FakeRedis(dict):
+        def set(self, key, value, ex=None):
+            self[key] = value
+
+        def incr(self, key):
+            self[key] = int(self.get(key, 0)) + 1
+
+    monkeypatch.setattr(redis_cache, "_get_redis", lambda: fake)
+    monkeypatch.setattr(main, "clear_vector_store", lambda: None)
+    monkeypatch.setattr(main, "USE_DEMO_MODE", False)
+    fake = FakeRedis()
+    answers = iter(["Error processing question: outage", "First answer", "Second answer"])
+    monkeypatch.setattr(main, "answer_question", lambda question, k=5, use_rephrasing=False: next(answers))
+
+    assert client.post("/ask", json={"question": "q"}).json()["answer"].startswith("Error")
+    assert client.post("/ask", json={"question": "q"}).json()["answer"] == "First answer"
+    assert client.post("/ask", json={"question": "q"}).json()["answer"] == "First answer"
+    client.post("/clear")
+    assert client.post("/ask", json={"question": "q"}).json()["answer"] == "Second answer"
+
+
+def test_ask_stream_endpoint_mocked(client, monkeypatch):
+    monkeypatch.setattr(main, "USE_DEMO_MODE", False)
+    monkeypatch.setattr(main, "stream_answer_question", lambda question, k=5, use_rephrasing=False: iter(["Mocked ", "answer"]))
+
+    r = client.post("/ask/stream", json={"question": "test"})
+    assert r.status_code == 200
+    assert r.text == "Mocked answer"
+
+
+def test_ask_stream_sse(client, monkeypatch):
+    monkeypatch.setattr(main, "USE_DEMO_MODE", False)
+    monkeypatch.setattr(main, "stream_answer_question", lambda question, k=5, use_rephrasing=False: iter(["line1\n", "line2"]))
+
+    r = client.post("/ask/stream", json={"question": "test"}, headers={"Accept": "text/event-stream"})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/event-stream")
+    assert r.text == 'data: "line1\\n"\n\ndata: "line2"\n\ndata: [DONE]\n\n'
+
+
+def test_upload_job_reports_progress(client, monkeypatch):
+    import time
+
+    indexed = []
+
+    async def fake_index(documents, metadata=None):
+        indexed.extend(documents)
+        return {"status": "success", "indexed_count": len(documents)}
+
+    monkeypatch.setattr(main, "DocumentProcessor", None)
+    monkeypatch.setattr(main, "aindex_knowledge_base", fake_index)
+
+    with TestClient(app) as c:
+        r = c.post("/upload_documents/start", files=[
+            ("files", ("a.txt", b"first doc", "text/plain")),
+            ("files", ("b.txt", b"second doc", "text/plain")),
+        ])
+        assert r.status_code == 200
+        job_id = r.json()["job_id"]
+
+        for _ in range(50):
+            progress = c.get(f"/upload_documents/{job_id}/progress").json()
+            if progress["status"] in ("complete", "error"):
+                break
+            time.sleep(0.05)
+
+    assert progress["status"] == "complete"
+    assert progress["done"] == progress["total"] == 2
+    assert progress["chunks_created"] == 2
+    assert sorted(indexed) == ["first doc", "second doc"]
+    assert client.get("/upload_documents/missing/progress").status_code == 404
+
+
+def test_search_returns_snippets(client, monkeypatch):
+    long_text = "x" * 2000
+    monkeypatch.setattr(main, "search_knowledge_base", lambda query, k=5: [{"text": long_text, "distance": 0.1}])
+
+    r = client.post("/search", json={"query": "test"})
+    result = r.json()["results"][0]
+    assert "text" not in result
+    assert result["snippet"] == long_text[:main.SNIPPET_CHARS]
+
+    r = client.post("/search?include_full=true", json={"query": "test"})
+    assert r.json()["results"][0]["text"] == long_text
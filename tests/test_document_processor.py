@@ -0,0 +1,121 @@
+import pytest
+
+import frontend_streamlit.document_processor as dp
+from frontend_streamlit.document_processor import DocumentProcessor, TextSummarizer
+
+
+@pytest.fixture(autouse=True)
+def ingest_cache(monkeypatch, tmp_path):
+    # Keep the ingest cache out of the working tree
+    monkeypatch.setattr(dp, "INGEST_CACHE_DIR", str(tmp_path / "ingest-cache"))
+    monkeypatch.setattr(dp, "_ingest_cache", None)
+
+
+def test_recursive_chunk_prefers_sentence_boundaries():
+    text = " ".join(f"Sentence number {i} is here." for i in range(40))
+
+    chunks = DocumentProcessor.recursive_chunk(text, chunk_size=100, overlap=10)
+
+    assert all(len(c) <= 100 for c in chunks)
+    # Every chunk but the last ends right after a sentence
+    assert all(c.endswith(". ") for c in chunks[:-1])
+    assert chunks[-1].endswith("here.")
+
+
+def test_recursive_chunk_hard_cuts_without_separators():
+    text = "x" * 250
+
+    chunks = DocumentProcessor.recursive_chunk(text, chunk_size=100, overlap=20)
+
+    assert [len(c) for c in chunks] == [100, 100, 90]
+    assert "".join(c[20:] if i else c for i, c in enumerate(chunks)) == text
+
+
+def test_process_text_keeps_short_text_whole():
+    assert DocumentProcessor.process_text("  short text  ") == ["short text"]
+    assert DocumentProcessor.process_text("   ") == [""]
+
+
+def test_process_bytes_metadata_view_materializes_per_chunk():
+    text = ("word " * 300).encode("utf-8")
+
+    chunks, metadata = DocumentProcessor.process_bytes(text, "notes.txt")
+
+    assert len(metadata) == len(chunks) > 1
+    first, last = metadata[0], metadata[-1]
+    assert first["source"] == "notes.txt"
+    assert first["chunk_index"] == 0 and last["chunk_index"] == len(chunks) - 1
+    assert last["total_chunks"] == len(chunks)
+    assert [m["chunk_size"] for m in metadata] == [len(c) for c in chunks]
+
+
+def test_summarize_text_keeps_document_order():
+    text = "Short one. This is a much longer opening style sentence. Tiny. Another fairly long sentence here"
+
+    summary = TextSummarizer.summarize_text(text, max_sentences=2)
+
+    assert summary == "Short one. This is a much longer opening style sentence."
+
+
+def test_extract_keywords_skips_stop_words_and_short_words():
+    text = "The cache and the CACHE of an index; index cache is ok"
+
+    assert TextSummarizer.extract_keywords(text, num_keywords=2) == ["cache", "index"]
+
+
+def test_recursive_chunk_treats_all_sentence_ends_alike():
+    text = "A" * 60 + ". " + "B" * 20 + "! " + "C" * 40
+
+    chunks = DocumentProcessor.recursive_chunk(text, chunk_size=100, overlap=0)
+
+    assert chunks[0].endswith("! ")
+
+
+def test_process_file_reads_txt_with_universal_newlines(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_bytes("café line one\r\nline two\r\n".encode("utf-8"))
+    (tmp_path / "empty.txt").write_bytes(b"")
+
+    chunks, metadata = DocumentProcessor.process_file(str(path))
+
+    assert chunks == ["café line one\nline two"]
+    assert metadata[0]["source"] == str(path)
+    assert DocumentProcessor.process_file(str(tmp_path / "empty.txt"))[0] == [""]
+
+
+def test_process_directory_parses_files_and_skips_failures(tmp_path):
+    (tmp_path / "a.txt").write_text("alpha document")
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "b.txt").write_text("beta document")
+    (tmp_path / "broken.txt").write_bytes(b"\xff\xfe bad utf-8")
+    (tmp_path / "ignored.csv").write_text("x,y")
+    (tmp_path / "txt").write_text("no suffix")
+    (tmp_path / ".txt").write_text("hidden")
+
+    chunks, metadata = DocumentProcessor.process_directory(str(tmp_path), max_workers=2)
+
+    assert sorted(chunks) == ["alpha document", "beta document"]
+    assert sorted(m["source"] for m in metadata) == sorted(
+        [str(tmp_path / "a.txt"), str(tmp_path / "sub" / "b.txt")]
+    )
+
+
+def test_process_file_reuses_cached_result_until_file_changes(tmp_path, monkeypatch):
+    if dp.DiskCache is None:
+        pytest.skip("diskcache not installed")
+    path = tmp_path / "doc.txt"
+    path.write_text("first version")
+    assert DocumentProcessor.process_file(str(path))[0] == ["first version"]
+
+    parse = DocumentProcessor._parse_file
+    calls = []
+    monkeypatch.setattr(
+        DocumentProcessor, "_parse_file", staticmethod(lambda p: calls.append(p) or parse(p))
+    )
+
+    assert DocumentProcessor.process_file(str(path))[0] == ["first version"]
+    assert calls == []
+
+    path.write_text("second, longer version")
+    assert DocumentProcessor.process_file(str(path))[0] == ["second, longer version"]
+    assert calls == [str(path)]
@@ -1,4 +1,5 @@
 import numpy as np
+import orjson
 import embeddings.embed as embed_mod
 import requests
 
@@ -9,19 +10,20 @@ def test_embed_text_demo(monkeypatch):
         raise TypeError("Client.__init__() got an unexpected keyword argument 'proxies'")
 
     monkeypatch.setattr(embed_mod, "_get_client", fake_get_client)
+    embed_mod.clear_embedding_cache()
 
     class FakeResp:
         def raise_for_status(self):
             return None
 
-        def json(self):
-            return {"data": [{"embedding": [0.1, 0.2, 0.3]}]}
+        content = orjson.dumps({"data": [{"embedding": [0.1, 0.2, 0.3]}]})
 
-    monkeypatch.setattr(requests, "post", lambda *a, **k: FakeResp())
+    monkeypatch.setattr(requests.Session, "post", lambda self, *a, **k: FakeResp())
 
     vec = embed_mod.embed_text("hello")
     assert isinstance(vec, np.ndarray)
     assert vec.shape[0] == 3
+    assert vec.dtype == np.float32
 
 
 def test_embed_texts_batch(monkeypatch):
@@ -34,14 +36,150 @@ def test_embed_texts_batch(monkeypatch):
         def raise_for_status(self):
             return None
 
-        def json(self):
-            return {"data": [
-                {"embedding": [0.1, 0.2, 0.3]},
-                {"embedding": [0.4, 0.5, 0.6]}
-            ]}
+        content = orjson.dumps({"data": [
+            {"embedding": [0.1, 0.2, 0.3]},
+            {"embedding": [0.4, 0.5, 0.6]}
+        ]})
 
-    monkeypatch.setattr(requests, "post", lambda *a, **k: FakeResp())
+    monkeypatch.setattr(requests.Session, "post", lambda self, *a, **k: FakeResp())
 
     vecs = embed_mod.embed_texts(["a", "b"])
     assert isinstance(vecs, np.ndarray)
     assert vecs.shape[0] == 2
+
+
+def test_embed_texts_single_request_per_batch(monkeypatch):
+    calls = []
+
+    class FakeItem:
+        def __init__(self, index, embedding):
+            self.index = index
+            self.embedding = embedding
+
+    class FakeEmbeddings:
+        def create(self, model, input, **kwargs):
+            calls.append(list(input))
+            # Return out of order to check that results are re-sorted by index
+            items = [FakeItem(i, [float(i), 0.0, 0.0]) for i in range(len(input))]
+            return type("Resp", (), {"data": list(reversed(items))})()
+
+    class FakeClient:
+        embeddings = FakeEmbeddings()
+
+    monkeypatch.setattr(embed_mod, "_get_client", lambda: FakeClient())
+
+    vecs = embed_mod.embed_texts(["a", "b", "c"])
+    assert len(calls) == 1
+    assert vecs.shape == (3, 3)
+    assert vecs[:, 0].tolist() == [0.0, 1.0, 2.0]
+
+
+def test_aembed_texts_preserves_order(monkeypatch):
+    import asyncio
+    import json
+    import httpx
+
+    def handler(request):
+        inputs = json.loads(request.content)["input"]
+        data = [{"index": i, "embedding": [float(t), 0.0]} for i, t in enumerate(inputs)]
+        return httpx.Response(200, json={"data": list(reversed(data))})
+
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(httpx, "AsyncClient", lambda **kw: real_client(transport=httpx.MockTransport(handler), **kw))
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+
+    texts = [str(i) for i in range(10)]
+    vecs = asyncio.run(embed_mod.aembed_texts(texts, batch_size=3, concurrency=2))
+    assert vecs.shape == (10, 2)
+    assert vecs[:, 0].tolist() == [float(i) for i in range(10)]
+
+
+def test_aembed_texts_retries_rate_limited_batches(monkeypatch):
+    import asyncio
+    import json
+    import httpx
+
+    attempts = []
+
+    def handler(request):
+        attempts.append(json.loads(request.content)["input"])
+        if len(attempts) == 1:
+            return httpx.Response(429, json={"error": {"message": "slow down"}})
+        return httpx.Response(200, json={"data": [{"index": 0, "embedding": [1.0, 2.0]}]})
+
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(httpx, "AsyncClient", lambda **kw: real_client(transport=httpx.MockTransport(handler), **kw))
+    monkeypatch.setattr(embed_mod, "EMBED_RETRY_BACKOFF", 0)
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+
+    vecs = asyncio.run(embed_mod.aembed_texts(["a"]))
+    assert attempts == [["a"], ["a"]]
+    assert vecs.tolist() == [[1.0, 2.0]]
+
+
+def test_embed_text_decodes_base64(monkeypatch):
+    import base64
+
+    expected = np.array([0.25, -1.5, 3.0], dtype=np.float32)
+    seen = {}
+
+    class FakeEmbeddings:
+        def create(self, model, input, encoding_format=None):
+            seen["encoding_format"] = encoding_format
+            item = type("Item", (), {"index": 0, "embedding": base64.b64encode(expected.tobytes()).decode()})()
+            return type("Resp", (), {"data": [item]})()
+
+    class FakeClient:
+        embeddings = FakeEmbeddings()
+
+    monkeypatch.setattr(embed_mod, "_get_client", lambda: FakeClient())
+    embed_mod.clear_embedding_cache()
+
+    vec = embed_mod.embed_text("hello")
+    assert seen["encoding_format"] == "base64"
+    assert np.array_equal(vec, expected)
+
+
+def test_embed_text_uses_cache(monkeypatch):
+    calls = []
+
+    class FakeEmbeddings:
+        def create(self, model, input, encoding_format=None):
+            calls.append(input)
+            item = type("Item", (), {"index": 0, "embedding": [1.0, 2.0]})()
+            return type("Resp", (), {"data": [item]})()
+
+    class FakeClient:
+        embeddings = FakeEmbeddings()
+
+    monkeypatch.setattr(embed_mod, "_get_client", lambda: FakeClient())
+    embed_mod.clear_embedding_cache()
+
+    first = embed_mod.embed_text("repeat me")
+    first[0] = 99.0  # callers must not be able to corrupt the cache
+    second = embed_mod.embed_text("repeat me")
+    assert calls == ["repeat me"]
+    assert second.tolist() == [1.0, 2.0]
+
+
+def test_sqeuclidean_distances_match_numpy():
+    from embeddings.similarity import sqeuclidean_distances
+
+    rng = np.random.default_rng(7)
+    mat = rng.normal(size=(50, 32)).astype(np.float32)
+    q = rng.normal(size=32).astype(np.float32)
+    np.testing.assert_allclose(sqeuclidean_distances(q, mat), ((mat - q) ** 2).sum(axis=1), rtol=1e-4)
+
+
+def test_quantized_sqeuclidean_paths_agree(monkeypatch):
+    from embeddings import similarity
+
+    rng = np.random.default_rng(3)
+    codes = rng.integers(-127, 128, size=(5000, 24), dtype=np.int8)
+    q = rng.integers(-127, 128, size=24, dtype=np.int8)
+    expected = ((codes.astype(np.int32) - q.astype(np.int32)) ** 2).sum(axis=1)
+
+    monkeypatch.setattr(similarity, "SIMSIMD_AVAILABLE", False)
+    np.testing.assert_allclose(similarity.quantized_sqeuclidean_distances(q, codes), expected)
+    monkeypatch.setattr(similarity, "NUMBA_AVAILABLE", False)
+    np.testing.assert_allclose(similarity.quantized_sqeuclidean_distances(q, codes), expected)
@@ -0,0 +1,450 @@
+import numpy as np
+import pytest
+from vector_store.faiss_store import FaissStore
+
+
+def _random(n, dim=16, seed=0):
+    return np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+
+
+def test_add_and_search_returns_nearest(tmp_path):
+    store = FaissStore(dim=16, path=str(tmp_path / "test.index"))
+    vecs = _random(20)
+    store.add(vecs, [f"doc{i}" for i in range(20)])
+
+    texts, distances, indices = store.search(vecs[7], k=3)
+    assert indices[0] == 7
+    assert texts[0] == "doc7"
+    assert distances == sorted(distances)
+
+
+def test_flat_index_upgrades_to_ivf_sq8_at_threshold(tmp_path):
+    store = FaissStore(dim=16, path=str(tmp_path / "test.index"), ivf_threshold=400)
+    vecs = _random(400)
+    store.add(vecs[:200], [f"doc{i}" for i in range(200)])
+    assert store.get_stats()["index_type"] in ("FlatL2", "numpy_fallback")
+
+    store.add(vecs[200:], [f"doc{i}" for i in range(200, 400)])
+    assert store.get_stats()["index_type"] in ("IVFSQ8", "numpy_fallback")
+    assert len(store) == 400
+
+    _, _, indices = store.search(vecs[123], k=1)
+    assert indices[0] == 123
+
+    reloaded = FaissStore(dim=16, path=str(tmp_path / "test.index"), ivf_threshold=400)
+    assert reloaded.get_stats()["index_type"] == store.get_stats()["index_type"]
+
+
+def test_batch_search_matches_single_searches(tmp_path):
+    store = FaissStore(dim=16, path=str(tmp_path / "test.index"))
+    vecs = _random(30)
+    store.add(vecs, [f"doc{i}" for i in range(30)])
+
+    batched = store.search_batch_with_metadata(vecs[[3, 11, 29]], k=4)
+
+    assert len(batched) == 3
+    for q, results in zip([3, 11, 29], batched):
+        single = store.search_with_metadata(vecs[q], k=4)
+        assert [r["index"] for r in results] == [r["index"] for r in single]
+        assert results[0]["text"] == f"doc{q}"
+
+
+def test_quantized_index_types_find_nearest(tmp_path):
+    vecs = _random(400)
+
+    sq8 = FaissStore(dim=16, path=str(tmp_path / "sq8.index"), index_type="sq8")
+    sq8.add(vecs, [f"doc{i}" for i in range(400)])
+    assert sq8.get_stats()["index_type"] in ("SQ8", "numpy_fallback")
+    assert sq8.search(vecs[42], k=1)[2][0] == 42
+
+    pq = FaissStore(dim=16, path=str(tmp_path / "pq.index"), index_type="ivfpq", nlist=4, pq_m=4, nprobe=4)
+    pq.add(vecs[:100], [f"doc{i}" for i in range(100)])
+    assert pq.get_stats()["index_type"] in ("FlatL2", "numpy_fallback")
+    pq.add(vecs[100:], [f"doc{i}" for i in range(100, 400)])
+    assert pq.get_stats()["index_type"] in ("IVFPQ", "numpy_fallback")
+    assert 42 in pq.search(vecs[42], k=5)[2]
+
+
+def test_choose_index_spec_and_factory_layouts(tmp_path):
+    from vector_store.faiss_store import choose_index_spec
+
+    assert choose_index_spec(10_000, 1536) == "Flat"
+    assert choose_index_spec(200_000, 1536) == "HNSW32"
+    assert choose_index_spec(4_000_000, 1536) == "IVF8000,PQ192x8"
+
+    vecs = _random(400)
+    hnsw = FaissStore(dim=16, path=str(tmp_path / "hnsw.index"), expected_size=200_000)
+    hnsw.add(vecs, [f"doc{i}" for i in range(400)])
+    assert hnsw.get_stats()["index_type"] in ("HNSW", "numpy_fallback")
+    assert hnsw.search(vecs[42], k=1)[2][0] == 42
+
+    ivf = FaissStore(dim=16, path=str(tmp_path / "ivf.index"), spec="IVF4,PQ4x8", nprobe=4)
+    ivf.add(vecs[:100], [f"doc{i}" for i in range(100)])
+    assert ivf.get_stats()["index_type"] in ("FlatL2", "numpy_fallback")
+    ivf.add(vecs[100:], [f"doc{i}" for i in range(100, 400)])
+    assert ivf.get_stats()["index_type"] in ("IVFPQ", "numpy_fallback")
+    assert 42 in ivf.search(vecs[42], k=5)[2]
+
+
+def test_read_only_store_mmaps_and_tracks_writes(tmp_path):
+    from vector_store.faiss_store import index_lock
+
+    path = str(tmp_path / "shared.index")
+    writer = FaissStore(dim=8, path=path)
+    rng = np.random.default_rng(0)
+    writer.add(rng.random((10, 8), dtype=np.float32), [f"t{i}" for i in range(10)])
+
+    with index_lock(path, exclusive=False):
+        reader = FaissStore(dim=8, path=path, read_only=True)
+    assert len(reader) == 10
+    assert isinstance(reader.embeddings, np.memmap)
+    assert reader.search_with_metadata(writer.embeddings[3:4], k=1)[0]["text"] == "t3"
+    with pytest.raises(RuntimeError):
+        reader.add(rng.random((1, 8), dtype=np.float32), ["x"])
+    assert not reader.changed_on_disk()
+
+    with index_lock(path):
+        FaissStore(dim=8, path=path).add(rng.random((2, 8), dtype=np.float32), ["a", "b"])
+    assert reader.changed_on_disk()
+    assert len(FaissStore(dim=8, path=path, read_only=True)) == 12
+
+
+def test_incremental_adds_match_brute_force_distances(tmp_path):
+    store = FaissStore(dim=16, path=str(tmp_path / "bf.index"))
+    data = _random(300, seed=3)
+    store.add(data[:120], [f"t{i}" for i in range(120)], persist=False)
+    store.add(data[120:], [f"t{i}" for i in range(120, 300)], persist=False)
+    query = _random(1, seed=4)
+
+    _, distances, indices = store.search(query, k=7)
+
+    expected = ((data - query) ** 2).sum(axis=1)
+    assert indices == np.argsort(expected)[:7].tolist()
+    assert distances == sorted(distances)
+
+
+def test_search_with_k_larger_than_store_returns_only_real_hits(tmp_path):
+    store = FaissStore(dim=16, path=str(tmp_path / "small.index"))
+    data = _random(3, seed=5)
+    store.add(data, ["a", "b", "c"], persist=False)
+
+    texts, distances, indices = store.search(data[1:2], k=10)
+
+    assert sorted(indices) == [0, 1, 2]
+    assert texts[0] == "b"
+    assert distances == sorted(distances)
+
+
+def test_repeated_adds_grow_buffer_geometrically(tmp_path):
+    store = FaissStore(dim=16, path=str(tmp_path / "test.index"))
+    vecs = _random(100)
+    buffers = set()
+    for start in range(0, 100, 5):
+        store.add(vecs[start:start + 5], [f"doc{i}" for i in range(start, start + 5)], persist=False)
+        buffers.add(id(store._buf))
+
+    np.testing.assert_array_equal(store.embeddings, vecs)
+    assert len(buffers) <= 6
+    assert store.search(vecs[63], k=1)[2][0] == 63
+
+
+def test_debounced_store_saves_on_flush_or_threshold(tmp_path):
+    path = str(tmp_path / "test.index")
+    store = FaissStore(dim=16, path=path, flush_interval=3600, flush_every=10)
+    vecs = _random(14)
+    store.add(vecs[:4], [f"doc{i}" for i in range(4)])
+    assert len(FaissStore(dim=16, path=path).texts) == 0
+
+    store.flush()
+    assert len(FaissStore(dim=16, path=path).texts) == 4
+
+    store.add(vecs[4:], [f"doc{i}" for i in range(4, 14)])
+    assert len(FaissStore(dim=16, path=path).texts) == 14
+    assert not store._dirty
+
+
+def test_query_cache_serves_repeats_and_invalidates_on_write(tmp_path):
+    store = FaissStore(dim=16, path=str(tmp_path / "test.index"), cache_size=8)
+    vecs = _random(20)
+    store.add(vecs[:10], [f"doc{i}" for i in range(10)])
+
+    first = store.search(vecs[15], k=3)
+    assert store.search(vecs[15], k=3) == first
+    assert store.get_stats()["query_cache"]["hits"] == 1
+
+    store.add(vecs[10:], [f"doc{i}" for i in range(10, 20)])
+    assert store.search(vecs[15], k=3)[2][0] == 15
+
+
+def test_query_cache_expires_and_evicts():
+    from vector_store.query_cache import QueryCache
+
+    cache = QueryCache(max_size=2, ttl_seconds=0)
+    cache.put("a", 1)
+    assert cache.get("a") is None
+
+    cache = QueryCache(max_size=2)
+    for key in "abc":
+        cache.put(key, key)
+    assert cache.get("a") is None and cache.get("c") == "c"
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_batch_search_serves_cached_rows_and_validates_shape(tmp_path):
+    store = FaissStore(dim=16, path=str(tmp_path / "test.index"))
+    vecs = _random(30)
+    store.add(vecs, [f"doc{i}" for i in range(30)])
+    single = store.search(vecs[4], k=3)
+
+    texts, distances, indices = store.batch_search(vecs[[4, 9]], k=3)
+
+    assert (texts[0], distances[0], indices[0]) == single
+    assert indices[1][0] == 9 and texts[1][0] == "doc9"
+    assert store.get_stats()["query_cache"]["hits"] == 1
+    with pytest.raises(ValueError):
+        store.batch_search(np.zeros((2, 8), dtype=np.float32))
+
+
+@pytest.mark.parametrize("storage_dtype", ["fp16", "int8"])
+def test_quantized_storage_finds_nearest_and_reloads(tmp_path, storage_dtype):
+    path = str(tmp_path / f"{storage_dtype}.index")
+    vecs = _random(300)
+    store = FaissStore(dim=16, path=path, storage_dtype=storage_dtype)
+    store.add(vecs, [f"doc{i}" for i in range(300)])
+    expected = {"fp16": ("SQfp16", np.float16), "int8": ("SQ8", np.int8)}[storage_dtype]
+    if store.get_stats()["index_type"] == "numpy_fallback":
+        assert store.embeddings.dtype == expected[1]
+    else:
+        assert store.get_stats()["index_type"] == expected[0]
+    assert store.search(vecs[42], k=1)[2][0] == 42
+    assert store.batch_search(vecs[[7, 8]], k=1)[2] == [[7], [8]]
+
+    reloaded = FaissStore(dim=16, path=path, storage_dtype=storage_dtype, cache_size=0)
+    assert reloaded.search(vecs[42], k=3)[2] == store.search(vecs[42], k=3)[2]
+    with pytest.raises(ValueError):
+        FaissStore(dim=16, path=path, storage_dtype="bf16")
+
+
+def test_records_round_trip_and_legacy_pickles_load(tmp_path):
+    import pickle
+
+    path = str(tmp_path / "test.index")
+    vecs = _random(6)
+    store = FaissStore(dim=16, path=path)
+    store.add(vecs[:3], ["a", "b", "c"], [{"source": "x.pdf"}, {}, {"page": 2}])
+    reloaded = FaissStore(dim=16, path=path)
+    reloaded.add(vecs[3:], ["d", "e", "f"])
+    reloaded.delete(1)
+
+    again = FaissStore(dim=16, path=path)
+    assert list(again.texts) == ["a", "b", "c", "d", "e", "f"]
+    assert again.texts[-1] == "f" and again.texts[1:3] == ["b", "c"]
+    assert again.metadata[0] == {"source": "x.pdf"} and again.metadata[1] == {"_deleted": True}
+
+    legacy = str(tmp_path / "legacy.index")
+    with open(f"{legacy}.texts", "wb") as f:
+        pickle.dump(["old"], f)
+    with open(f"{legacy}.metadata", "wb") as f:
+        pickle.dump([{"v": 1}], f)
+    from vector_store.faiss_store import _load_records
+    assert _load_records(legacy) == (["old"], [{"v": 1}])
+
+
+def test_ivfpq_search_params_survive_rebuild_and_reload(tmp_path):
+    path = str(tmp_path / "pq.index")
+    vecs = _random(400)
+    store = FaissStore(dim=16, path=path, index_type="ivfpq", nlist=4, pq_m=4, nprobe=3, use_precomputed_table=1)
+    store.add(vecs, [f"doc{i}" for i in range(400)])
+    if store.get_stats()["index_type"] == "numpy_fallback":
+        pytest.skip("search parameters only apply to FAISS indexes")
+
+    assert store.get_stats()["search_params"] == {"nprobe": 3, "nlist": 4, "use_precomputed_table": 1}
+    reloaded = FaissStore(dim=16, path=path, nprobe=2, use_precomputed_table=-1)
+    assert reloaded.get_stats()["search_params"]["nprobe"] == 2
+    assert reloaded.get_stats()["search_params"]["use_precomputed_table"] == -1
+    assert 42 in reloaded.search(vecs[42], k=5)[2]
+
+
+def test_deleted_rows_are_filtered_then_compacted(tmp_path):
+    path = str(tmp_path / "test.index")
+    vecs = _random(10)
+    store = FaissStore(dim=16, path=path)
+    store.add(vecs, [f"doc{i}" for i in range(10)])
+
+    store.delete(3)
+    assert 3 not in store.search(vecs[3], k=10)[2]
+    assert len(store.search(vecs[3], k=10)[2]) == 9
+    assert all(3 not in row for row in store.batch_search(vecs[[3, 4]], k=3)[2])
+    assert 3 not in FaissStore(dim=16, path=path).search(vecs[3], k=5)[2]
+
+    store.delete(4)
+    store.delete(5)
+    assert len(store) == 7 and len(store.texts) == 7
+    assert "doc5" not in store.texts
+    assert store.search(vecs[6], k=1)[0] == ["doc6"]
+    if store.get_stats()["index_type"] == "numpy_fallback":
+        live = np.delete(vecs, [3, 4, 5], axis=0)
+        np.testing.assert_allclose(store._get_sqnorms(), (live ** 2).sum(axis=1), rtol=1e-5)
+
+
+def test_writable_store_maps_embeddings_until_first_add(tmp_path):
+    from vector_store import faiss_store
+
+    path = str(tmp_path / "test.index")
+    vecs = _random(12)
+    FaissStore(dim=16, path=path).add(vecs[:6], [f"doc{i}" for i in range(6)])
+
+    store = FaissStore(dim=16, path=path)
+    if faiss_store.MMAP_EMBEDDINGS:
+        assert isinstance(store.embeddings, np.memmap)
+    assert store.search(vecs[2], k=1)[2] == [2]
+    store.add(vecs[6:], [f"doc{i}" for i in range(6, 12)])
+    assert not isinstance(store.embeddings, np.memmap)
+    np.testing.assert_array_equal(FaissStore(dim=16, path=path).embeddings, vecs)
+
+
+def test_cuda_device_falls_back_to_cpu_without_gpu(tmp_path):
+    store = FaissStore(dim=16, path=str(tmp_path / "test.index"), device="cuda")
+    vecs = _random(20)
+    store.add(vecs, [f"doc{i}" for i in range(20)])
+    assert store.search(vecs[5], k=1)[2] == [5]
+    with pytest.raises(ValueError):
+        FaissStore(dim=16, path=str(tmp_path / "other.index"), device="tpu")
+
+
+def test_records_fall_back_to_orjson_without_pyarrow(tmp_path, monkeypatch):
+    from vector_store import faiss_store
+
+    path = str(tmp_path / "test.index")
+    store = FaissStore(dim=16, path=path)
+    store.add(_random(2), ["a", "b"], [{"source": "x"}, {}])
+
+    monkeypatch.setattr(faiss_store, "PYARROW_AVAILABLE", False)
+    store.save()
+    assert not (tmp_path / "test.index.records").exists()
+    assert faiss_store._load_records(path) == (["a", "b"], [{"source": "x"}, {}])
+
+
+def test_gather_texts_handles_columns_tails_and_out_of_range():
+    from vector_store.faiss_store import PYARROW_AVAILABLE, TextColumn, _gather_text_rows, _gather_texts
+
+    assert _gather_texts(["a", "b", "c"], [2, 0]) == ["c", "a"]
+    assert _gather_texts(["a", "b"], [1]) == ["b"]
+    assert _gather_texts(["a"], [0, 5]) == ["a", ""]
+    assert _gather_text_rows(["a", "b", "c"], [[2], [], [0, 1]]) == [["c"], [], ["a", "b"]]
+    if PYARROW_AVAILABLE:
+        import pyarrow as pa
+
+        column = TextColumn(pa.chunked_array([pa.array(["a", "b"], type=pa.large_string())]))
+        column.extend(["c"])
+        assert _gather_texts(column, [1, 0]) == ["b", "a"]
+        assert _gather_texts(column, [2, 1]) == ["c", "b"]
+
+
+def test_as_rows_reuses_float32_input_and_accepts_single_vectors(tmp_path):
+    from vector_store.faiss_store import _as_rows
+
+    vecs = _random(4)
+    assert np.shares_memory(_as_rows(vecs, 16), vecs)
+    assert _as_rows(vecs[0], 16).shape == (1, 16)
+    assert _as_rows(vecs.astype(np.float64), 16).dtype == np.float32
+    with pytest.raises(ValueError):
+        _as_rows(vecs, 8)
+
+    store = FaissStore(dim=16, path=str(tmp_path / "test.index"))
+    store.add(vecs[0], ["doc0"])
+    assert len(store) == 1
+
+
+def test_use_ivf_trains_on_a_sample_once_enough_vectors_arrive(tmp_path):
+    faiss = pytest.importorskip("faiss")
+    store = FaissStore(dim=16, path=str(tmp_path / "test.index"), use_ivf=True, expected_size=100)
+    vecs = _random(1700)
+    store.add(vecs[:100], [f"doc{i}" for i in range(100)])
+    assert isinstance(store.index, faiss.IndexFlatL2)
+
+    store.add(vecs[100:], [f"doc{i}" for i in range(100, 1700)])
+    ivf = faiss.extract_index_ivf(store.index)
+    assert ivf.nlist == 40 and ivf.is_trained
+    assert store.index.ntotal == 1700
+    texts, _, _ = store.search(vecs[1234], k=1)
+    assert texts == ["doc1234"]
+
+
+def test_concurrent_search_matches_batch_search(tmp_path):
+    store = FaissStore(dim=16, path=str(tmp_path / "test.index"), cache_size=0, search_threads=1)
+    vecs = _random(200)
+    store.add(vecs, [f"doc{i}" for i in range(200)])
+
+    queries = [vecs[i] for i in range(0, 200, 7)]
+    assert store.concurrent_search(queries, k=3) == store.batch_search(np.stack(queries), k=3)
+    assert store.concurrent_search(queries, k=3)[0][5][0] == "doc35"
+
+
+def test_sq8_fits_its_range_on_a_sample_not_the_first_add(tmp_path):
+    store = FaissStore(dim=16, path=str(tmp_path / "test.index"), index_type="sq8", cache_size=0)
+    vecs = _random(300)
+    store.add(vecs[:1], ["doc0"])
+    assert store.get_stats()["index_type"] in ("FlatL2", "numpy_fallback")
+    store.add(vecs[1:], [f"doc{i}" for i in range(1, 300)])
+    assert store.get_stats()["index_type"] in ("SQ8", "numpy_fallback")
+    hits = sum(store.search(vecs[i], k=1)[2][0] == i for i in range(100))
+    assert hits >= 95
+
+
+def test_int8_fallback_widens_its_range_after_a_small_first_add(tmp_path):
+    import vector_store.faiss_store as faiss_store
+
+    if faiss_store.FAISS_AVAILABLE:
+        pytest.skip("int8 codes are kept by the numpy fallback only")
+    store = FaissStore(dim=16, path=str(tmp_path / "test.index"), storage_dtype="int8", cache_size=0)
+    # Small components, like those of unit-norm embeddings
+    vecs = _random(300) * 0.05
+    store.add(vecs[:1], ["doc0"])
+    store.add(vecs[1:], [f"doc{i}" for i in range(1, 300)])
+    hits = sum(store.search(vecs[i], k=1)[2][0] == i for i in range(100))
+    assert hits >= 95
+
+    store.add(vecs[:10] * 3, [f"big{i}" for i in range(10)])
+    assert store.search(vecs[4] * 3, k=1)[0] == ["big4"]
+    assert store.search(vecs[42], k=1)[2] == [42]
+
+
+def test_int8_fallback_range_widening_does_not_drift_early_rows(tmp_path):
+    import vector_store.faiss_store as faiss_store
+
+    if faiss_store.FAISS_AVAILABLE:
+        pytest.skip("int8 codes are kept by the numpy fallback only")
+    store = FaissStore(dim=16, path=str(tmp_path / "test.index"), storage_dtype="int8", cache_size=0)
+    vecs = _random(200) * 0.05
+    store.add(vecs, [f"doc{i}" for i in range(200)])
+    original = store._decode(store.embeddings[:200]).copy()
+    # Each batch reaches a little past the range seen so far
+    for step in range(1, 61):
+        store.add(_random(2, seed=step) * 0.05 * 1.03 ** step, [f"grow{step}a", f"grow{step}b"])
+
+    drift = np.abs(store._decode(store.embeddings[:200]) - original).max()
+    assert drift <= store._scale
+    hits = sum(store.search(vecs[i], k=1)[2][0] == i for i in range(100))
+    assert hits >= 95
+
+
+@pytest.mark.parametrize("in_index_filter", [True, False])
+def test_deleted_neighbours_do_not_starve_results(tmp_path, monkeypatch, in_index_filter):
+    import vector_store.faiss_store as faiss_store
+
+    vecs = _random(100)
+    store = FaissStore(dim=16, path=str(tmp_path / "test.index"), cache_size=0)
+    store.add(vecs, [f"doc{i}" for i in range(100)])
+    if not in_index_filter:
+        if not faiss_store.FAISS_AVAILABLE:
+            pytest.skip("over-fetch path is FAISS-only")
+        # GPU indexes take no ID selector and fall back to a bounded over-fetch
+        monkeypatch.setattr(faiss_store, "_is_gpu_index", lambda index: True)
+    nearest = np.argsort(((vecs - vecs[0]) ** 2).sum(axis=1))[:15]
+    for i in nearest:
+        store.delete(int(i))
+
+    expected = np.argsort(((vecs - vecs[0]) ** 2).sum(axis=1))[15:20].tolist()
+    assert store.search(vecs[0], k=5)[2] == expected
+    assert store.batch_search(vecs[[0, 1]], k=5)[2][0] == expected
@@ -0,0 +1,50 @@
+import json
+
+import services.llm_batch as llm_batch
+
+
+class FakeResp:
+    def __init__(self, payload=None, content=b""):
+        self._payload = payload
+        self.content = content
+
+    def raise_for_status(self):
+        return None
+
+    def json(self):
+        return self._payload
+
+
+def test_answer_offline_submits_jsonl_and_maps_results(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    uploaded = {}
+    statuses = iter(["validating", "in_progress", "completed"])
+
+    def fake_post(url, **kwargs):
+        if url.endswith("/files"):
+            uploaded["lines"] = [json.loads(l) for l in kwargs["files"]["file"][1].splitlines()]
+            return FakeResp({"id": "file-in"})
+        uploaded["batch"] = json.loads(kwargs["data"])
+        return FakeResp({"id": "batch-1"})
+
+    def fake_get(url, **kwargs):
+        if url.endswith("/batches/batch-1"):
+            return FakeResp({"status": next(statuses), "output_file_id": "file-out", "error_file_id": "file-err"})
+        if url.endswith("/files/file-out/content"):
+            out = {"custom_id": "q0", "response": {"status_code": 200, "body": {"choices": [{"message": {"content": "A0"}}]}}}
+            return FakeResp(content=json.dumps(out).encode() + b"\n")
+        err = {"custom_id": "q1", "response": None, "error": {"message": "rate limited"}}
+        return FakeResp(content=json.dumps(err).encode())
+
+    monkeypatch.setattr(llm_batch.requests, "post", fake_post)
+    monkeypatch.setattr(llm_batch.requests, "get", fake_get)
+    monkeypatch.setattr(llm_batch.time, "sleep", lambda s: None)
+
+    answers = llm_batch.answer_offline([("Q0?", "ctx0"), ("Q1?", "ctx1"), ("Q2?", "ctx2")])
+
+    assert [line["custom_id"] for line in uploaded["lines"]] == ["q0", "q1", "q2"]
+    assert uploaded["lines"][0]["url"] == "/v1/chat/completions"
+    assert uploaded["batch"] == {"input_file_id": "file-in", "endpoint": "/v1/chat/completions", "completion_window": "24h"}
+    assert answers[0] == "A0"
+    assert answers[1] == "Error generating answer: rate limited"
+    assert answers[2].startswith("Error generating answer:")
@@ -1,3 +1,4 @@
+import orjson
 import services.llm_service as lsvc
 
 
@@ -18,11 +19,182 @@ def test_generate_answer_fallback_http(monkeypatch):
         def raise_for_status(self):
             return None
 
-        def json(self):
-            return {"choices": [{"message": {"content": "Fallback answer"}}]}
+        content = orjson.dumps({"choices": [{"message": {"content": "Fallback answer"}}]})
 
-    monkeypatch.setattr(lsvc, "requests", lsvc.requests)
-    monkeypatch.setattr(lsvc.requests, "post", lambda *a, **k: FakeResp())
+    class FakeSession:
+        def post(self, *a, **k):
+            return FakeResp()
+
+    monkeypatch.setattr(lsvc, "_get_http_session", lambda: FakeSession())
 
     ans = lsvc.generate_answer("Q?", "ctx")
     assert "Fallback answer" in ans
+
+
+def test_a_generate_many_preserves_order_and_isolates_failures(monkeypatch):
+    import asyncio
+    import json
+    import httpx
+
+    def handler(request):
+        question = json.loads(request.content)["messages"][1]["content"].split("Question: ")[1].split("\n")[0]
+        if question == "bad":
+            return httpx.Response(500, json={"error": "boom"})
+        return httpx.Response(200, json={"choices": [{"message": {"content": f"answer to {question}"}}]})
+
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(httpx, "AsyncClient", lambda **kw: real_client(transport=httpx.MockTransport(handler), **kw))
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+
+    answers = asyncio.run(lsvc.a_generate_many(["q1", "bad", "q3"], ["c1", "c2", "c3"], concurrency=2))
+
+    assert answers[0] == "answer to q1"
+    assert answers[1].startswith("Error generating answer:")
+    assert answers[2] == "answer to q3"
+
+
+def test_llm_cache_serves_exact_and_paraphrased_questions(monkeypatch):
+    import numpy as np
+    import services.llm_cache as llm_cache
+
+    vectors = {
+        "What is RAG?": np.array([1.0, 0.0, 0.0]),
+        "what is rag": np.array([0.99, 0.05, 0.0]),
+        "Who wrote it?": np.array([0.0, 1.0, 0.0]),
+    }
+    cache = llm_cache.LLMCache(capacity=4, embed_fn=lambda q: vectors[q])
+    monkeypatch.setattr(llm_cache, "get_llm_cache", lambda: cache)
+
+    calls = []
+
+    def fake_generate(question, context, model, temperature):
+        calls.append(question)
+        return f"answer:{question}"
+
+    monkeypatch.setattr(lsvc, "_generate_answer_uncached", fake_generate)
+
+    assert lsvc.generate_answer("What is RAG?", "ctx", temperature=0.0) == "answer:What is RAG?"
+    assert lsvc.generate_answer("What is RAG?", "ctx", temperature=0.0) == "answer:What is RAG?"
+    assert lsvc.generate_answer("what is rag", "ctx", temperature=0.0) == "answer:What is RAG?"
+    # Different context or dissimilar question goes to the model
+    assert lsvc.generate_answer("what is rag", "other ctx", temperature=0.0) == "answer:what is rag"
+    assert lsvc.generate_answer("Who wrote it?", "ctx", temperature=0.0) == "answer:Who wrote it?"
+
+    assert calls == ["What is RAG?", "what is rag", "Who wrote it?"]
+    assert cache.get_stats()["semantic_hits"] == 1
+
+
+def test_agenerate_answer_uses_llm_cache_and_skips_errors(monkeypatch):
+    import asyncio
+    import services.llm_cache as llm_cache
+
+    cache = llm_cache.LLMCache(capacity=4, embed_fn=lambda q: [1.0, 0.0])
+    monkeypatch.setattr(llm_cache, "get_llm_cache", lambda: cache)
+    answers = iter(["Error generating answer: outage", "fresh", "unused"])
+
+    async def fake_agenerate(question, context, model, temperature):
+        return next(answers)
+
+    monkeypatch.setattr(lsvc, "_agenerate_answer_uncached", fake_agenerate)
+
+    async def ask():
+        return await lsvc.agenerate_answer("q", "ctx", temperature=0.0)
+
+    assert asyncio.run(ask()).startswith("Error")
+    assert asyncio.run(ask()) == "fresh"
+    assert asyncio.run(ask()) == "fresh"
+    assert cache.get_stats()["exact_hits"] == 1
+
+
+def test_generate_answers_batched_maps_ids_and_falls_back(monkeypatch):
+    import json
+    import httpx
+
+    requests_seen = []
+
+    def handler(request):
+        body = json.loads(request.content)
+        items = json.loads(body["messages"][1]["content"])
+        requests_seen.append([item["id"] for item in items])
+        if items[0]["question"] == "broken":
+            return httpx.Response(200, json={"choices": [{"message": {"content": "not json"}}]})
+        answers = [{"id": item["id"], "answer": f"A:{item['question']}"} for item in reversed(items)]
+        return httpx.Response(200, json={"choices": [{"message": {"content": json.dumps({"answers": answers})}}]})
+
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(httpx, "AsyncClient", lambda **kw: real_client(transport=httpx.MockTransport(handler), **kw))
+    monkeypatch.setattr(lsvc, "generate_answer", lambda q, c, *a, **k: f"single:{q}")
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+
+    qas = [("q1", "c"), ("q2", "c"), ("broken", "c"), ("q4", "c")]
+    answers = lsvc.generate_answers_batched(qas, batch_size=2)
+
+    assert sorted(requests_seen) == [["q1", "q2"], ["q3", "q4"]]
+    assert answers == ["A:q1", "A:q2", "single:broken", "single:q4"]
+
+
+def test_stream_answer_http_fallback_parses_sse(monkeypatch):
+    from types import SimpleNamespace
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+
+    def broken_client():
+        raise TypeError("unexpected keyword argument 'proxies'")
+
+    class FakeStreamResp:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def raise_for_status(self):
+            return None
+
+        def iter_lines(self):
+            yield b'data: {"choices": [{"delta": {"role": "assistant"}}]}'
+            yield b""
+            yield b'data: {"choices": [{"delta": {"content": "Hel"}}]}'
+            yield b'data: {"choices": [{"delta": {"content": "lo"}}]}'
+            yield b"data: [DONE]"
+            yield b'data: {"choices": [{"delta": {"content": "ignored"}}]}'
+
+    calls = {}
+
+    def fake_post(url, **kwargs):
+        calls.update(kwargs)
+        return FakeStreamResp()
+
+    monkeypatch.setattr(lsvc, "_get_client", broken_client)
+    monkeypatch.setattr(lsvc, "_get_http_session", lambda: SimpleNamespace(post=fake_post))
+
+    assert list(lsvc.stream_answer("Q?", "ctx")) == ["Hel", "lo"]
+    assert calls["stream"] is True
+
+
+def test_fallback_session_is_pooled_and_retries_posts():
+    session = lsvc._get_http_session()
+    assert lsvc._get_http_session() is session
+    adapter = session.get_adapter("https://api.openai.com/v1/chat/completions")
+    assert adapter._pool_maxsize == lsvc.HTTP_POOL_MAXSIZE
+    assert adapter.max_retries.total == lsvc.HTTP_MAX_RETRIES
+    assert adapter.max_retries.is_retry("POST", 429)
+
+
+def test_client_pool_uses_configured_limits(monkeypatch):
+    monkeypatch.setattr(lsvc, "_client", None)
+    monkeypatch.setattr(lsvc, "_get_api_key", lambda: "test")
+    pool = lsvc._get_client()._client._transport._pool
+    assert pool._max_connections == lsvc.CLIENT_MAX_CONNECTIONS
+    assert pool._max_keepalive_connections == lsvc.CLIENT_MAX_KEEPALIVE
+
+
+def test_extract_keywords_heuristic_in_demo_and_on_failure(monkeypatch):
+    text = "The RAG, pipeline: chunks documents... then indexes them! Über-fast 1234 indexing"
+    assert lsvc.extract_keywords(text, use_demo=True) == ["pipeline", "chunks", "documents", "then", "indexes"]
+
+    def failing_chat(*a, **k):
+        raise RuntimeError("API down")
+
+    monkeypatch.setattr(lsvc, "_call_chat", failing_chat)
+    assert lsvc.extract_keywords("Über-fast indexing", use_demo=False) == ["über", "fast", "indexing"]
@@ -0,0 +1,101 @@
+import numpy as np
+import services.llm_service as lsvc
+from rag_engine import RAGConfig, RAGEngine
+
+
+def test_batch_ask_embeds_questions_once(monkeypatch, tmp_path):
+    engine = RAGEngine(RAGConfig(embedding_dim=4, vector_store_path=str(tmp_path / "idx")))
+    engine.vector_store.add(np.eye(4, dtype="float32"), ["a", "b", "c", "d"])
+
+    calls = []
+
+    def fake_embed(texts):
+        calls.append(list(texts))
+        return np.eye(4, dtype="float32")[: len(texts)]
+
+    async def fake_agenerate(question, context, *a, **k):
+        return f"{question}:{context}"
+
+    engine._embed_texts = fake_embed
+    monkeypatch.setattr(lsvc, "agenerate_answer", fake_agenerate)
+
+    results = engine.batch_ask(["q0", "q1", "q2"], top_k=1)
+
+    assert calls == [["q0", "q1", "q2"]]
+    assert [r["answer"] for r in results] == ["q0:a", "q1:b", "q2:c"]
+
+
+def test_engine_embeds_with_its_configured_model(monkeypatch, tmp_path):
+    import embeddings.embed as embed_mod
+
+    seen = []
+
+    def fake_embed(texts, model=embed_mod.EMBEDDING_MODEL):
+        seen.append(model)
+        return np.ones((len(texts), 2), dtype="float32")
+
+    monkeypatch.setattr(embed_mod, "embed_texts", fake_embed)
+    engine = RAGEngine(RAGConfig(
+        embedding_model="text-embedding-3-small", embedding_dim=2, vector_store_path=str(tmp_path / "idx")
+    ))
+    engine.embed_texts(["a"])
+    assert seen == ["text-embedding-3-small"]
+
+
+def test_embed_texts_only_embeds_cache_misses(tmp_path):
+    engine = RAGEngine(RAGConfig(embedding_dim=2, vector_store_path=str(tmp_path / "idx")))
+    calls = []
+
+    def fake_embed(texts):
+        calls.append(list(texts))
+        return np.array([[len(t), 1.0] for t in texts], dtype="float32")
+
+    engine._embed_texts = fake_embed
+
+    first = engine.embed_texts(["a", "bb", "a"])
+    second = engine.embed_texts(["bb", "ccc"])
+
+    assert calls == [["a", "bb"], ["ccc"]]
+    np.testing.assert_array_equal(first[:, 0], [1, 2, 1])
+    np.testing.assert_array_equal(second[:, 0], [2, 3])
+    assert engine.embed_texts([]).shape == (0, 2)
+
+
+def test_index_documents_embeds_duplicate_chunks_once(tmp_path):
+    engine = RAGEngine(RAGConfig(embedding_dim=2, vector_store_path=str(tmp_path / "idx")))
+    calls = []
+
+    def fake_embed(texts):
+        calls.append(list(texts))
+        return np.ones((len(texts), 2), dtype="float32")
+
+    engine._embed_texts = fake_embed
+
+    count = engine.index_documents(["header", "body", "header"])
+
+    assert count == 3
+    assert calls == [["header", "body"]]
+    assert len(engine.vector_store) == 3
+
+
+def test_index_documents_streams_chunk_batches_with_metadata(monkeypatch, tmp_path):
+    import rag_engine
+
+    monkeypatch.setattr(rag_engine, "INDEX_BATCH_SIZE", 3)
+    config = RAGConfig(embedding_dim=2, vector_store_path=str(tmp_path / "idx"), chunk_size=20, chunk_overlap=0)
+    engine = RAGEngine(config)
+    batches = []
+
+    def fake_embed(texts):
+        batches.append(len(texts))
+        return np.random.default_rng(len(batches)).normal(size=(len(texts), 2)).astype("float32")
+
+    engine._embed_texts = fake_embed
+
+    docs = [" ".join(f"alpha{i}" for i in range(10)), " ".join(f"beta{i}" for i in range(8))]
+    count = engine.index_documents(docs, metadata=[{"doc": "a"}, {"doc": "b"}], chunk=True)
+
+    assert count == len(engine.vector_store) == sum(batches)
+    assert max(batches) <= 3 and len(batches) > 1
+    store = engine.vector_store
+    assert [m["doc"] for m in store.metadata] == ["a" if t.startswith("alpha") else "b" for t in store.texts]
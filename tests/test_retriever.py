@@ -27,8 +27,139 @@ def test_index_documents_calls_store_add(monkeypatch):
         def add(self, embeddings, documents, metadata=None):
             called['added'] = True
 
+        def flush(self):
+            # Debounced writes must be on disk before indexing reports success
+            called['flushed'] = called.get('added', False)
+
     monkeypatch.setattr(retriever, "get_vector_store", lambda: FakeStore())
 
     n = retriever.index_documents(docs)
     assert n == 2
     assert called.get('added', False) is True
+    assert called.get('flushed', False) is True
+
+
+def test_index_documents_flushes_when_store_add_fails(monkeypatch):
+    import pytest
+
+    monkeypatch.setattr(retriever, "embed_texts", lambda texts: np.ones((1, 1536)))
+    called = {}
+
+    class FakeStore:
+        def add(self, embeddings, documents, metadata=None):
+            raise RuntimeError("disk full")
+
+        def flush(self):
+            called['flushed'] = True
+
+    monkeypatch.setattr(retriever, "get_vector_store", lambda: FakeStore())
+
+    with pytest.raises(Exception, match="disk full"):
+        retriever.index_documents(["doc"])
+    assert called.get('flushed', False) is True
+
+
+def test_aretrieve_context_collapses_concurrent_queries(monkeypatch):
+    import asyncio
+    from services.query_collapser import QueryCollapser
+
+    embed_calls = []
+
+    def fake_embed(texts):
+        embed_calls.append(list(texts))
+        return np.zeros((len(texts), 4), dtype=np.float32)
+
+    class FakeStore:
+        def search_batch_with_metadata(self, q_emb, k=5):
+            return [[{"text": f"doc{i}-{j}", "distance": 0.0} for j in range(k)] for i in range(len(q_emb))]
+
+    monkeypatch.setattr(retriever, "embed_texts", fake_embed)
+    monkeypatch.setattr(retriever, "get_vector_store", lambda: FakeStore())
+    monkeypatch.setattr(retriever, "_collapser", QueryCollapser(retriever._search_batch, max_wait_ms=50))
+
+    async def run():
+        return await asyncio.gather(*[retriever.aretrieve_context(f"q{i}", k=i + 1) for i in range(5)])
+
+    contexts = asyncio.run(run())
+
+    assert embed_calls == [["q0", "q1", "q2", "q3", "q4"]]
+    assert [ctx.count("\n") + 1 for ctx in contexts] == [1, 2, 3, 4, 5]
+    assert contexts[3].startswith("[Score: 1.00] doc3-0")
+
+
+def test_index_documents_embeds_chunks_in_parallel_with_retry(monkeypatch):
+    import functools
+
+    calls = []
+    failed = set()
+
+    class RateLimited(Exception):
+        status_code = 429
+
+    def fake_embed(texts):
+        calls.append(len(texts))
+        if texts[0] == "d3" and "d3" not in failed:
+            failed.add("d3")
+            raise RateLimited("slow down")
+        return np.array([[float(t[1:])] * 4 for t in texts], dtype=np.float32)
+
+    added = {}
+
+    class FakeStore:
+        def add(self, embeddings, documents, metadata=None):
+            added["embeddings"] = embeddings
+
+        def flush(self):
+            pass
+
+    monkeypatch.setattr(retriever, "embed_texts", fake_embed)
+    monkeypatch.setattr(retriever, "get_vector_store", lambda: FakeStore())
+    monkeypatch.setattr(retriever, "EMBED_RETRY_BACKOFF", 0)
+    monkeypatch.setattr(retriever, "_embed_parallel", functools.partial(retriever._embed_parallel, chunk_size=3))
+
+    docs = [f"d{i}" for i in range(8)]
+    assert retriever.index_documents(docs) == 8
+    assert added["embeddings"][:, 0].tolist() == list(range(8))
+    assert sorted(calls) == [2, 3, 3, 3]
+
+
+def test_format_context_scores_and_skips_empty():
+    ctx = retriever._format_context([
+        {"text": "a", "distance": 1.0},
+        {"text": "", "distance": 0.0},
+        {"text": "b", "distance": -1.0},
+        {"text": "c"},
+    ])
+    assert ctx == "[Score: 0.50] a\n[Score: 1.00] b\n[Score: 1.00] c"
+
+
+def test_open_store_uses_configured_index_kind(monkeypatch, tmp_path):
+    retriever._ensure_imports()
+    monkeypatch.setattr(retriever, "VECTOR_STORE_PATH", str(tmp_path / "docs.index"))
+    monkeypatch.setattr(retriever, "RAG_INDEX_KIND", "ivfpq")
+    store = retriever._open_store()
+    if hasattr(store, "index_type"):
+        assert store.index_type == "ivfpq"
+        assert store.pq_m == retriever.IVF_PQ_M
+        assert store.ivf_threshold is None
+
+
+def test_fit_budget_keeps_best_parts_within_budget(monkeypatch):
+    monkeypatch.setattr(retriever, "_encoder", False)  # use the character estimate
+    parts = ["a" * 40, "b" * 40, "c" * 40]
+
+    assert retriever._fit_budget(parts, budget=25) == parts[:2]
+    assert retriever._fit_budget(parts, budget=100) == parts
+    assert retriever._fit_budget(["x" * 400], budget=10) == ["x" * 40]
+
+
+def test_retrieved_context_renders_with_and_without_scores():
+    import services.llm_service as lsvc
+
+    ctx = retriever.RetrievedContext(["alpha", "beta"], np.array([0.5, 0.25]))
+    assert str(ctx) == "[Score: 0.50] alpha\n[Score: 0.25] beta"
+    assert ctx.as_prompt() == "alpha\nbeta"
+    assert str(retriever.RetrievedContext([], np.empty(0))) == "No relevant context found."
+
+    answer = lsvc.generate_answer("q", ctx, use_demo=True)
+    assert "alpha\nbeta" in answer and "Score" not in answer
@@ -1,9 +1,21 @@
+import os
 import pickle
+import threading
+import time
 import numpy as np
 import logging
-from typing import List, Tuple, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import accumulate
+from operator import itemgetter
+from typing import Callable, Iterable, Iterator, List, Tuple, Dict, Optional, Union
 from pathlib import Path
 
+import orjson
+
+from embeddings.similarity import quantized_sqeuclidean_distances, sqeuclidean_distances
+from vector_store.query_cache import QUERY_CACHE_SIZE, QUERY_CACHE_TTL_SECONDS, QueryCache
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -13,14 +25,534 @@ try:
 except Exception:
     FAISS_AVAILABLE = False
 
+# Texts and metadata are stored as an Arrow IPC file that loads zero-copy via
+# mmap; without pyarrow they are written as one orjson document
+try:
+    import pyarrow as pa  # type: ignore
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Files that can hold a store's texts and metadata, newest format first; the
+# ".texts"/".metadata" pickles are only read, for stores saved by older versions
+RECORD_FILE_SUFFIXES = (".records", ".records.json", ".texts", ".metadata")
+
+# Advisory file locks coordinate index writers and readers across processes
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+# Corpus size at which a flat index is worth replacing with IVF-SQ8
+AUTO_IVF_THRESHOLD = 10_000
+
+# Vector encodings selectable with index_type: full fp32, 8-bit scalar
+# quantized (4x smaller), or IVF with product quantization (pq_m bytes/vector)
+INDEX_TYPES = ("flat", "sq8", "ivfpq")
+
+# Training points per IVF list before an ivfpq index is built
+IVFPQ_POINTS_PER_LIST = 39
+# IVF coarse quantizers are trained on a fixed-seed sample of this many
+# vectors per list (k-means quality plateaus well below the full corpus)
+# with this many k-means iterations
+IVF_TRAIN_POINTS_PER_LIST = 64
+IVF_TRAIN_NITER = 10
+
+# Expected corpus sizes at which choose_index_spec moves from exact search to
+# HNSW graphs, and from HNSW to compressed IVF-PQ
+HNSW_MIN_VECTORS = 50_000
+IVFPQ_MIN_VECTORS = 1_000_000
+HNSW_EF_SEARCH = 64
+# nlist of a use_ivf index when the corpus size is unknown
+DEFAULT_IVF_NLIST = 100
+
+# Storage precision for embedding vectors: full float32, float16 (half the
+# bytes per scanned vector) or int8 (a quarter). FAISS maps the narrow types to
+# scalar-quantizer indexes; the numpy fallback keeps the quantized matrix itself
+STORAGE_DTYPES = {"fp32": np.float32, "fp16": np.float16, "int8": np.int8}
+FAISS_STORAGE_SPECS = {"fp16": "SQfp16", "int8": "SQ8"}
+
+# Devices FaissStore can search on; "cuda" needs a GPU build of faiss and
+# silently stays on the CPU otherwise
+DEVICES = ("cpu", "cuda")
+
+# Saved embeddings are memory-mapped rather than read into RAM, so pages are
+# only loaded when touched; the first add copies them into a growth buffer.
+# Windows cannot replace a file that is still mapped, so it reads them fully
+# unless the store is read-only
+MMAP_EMBEDDINGS = os.name != "nt"
+
+# Deleted rows are masked out of results and physically removed once they make
+# up more than this fraction of the store
+COMPACT_DELETED_FRACTION = 0.2
+
+# Debounced persistence: with a positive flush_interval, writes are saved once
+# this long has passed since the last save or this many vectors are pending
+FLUSH_INTERVAL_SECONDS = 30.0
+FLUSH_PENDING_ADDS = 10_000
+
+# Worker threads concurrent_search splits a query batch across. FAISS and BLAS
+# release the GIL, so with FAISS held to one OpenMP thread (search_threads=1)
+# each worker keeps one core busy without oversubscribing the machine
+SEARCH_POOL_WORKERS = min(32, os.cpu_count() or 1)
+
+_search_pool: Optional[ThreadPoolExecutor] = None
+_search_pool_lock = threading.Lock()
+
+
+def _ivf_nlist(n: int) -> int:
+    """IVF list count for ``n`` vectors (the usual 4 * sqrt(N) rule)."""
+    return max(1, int(4 * np.sqrt(n)))
+
+
+def choose_index_spec(expected_size: int, dim: int) -> str:
+    """
+    Pick a FAISS index_factory string for the expected corpus size.
+
+    Args:
+        expected_size: Number of vectors the store is expected to hold
+        dim: Embedding dimension
+
+    Returns:
+        "Flat" below HNSW_MIN_VECTORS, "HNSW32" below IVFPQ_MIN_VECTORS,
+        otherwise IVF with dim/8-byte product-quantized codes (8x smaller)
+    """
+    if expected_size < HNSW_MIN_VECTORS:
+        return "Flat"
+    if expected_size < IVFPQ_MIN_VECTORS:
+        return "HNSW32"
+    return f"IVF{_ivf_nlist(expected_size)},PQ{dim // 8}x8"
+
+
+@contextmanager
+def index_lock(path: str, exclusive: bool = True) -> Iterator[None]:
+    """
+    Hold an inter-process lock on the store at ``path``.
+
+    Writers take it exclusively; read-only loads take it shared so they never
+    see a half-written set of files. A no-op where fcntl is unavailable.
+
+    Args:
+        path: Store path (the lock lives in a ``.lock`` sidecar file)
+        exclusive: Exclusive (write) or shared (read) lock
+    """
+    if fcntl is None:
+        yield
+        return
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(f"{path}.lock", "a+b") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _replace_file(path: str, write) -> None:
+    """Write a file via a temp file and rename, so mmapped readers keep the old inode."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+def _embeddings_file(path: str) -> Optional[Path]:
+    """Saved embeddings file, including the ".npy"-suffixed name older saves produced."""
+    for candidate in (Path(f"{path}.embeddings"), Path(f"{path}.embeddings.npy")):
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def _reserve(
+    buf: Optional[np.ndarray], used: int, extra: int, row_shape: Tuple[int, ...], dtype=np.float32
+) -> np.ndarray:
+    """
+    Return a buffer with room for ``extra`` more rows after ``used``.
+
+    Grows geometrically so repeated appends copy each row O(1) times on
+    average; read-only (e.g. mmapped) buffers are always copied out.
+
+    Args:
+        buf: Current backing buffer, or None
+        used: Rows of ``buf`` holding data
+        extra: Rows about to be appended
+        row_shape: Shape of one row
+        dtype: Element type of a newly allocated buffer
+
+    Returns:
+        ``buf`` itself when it already has room, otherwise a larger copy
+    """
+    needed = used + extra
+    capacity = 0 if buf is None else buf.shape[0]
+    if buf is not None and capacity >= needed and buf.flags.writeable:
+        return buf
+    grown = np.empty((max(needed, 2 * capacity),) + row_shape, dtype=dtype)
+    if used:
+        grown[:used] = buf[:used]
+    return grown
+
+
+class _Tombstones:
+    """Bitset of soft-deleted rows, grown alongside the store's rows."""
+
+    __slots__ = ("_mask", "_n", "count")
+
+    def __init__(self, metadata: List[Dict]):
+        self._mask = np.fromiter((bool(m.get("_deleted")) for m in metadata), dtype=np.bool_, count=len(metadata))
+        self._n = len(metadata)
+        self.count = int(self._mask.sum())
+
+    @property
+    def mask(self) -> np.ndarray:
+        return self._mask[:self._n]
+
+    def extend(self, n: int) -> None:
+        self._mask = _reserve(self._mask, self._n, n, (), np.bool_)
+        self._mask[self._n:self._n + n] = False
+        self._n += n
+
+    def mark(self, i: int) -> bool:
+        """Mark row ``i`` deleted; False if it already was."""
+        if self._mask[i]:
+            return False
+        self._mask[i] = True
+        self.count += 1
+        return True
+
+    def should_compact(self) -> bool:
+        return self.count > COMPACT_DELETED_FRACTION * self._n
+
+
+def _as_rows(embeddings: np.ndarray, dim: int) -> np.ndarray:
+    """
+    Embeddings as a C-contiguous float32 (n, dim) matrix, copying only when needed.
+
+    Float32, C-contiguous input (what the embedding client returns) is used
+    as is; a single (dim,) vector becomes a one-row view.
+
+    Args:
+        embeddings: (n, dim) matrix or (dim,) vector
+        dim: Store dimension
+
+    Returns:
+        (n, dim) float32 matrix
+    """
+    if embeddings.shape[-1] != dim:
+        raise ValueError(f"Embedding dimension {embeddings.shape[-1]} does not match store dimension {dim}")
+    if embeddings.dtype != np.float32 or not embeddings.flags.c_contiguous:
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+    return embeddings.reshape(-1, dim)
+
+
+def _query_matrix(query_embeddings: np.ndarray, dim: int) -> np.ndarray:
+    """Validate queries as a C-contiguous float32 (Q, dim) matrix; a single vector becomes Q=1."""
+    queries = np.ascontiguousarray(query_embeddings, dtype=np.float32)
+    if queries.ndim == 1:
+        queries = queries[None, :]
+    if queries.ndim != 2 or queries.shape[1] != dim:
+        raise ValueError(f"Query embeddings must have shape (Q, {dim}), got {query_embeddings.shape}")
+    return queries
+
+
+SearchHits = Tuple[List[str], List[float], List[int]]
+
+
+def _get_search_pool() -> ThreadPoolExecutor:
+    """Get the process-wide search thread pool."""
+    global _search_pool
+    if _search_pool is None:
+        with _search_pool_lock:
+            if _search_pool is None:
+                _search_pool = ThreadPoolExecutor(max_workers=SEARCH_POOL_WORKERS, thread_name_prefix="vector-search")
+    return _search_pool
+
+
+def _pooled_rows(
+    search_rows: Callable[[np.ndarray, int], List[SearchHits]], queries: np.ndarray, k: int
+) -> List[SearchHits]:
+    """Search ``queries`` as one slice per search pool worker, in parallel."""
+    slices = np.array_split(queries, min(SEARCH_POOL_WORKERS, queries.shape[0]))
+    hits: List[SearchHits] = []
+    for part in _get_search_pool().map(lambda rows: search_rows(rows, k), slices):
+        hits.extend(part)
+    return hits
+
+
+def _batch_with_cache(
+    store, queries: np.ndarray, k: int, search_rows: Callable[[np.ndarray, int], List[SearchHits]]
+) -> Tuple[List[List[str]], List[List[float]], List[List[int]]]:
+    """
+    Answer cached queries from the store's query cache and the rest with one batched search.
+
+    Args:
+        store: FaissStore whose query cache and epoch key the results
+        queries: (Q, dim) float32 query matrix
+        k: Number of results per query
+        search_rows: Batched search over the cache misses, one hit tuple per row
+
+    Returns:
+        Per-query texts, distances and indices
+    """
+    hits: List[Optional[SearchHits]] = [None] * queries.shape[0]
+    keys = [store._cache_key(q, k) for q in queries]
+    for i, key in enumerate(keys):
+        if key is not None:
+            cached = store._query_cache.get(key)
+            if cached is not None:
+                hits[i] = tuple(list(part) for part in cached)
+    misses = [i for i, hit in enumerate(hits) if hit is None]
+    if misses:
+        for i, hit in zip(misses, search_rows(queries[misses], k)):
+            hits[i] = hit
+            if keys[i] is not None:
+                store._query_cache.put(keys[i], tuple(list(part) for part in hit))
+    return [hit[0] for hit in hits], [hit[1] for hit in hits], [hit[2] for hit in hits]
+
+
+def _disk_version(path: str) -> Optional[Tuple[int, int, int]]:
+    """Identity of the store files on disk, used to notice writes by other processes."""
+    for suffix in RECORD_FILE_SUFFIXES:
+        try:
+            st = os.stat(f"{path}{suffix}")
+        except OSError:
+            continue
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+    return None
+
+
+class TextColumn:
+    """
+    List-like texts backed by a memory-mapped Arrow column.
+
+    Loaded texts stay in the Arrow buffer and are only turned into Python
+    strings when indexed; texts added afterwards are kept in a plain list.
+    """
+
+    __slots__ = ("_column", "_tail")
+
+    def __init__(self, column: "pa.ChunkedArray"):
+        self._column = column
+        self._tail: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._column) + len(self._tail)
+
+    def __getitem__(self, i: Union[int, slice]):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("text index out of range")
+        base = len(self._column)
+        return self._column[i].as_py() if i < base else self._tail[i - base]
+
+    def __iter__(self) -> Iterator[str]:
+        for chunk in self._column.chunks:
+            yield from chunk.to_pylist()
+        yield from self._tail
+
+    def extend(self, texts: Iterable[str]) -> None:
+        self._tail.extend(texts)
+
+    def append(self, text: str) -> None:
+        self._tail.append(text)
+
+    def take(self, ids: List[int]) -> List[str]:
+        """Texts at ``ids`` (all in range), gathered by Arrow in C for loaded rows."""
+        base = len(self._column)
+        if max(ids) < base:
+            return self._column.take(pa.array(ids, type=pa.int64())).to_pylist()
+        return [self[i] for i in ids]
+
+    def to_arrow(self) -> "pa.ChunkedArray":
+        return pa.chunked_array(self._column.chunks + [pa.array(self._tail, type=pa.large_string())])
+
+
+def _gather_texts(texts: Union[List[str], TextColumn], ids: List[int]) -> List[str]:
+    """
+    Texts for a list of row ids without a per-hit Python loop.
+
+    Args:
+        texts: Store texts (list or Arrow-backed column)
+        ids: Row ids; ids past the end map to "" (index and texts out of sync)
+
+    Returns:
+        One text per id
+    """
+    if not ids:
+        return []
+    n = len(texts)
+    if max(ids) >= n:
+        return [texts[i] if i < n else "" for i in ids]
+    if isinstance(texts, TextColumn):
+        return texts.take(ids)
+    picked = itemgetter(*ids)(texts)
+    return list(picked) if len(ids) > 1 else [picked]
+
+
+def _gather_text_rows(texts: Union[List[str], TextColumn], id_rows: List[List[int]]) -> List[List[str]]:
+    """_gather_texts for several result rows at once, with a single gather over all ids."""
+    flat = _gather_texts(texts, [i for ids in id_rows for i in ids])
+    bounds = [0, *accumulate(len(ids) for ids in id_rows)]
+    return [flat[start:end] for start, end in zip(bounds, bounds[1:])]
+
+
+def _load_records(path: str) -> Tuple[Union[List[str], TextColumn], List[Dict]]:
+    """Read a store's texts and metadata from the Arrow or JSON records file, or the legacy pickles."""
+    records_path = Path(f"{path}.records")
+    if PYARROW_AVAILABLE and records_path.exists():
+        table = pa.ipc.open_file(pa.memory_map(str(records_path))).read_all()
+        metadata = [orjson.loads(m) for m in table.column("metadata_json").to_pylist()]
+        return TextColumn(table.column("text")), metadata
+    json_path = Path(f"{path}.records.json")
+    if json_path.exists():
+        records = orjson.loads(json_path.read_bytes())
+        return records["texts"], records["metadata"]
+    texts, metadata = [], []
+    texts_path = Path(f"{path}.texts")
+    if texts_path.exists():
+        with open(texts_path, "rb") as f:
+            texts = pickle.load(f)
+    metadata_path = Path(f"{path}.metadata")
+    if metadata_path.exists():
+        with open(metadata_path, "rb") as f:
+            metadata = pickle.load(f)
+    return texts, metadata
+
+
+def _save_records(path: str, texts: Union[List[str], TextColumn], metadata: List[Dict]) -> None:
+    """Write texts and metadata as one uncompressed (mmap-able) Arrow file, or orjson without pyarrow."""
+    if not PYARROW_AVAILABLE:
+        records = orjson.dumps({"texts": list(texts), "metadata": metadata}, default=str)
+        _replace_file(f"{path}.records.json", lambda f: f.write(records))
+        _remove_stale_records(path, ".records.json")
+        return
+    text_column = texts.to_arrow() if isinstance(texts, TextColumn) else pa.array(texts, type=pa.large_string())
+    metadata_column = pa.array(
+        [orjson.dumps(m, default=str).decode("utf-8") for m in metadata], type=pa.large_string()
+    )
+    table = pa.table({"text": text_column, "metadata_json": metadata_column})
+
+    def write(f) -> None:
+        with pa.ipc.new_file(f, table.schema) as writer:
+            writer.write_table(table)
+
+    _replace_file(f"{path}.records", write)
+    _remove_stale_records(path, ".records")
+
+
+def _remove_stale_records(path: str, current: str) -> None:
+    """Delete record files in other formats, which would otherwise shadow or outlive the new save."""
+    for suffix in RECORD_FILE_SUFFIXES:
+        if suffix != current:
+            Path(f"{path}{suffix}").unlink(missing_ok=True)
+
 
 if FAISS_AVAILABLE:
+    _gpu_resources = None
+    _gpu_resources_lock = threading.Lock()
+
+    def _gpu_available() -> bool:
+        return hasattr(faiss, "StandardGpuResources") and faiss.get_num_gpus() > 0
+
+    def _get_gpu_resources():
+        """Process-wide GPU scratch memory and streams, shared by every GPU index."""
+        global _gpu_resources
+        if _gpu_resources is None:
+            with _gpu_resources_lock:
+                if _gpu_resources is None:
+                    _gpu_resources = faiss.StandardGpuResources()
+        return _gpu_resources
+
+    def _is_gpu_index(index) -> bool:
+        return type(index).__name__.startswith("Gpu")
+
     # Use real FAISS-backed implementation when available
     class FaissStore:
-        def __init__(self, dim: int = 1536, path: str = "vector_store/faiss.index", use_ivf: bool = False):
+        def __init__(
+            self,
+            dim: int = 1536,
+            path: str = "vector_store/faiss.index",
+            use_ivf: bool = False,
+            ivf_threshold: Optional[int] = None,
+            nprobe: int = 16,
+            index_type: str = "flat",
+            nlist: int = 4096,
+            pq_m: int = 48,
+            read_only: bool = False,
+            spec: Optional[str] = None,
+            expected_size: Optional[int] = None,
+            ef_search: int = HNSW_EF_SEARCH,
+            flush_interval: float = 0.0,
+            flush_every: int = FLUSH_PENDING_ADDS,
+            cache_size: int = QUERY_CACHE_SIZE,
+            cache_ttl: float = QUERY_CACHE_TTL_SECONDS,
+            storage_dtype: str = "fp32",
+            use_precomputed_table: int = 0,
+            device: str = "cpu",
+            search_threads: Optional[int] = None,
+        ):
+            if index_type not in INDEX_TYPES:
+                raise ValueError(f"Unknown index_type {index_type!r}; expected one of {INDEX_TYPES}")
+            if storage_dtype not in STORAGE_DTYPES:
+                raise ValueError(f"Unknown storage_dtype {storage_dtype!r}; expected one of {tuple(STORAGE_DTYPES)}")
+            if device not in DEVICES:
+                raise ValueError(f"Unknown device {device!r}; expected one of {DEVICES}")
             self.dim = dim
             self.path = path
             self.use_ivf = use_ivf
+            self.index_type = index_type
+            self.nlist = nlist
+            self.pq_m = pq_m
+            # When set, a flat index is rebuilt as IVF-SQ8 once it holds this many vectors
+            self.ivf_threshold = ivf_threshold
+            self.nprobe = nprobe
+            # IVFPQ residual term tables: 0 lets FAISS decide by size, 1 forces
+            # them, -1 disables them (see IndexIVFPQ::use_precomputed_table)
+            self.use_precomputed_table = use_precomputed_table
+            self.ef_search = ef_search
+            self.device = device
+            if device == "cuda" and not _gpu_available():
+                logger.warning("No FAISS GPU support or no GPU found; searching on the CPU")
+                self.device = "cpu"
+            # OpenMP threads FAISS uses inside one search call. This is process-wide:
+            # 1 suits many small concurrent queries (or concurrent_search), the
+            # default (all cores) suits one large batch at a time
+            if search_threads is not None:
+                faiss.omp_set_num_threads(search_threads)
+            self.expected_size = expected_size
+            # index_factory string; derived from expected_size when not given,
+            # unless index_type or use_ivf already pick the layout
+            if spec is None and expected_size is not None and index_type == "flat" and not use_ivf:
+                spec = choose_index_spec(expected_size, dim)
+            if spec in (None, "Flat") and storage_dtype != "fp32" and index_type == "flat" and not use_ivf:
+                spec = FAISS_STORAGE_SPECS[storage_dtype]
+            self.storage_dtype = storage_dtype
+            self.spec = spec
+            # Factory index that still needs training; the store stays flat until
+            # it holds enough vectors to train it
+            self._pending_spec: Optional[str] = None
+            # Read-only stores mmap the index and embeddings so worker processes
+            # share one page-cache copy instead of each holding its own
+            self.read_only = read_only
+            # Writes are saved immediately when flush_interval is 0; otherwise the
+            # store is marked dirty and saved by the debounce policy or flush()
+            self.flush_interval = flush_interval
+            self.flush_every = flush_every
+            self._dirty = False
+            self._pending_adds = 0
+            self._last_flush = time.monotonic()
+            # Repeat queries are answered from an LRU+TTL cache; _epoch is bumped
+            # on every write so cached results never outlive the data they came from
+            self._query_cache = QueryCache(cache_size, cache_ttl) if cache_size > 0 else None
+            self._epoch = 0
+            # Compaction needs the saved embeddings; without them it is skipped
+            # (with one warning) and deleted rows stay filtered at search time
+            self._compact_warned = False
             self.texts: List[str] = []
             self.metadata: List[Dict] = []
             self.embeddings: Optional[np.ndarray] = None
@@ -29,64 +561,217 @@ if FAISS_AVAILABLE:
             self._initialize_index()
             self._load()
 
+        @property
+        def embeddings(self) -> Optional[np.ndarray]:
+            """Stored vectors: a zero-copy view of the used rows of the growth buffer."""
+            return None if self._buf is None else self._buf[:self._n]
+
+        @embeddings.setter
+        def embeddings(self, value: Optional[np.ndarray]) -> None:
+            self._buf = value
+            self._n = 0 if value is None else value.shape[0]
+
+        def _append_embeddings(self, embeddings_float32: np.ndarray) -> None:
+            b = embeddings_float32.shape[0]
+            self._buf = _reserve(self._buf, self._n, b, (self.dim,))
+            self._buf[self._n:self._n + b] = embeddings_float32
+            self._n += b
+
         def _initialize_index(self):
-            if self.use_ivf:
-                quantizer = faiss.IndexFlatL2(self.dim)
-                self.index = faiss.IndexIVFFlat(quantizer, self.dim, nlist=100)
-                logger.info("Initialized IVFFlat index for large-scale search")
+            self._pending_spec = None
+            if self.spec is not None:
+                index = faiss.index_factory(self.dim, self.spec, faiss.METRIC_L2)
+                if index.is_trained:
+                    self.index = index
+                    self._configure_search()
+                    logger.info(f"Initialized {self.spec} index")
+                else:
+                    self.index = faiss.IndexFlatL2(self.dim)
+                    self._pending_spec = self.spec
+                    logger.info(f"Initialized FlatL2 index ({self.spec} once trained)")
+            elif self.index_type == "sq8":
+                # Starts flat; the quantizer's value range is fitted on a sample
+                # once 256 vectors are stored, not on the first batch alone
+                self.index = faiss.IndexFlatL2(self.dim)
+                self._pending_spec = "SQ8"
+                logger.info("Initialized FlatL2 index (SQ8 once trained)")
+            elif self.index_type == "ivfpq":
+                # Starts flat; rebuilt as IVFPQ once there is enough data to train on
+                self.index = faiss.IndexFlatL2(self.dim)
+                logger.info("Initialized FlatL2 index (IVFPQ once trained)")
+            elif self.use_ivf:
+                # Starts flat; trained on a sample once enough vectors have arrived,
+                # rather than on whatever the first batch happens to be
+                nlist = DEFAULT_IVF_NLIST if self.expected_size is None else _ivf_nlist(self.expected_size)
+                self.index = faiss.IndexFlatL2(self.dim)
+                self._pending_spec = f"IVF{nlist},Flat"
+                logger.info(f"Initialized FlatL2 index (IVF{nlist},Flat once trained)")
             else:
                 self.index = faiss.IndexFlatL2(self.dim)
                 logger.info("Initialized FlatL2 index")
+            self._configure_search()
 
         def _load(self):
             try:
+                self._disk_version = _disk_version(self.path)
                 index_path = Path(self.path)
                 if index_path.exists():
-                    self.index = faiss.read_index(self.path)
-                    texts_path = Path(f"{self.path}.texts")
-                    if texts_path.exists():
-                        with open(texts_path, "rb") as f:
-                            self.texts = pickle.load(f)
-                    metadata_path = Path(f"{self.path}.metadata")
-                    if metadata_path.exists():
-                        with open(metadata_path, "rb") as f:
-                            self.metadata = pickle.load(f)
-                    embeddings_path = Path(f"{self.path}.embeddings")
-                    if embeddings_path.exists():
-                        self.embeddings = np.load(embeddings_path)
+                    if self.read_only:
+                        self.index = faiss.read_index(self.path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+                    else:
+                        self.index = faiss.read_index(self.path)
+                    self._configure_search()
+                    self.texts, self.metadata = _load_records(self.path)
+                    embeddings_path = _embeddings_file(self.path)
+                    if embeddings_path is not None:
+                        self.embeddings = np.load(embeddings_path, mmap_mode="r" if self.read_only or MMAP_EMBEDDINGS else None)
                     logger.info(f"Loaded FAISS index with {len(self.texts)} vectors")
             except Exception as e:
                 logger.warning(f"Could not load existing index: {e}")
                 self.texts = []
                 self.metadata = []
                 self.embeddings = None
+            self._tombstones = _Tombstones(self.metadata)
 
-        def add(self, embeddings: np.ndarray, texts: List[str], metadata: Optional[List[Dict]] = None) -> None:
-            if embeddings.shape[1] != self.dim:
-                raise ValueError(f"Embedding dimension {embeddings.shape[1]} does not match store dimension {self.dim}")
-            if self.use_ivf and self.index.ntotal == 0:
-                self.index.train(embeddings.astype("float32"))
-            embeddings_float32 = embeddings.astype("float32")
+        def add(self, embeddings: np.ndarray, texts: List[str], metadata: Optional[List[Dict]] = None, persist: bool = True) -> None:
+            self._check_writable()
+            embeddings_float32 = _as_rows(embeddings, self.dim)
             self.index.add(embeddings_float32)
             self.texts.extend(texts)
             if metadata:
                 self.metadata.extend(metadata)
             else:
                 self.metadata.extend([{} for _ in texts])
-            if self.embeddings is None:
-                self.embeddings = embeddings_float32
-            else:
-                self.embeddings = np.vstack([self.embeddings, embeddings_float32])
-            self._save()
+            self._tombstones.extend(len(texts))
+            self._append_embeddings(embeddings_float32)
+            if self._pending_spec is not None and self._is_flat():
+                self._maybe_build_from_spec()
+            elif self.index_type == "ivfpq" and self._is_flat() and self.index.ntotal >= self.nlist * IVFPQ_POINTS_PER_LIST:
+                self._build_ivfpq()
+            elif self.ivf_threshold is not None and self._is_flat() and self.index.ntotal >= self.ivf_threshold:
+                self._build_ivf_sq8()
+            self._note_write(len(texts), persist)
             logger.info(f"Added {len(texts)} vectors. Total: {self.index.ntotal}")
 
+        def _is_flat(self) -> bool:
+            return isinstance(self.index, (faiss.IndexFlat, getattr(faiss, "GpuIndexFlat", faiss.IndexFlat)))
+
+        def _configure_search(self) -> None:
+            """Move the index to the configured device and apply nprobe / precomputed-table / efSearch."""
+            if self.device == "cuda" and not _is_gpu_index(self.index):
+                try:
+                    self.index = faiss.index_cpu_to_gpu(_get_gpu_resources(), 0, self.index)
+                except Exception as e:
+                    # e.g. HNSW has no GPU implementation
+                    logger.warning(f"Keeping {type(self.index).__name__} on the CPU: {e}")
+            if _is_gpu_index(self.index):
+                if isinstance(self.index, getattr(faiss, "GpuIndexIVF", ())):
+                    faiss.GpuParameterSpace().set_index_parameter(self.index, "nprobe", self.nprobe)
+                return
+            ivf = faiss.try_extract_index_ivf(self.index)
+            if ivf is not None:
+                ivf = faiss.downcast_index(ivf)
+                ivf.nprobe = self.nprobe
+                if isinstance(ivf, faiss.IndexIVFPQ):
+                    ivf.use_precomputed_table = self.use_precomputed_table
+                    if ivf.is_trained:
+                        ivf.precompute_table()
+            if isinstance(self.index, faiss.IndexHNSW):
+                self.index.hnsw.efSearch = self.ef_search
+
+        def _maybe_build_from_spec(self) -> None:
+            """Rebuild the flat index with the pending factory spec once it can be trained."""
+            index = faiss.index_factory(self.dim, self._pending_spec, faiss.METRIC_L2)
+            ivf = faiss.try_extract_index_ivf(index)
+            nlist = ivf.nlist if ivf is not None else 1
+            if isinstance(index, faiss.IndexIVFPQ):
+                # The factory turns on polysemous training, which only pays off for
+                # Hamming-distance filtering this store never uses
+                index.do_polysemous_training = False
+            # 8-bit quantizers also need 256 training points per codebook
+            min_points = max(256, nlist * IVFPQ_POINTS_PER_LIST)
+            n = self.embeddings.shape[0]
+            if n < min_points:
+                return
+            self._train(index, min_points)
+            index.add(self.embeddings)
+            self.index = index
+            self._configure_search()
+            logger.info(f"Rebuilt index as {self._pending_spec} over {n} vectors")
+            self._pending_spec = None
+
+        def _train(self, index, min_points: int = 256) -> None:
+            """
+            Train ``index`` on a fixed-seed sample of the stored embeddings.
+
+            Args:
+                index: Untrained CPU index
+                min_points: Smallest sample to train on (PQ and SQ8 codebooks need 256)
+            """
+            n = self.embeddings.shape[0]
+            ivf = faiss.try_extract_index_ivf(index)
+            nlist = 1
+            gpu_assign = None
+            if ivf is not None:
+                nlist = ivf.nlist
+                ivf.cp.niter = IVF_TRAIN_NITER
+                if self.device == "cuda":
+                    # k-means assignment is the bulk of training and runs far faster on the GPU
+                    gpu_assign = faiss.GpuIndexFlatL2(_get_gpu_resources(), self.dim)
+                    ivf.clustering_index = gpu_assign
+            sample_size = min(n, max(min_points, IVF_TRAIN_POINTS_PER_LIST * nlist))
+            sample = np.random.default_rng(0).choice(n, sample_size, replace=False)
+            try:
+                index.train(self.embeddings[np.sort(sample)])
+            finally:
+                if gpu_assign is not None:
+                    ivf.clustering_index = None
+
+        def _build_ivf_sq8(self) -> None:
+            """Rebuild the index as IVF with 8-bit scalar-quantized vectors."""
+            n = self.embeddings.shape[0]
+            nlist = _ivf_nlist(n)
+            quantizer = faiss.IndexFlatL2(self.dim)
+            index = faiss.IndexIVFScalarQuantizer(
+                quantizer, self.dim, nlist, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_L2
+            )
+            self._train(index)
+            index.add(self.embeddings)
+            self.index = index
+            self._configure_search()
+            logger.info(f"Rebuilt index as IVF{nlist},SQ8 over {n} vectors")
+
+        def _build_ivfpq(self) -> None:
+            """Rebuild the index as IVF with product-quantized vectors."""
+            n = self.embeddings.shape[0]
+            quantizer = faiss.IndexFlatL2(self.dim)
+            index = faiss.IndexIVFPQ(quantizer, self.dim, self.nlist, self.pq_m, 8)
+            self._train(index)
+            index.add(self.embeddings)
+            self.index = index
+            self._configure_search()
+            logger.info(f"Rebuilt index as IVF{self.nlist},PQ{self.pq_m} over {n} vectors")
+
         def search(self, query_embedding: np.ndarray, k: int = 5) -> Tuple[List[str], List[float], List[int]]:
             if self.index.ntotal == 0:
                 return [], [], []
-            query_float32 = query_embedding.astype("float32").reshape(1, -1)
-            distances, indices = self.index.search(query_float32, k)
-            results_texts = [self.texts[i] if i < len(self.texts) else "" for i in indices[0]]
-            return results_texts, distances[0].tolist(), indices[0].tolist()
+            query_float32 = _as_rows(query_embedding, self.dim)[:1]
+            cache_key = self._cache_key(query_float32, k)
+            if cache_key is not None:
+                cached = self._query_cache.get(cache_key)
+                if cached is not None:
+                    return tuple(list(part) for part in cached)
+            distances, indices = self._live_search(query_float32, k)[0]
+            results_texts = _gather_texts(self.texts, indices.tolist())
+            result = (results_texts, distances.tolist(), indices.tolist())
+            if cache_key is not None:
+                self._query_cache.put(cache_key, tuple(list(part) for part in result))
+            return result
+
+        def _cache_key(self, query: np.ndarray, k: int) -> Optional[Tuple[int, int, int]]:
+            if self._query_cache is None:
+                return None
+            return QueryCache.make_key(query, k, self._epoch)
 
         def search_with_metadata(self, query_embedding: np.ndarray, k: int = 5) -> List[Dict]:
             texts, distances, indices = self.search(query_embedding, k)
@@ -100,37 +785,251 @@ if FAISS_AVAILABLE:
                 })
             return results
 
+        def batch_search(
+            self, query_embeddings: np.ndarray, k: int = 5
+        ) -> Tuple[List[List[str]], List[List[float]], List[List[int]]]:
+            """
+            Search several queries with a single index call.
+
+            FAISS runs a (Q, dim) query matrix as one GEMM instead of Q GEMVs;
+            queries already in the query cache are answered without searching.
+
+            Args:
+                query_embeddings: (Q, dim) query matrix
+                k: Number of results per query
+
+            Returns:
+                Per-query texts, distances and indices
+            """
+            queries = _query_matrix(query_embeddings, self.dim)
+            if self.index.ntotal == 0:
+                return [[] for _ in queries], [[] for _ in queries], [[] for _ in queries]
+            return _batch_with_cache(self, queries, k, self._search_rows)
+
+        def concurrent_search(
+            self, query_embeddings: np.ndarray, k: int = 5
+        ) -> Tuple[List[List[str]], List[List[float]], List[List[int]]]:
+            """
+            Search several queries split across the search thread pool.
+
+            Each pool worker searches one slice of the batch; pair with
+            search_threads=1 so FAISS does not also fan out over OpenMP.
+
+            Args:
+                query_embeddings: (Q, dim) query matrix or list of query vectors
+                k: Number of results per query
+
+            Returns:
+                Per-query texts, distances and indices
+            """
+            queries = _query_matrix(query_embeddings, self.dim)
+            if self.index.ntotal == 0:
+                return [[] for _ in queries], [[] for _ in queries], [[] for _ in queries]
+            return _batch_with_cache(self, queries, k, lambda rows, k: _pooled_rows(self._search_rows, rows, k))
+
+        def _search_rows(self, queries: np.ndarray, k: int) -> List[SearchHits]:
+            dist_rows, id_rows = [], []
+            for row_d, row_i in self._live_search(queries, k):
+                dist_rows.append(row_d.tolist())
+                id_rows.append(row_i.tolist())
+            return list(zip(_gather_text_rows(self.texts, id_rows), dist_rows, id_rows))
+
+        def _live_search(self, queries: np.ndarray, k: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+            """
+            Distances and ids of the k nearest live rows for each query.
+
+            Deleted rows are excluded inside the index through an ID selector
+            where the index type supports one; otherwise (e.g. GPU indexes) a
+            bounded over-fetch is widened only for queries that come up short.
+
+            Args:
+                queries: (Q, dim) float32 query matrix
+                k: Number of results per query
+
+            Returns:
+                One (distances, ids) pair per query
+            """
+            ntotal = self.index.ntotal
+            if not self._tombstones.count:
+                distances, indices = self.index.search(queries, min(k, ntotal))
+                return [self._live_hits(d, i, k) for d, i in zip(distances, indices)]
+
+            params = None
+            if not _is_gpu_index(self.index):
+                # The packed bitmap must outlive the search call, so keep it referenced here
+                bits = np.packbits(self._tombstones.mask, bitorder="little")
+                sel = faiss.IDSelectorNot(faiss.IDSelectorBitmap(len(self._tombstones.mask), faiss.swig_ptr(bits)))
+                if isinstance(self.index, faiss.IndexIVF):
+                    params = faiss.SearchParametersIVF(sel=sel, nprobe=self.nprobe)
+                elif isinstance(self.index, (faiss.IndexFlat, faiss.IndexScalarQuantizer, faiss.IndexHNSW)):
+                    # Plain SearchParameters keep the index's own efSearch
+                    params = faiss.SearchParameters(sel=sel)
+            if params is not None:
+                distances, indices = self.index.search(queries, min(k, ntotal), params=params)
+                return [self._live_hits(d, i, k) for d, i in zip(distances, indices)]
+
+            hits: List[Optional[Tuple[np.ndarray, np.ndarray]]] = [None] * queries.shape[0]
+            wanted = min(k, ntotal - self._tombstones.count)
+            pending = np.arange(queries.shape[0])
+            fetch = min(2 * k, ntotal)
+            while len(pending):
+                distances, indices = self.index.search(queries[pending], fetch)
+                short = []
+                for row, d, i in zip(pending.tolist(), distances, indices):
+                    hits[row] = self._live_hits(d, i, k)
+                    if len(hits[row][1]) < wanted and fetch < ntotal:
+                        short.append(row)
+                pending = np.asarray(short, dtype=np.int64)
+                fetch = min(4 * fetch, ntotal)
+            return hits
+
+        def _live_hits(self, distances: np.ndarray, indices: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+            # FAISS pads missing results with -1, which would index texts from the end
+            keep = indices >= 0
+            if self._tombstones.count:
+                mask = self._tombstones.mask
+                keep &= ~mask[np.clip(indices, 0, len(mask) - 1)]
+            return distances[keep][:k], indices[keep][:k]
+
+        def _compact(self) -> None:
+            """Drop deleted rows and rebuild the index from the live ones (renumbers rows)."""
+            if self.embeddings is None or self.embeddings.shape[0] != len(self.metadata):
+                if not self._compact_warned:
+                    logger.warning("Cannot compact vector store without its saved embeddings")
+                    self._compact_warned = True
+                return
+            live = np.flatnonzero(~self._tombstones.mask)
+            kept = np.ascontiguousarray(self.embeddings[live], dtype=np.float32)
+            self.texts = _gather_texts(self.texts, live.tolist())
+            self.metadata = [self.metadata[i] for i in live.tolist()]
+            self.embeddings = kept
+            self._tombstones = _Tombstones(self.metadata)
+            # reset() keeps any trained quantizers, so IVF/SQ indexes need no retraining
+            self.index.reset()
+            self.index.add(kept)
+            self._configure_search()
+            logger.info(f"Compacted vector store to {len(live)} live vectors")
+
+        def search_batch_with_metadata(self, query_embeddings: np.ndarray, k: int = 5) -> List[List[Dict]]:
+            """Search several queries with one index call; one result list per query row."""
+            _, distances, indices = self.batch_search(query_embeddings, k)
+            return [
+                [self._result(int(idx), float(dist)) for dist, idx in zip(row_d, row_i)]
+                for row_d, row_i in zip(distances, indices)
+            ]
+
+        def _result(self, idx: int, distance: float) -> Dict:
+            return {
+                "text": self.texts[idx] if idx < len(self.texts) else "",
+                "distance": distance,
+                "metadata": self.metadata[idx] if idx < len(self.metadata) else {},
+                "index": idx
+            }
+
+        def _check_writable(self) -> None:
+            if self.read_only:
+                raise RuntimeError(f"Vector store at {self.path} was opened read-only")
+
+        def changed_on_disk(self) -> bool:
+            """Whether another process has saved the store since it was loaded."""
+            return _disk_version(self.path) != self._disk_version
+
         def delete(self, index: int) -> None:
-            if index < len(self.metadata):
+            self._check_writable()
+            if index < len(self.metadata) and self._tombstones.mark(index):
                 self.metadata[index]["_deleted"] = True
-                self._save()
+                if self._tombstones.should_compact():
+                    self._compact()
+                self._note_write()
 
         def get_stats(self) -> Dict:
             return {
                 "total_vectors": self.index.ntotal,
                 "embedding_dimension": self.dim,
-                "index_type": "IVFFlat" if self.use_ivf else "FlatL2",
-                "path": self.path
+                "index_type": self._index_type_name(),
+                "search_params": self._search_params(),
+                "device": self.device,
+                "path": self.path,
+                "query_cache": self._query_cache.get_stats() if self._query_cache is not None else {"enabled": False},
             }
 
+        def _search_params(self) -> Dict:
+            ivf = faiss.try_extract_index_ivf(self.index)
+            if ivf is not None:
+                ivf = faiss.downcast_index(ivf)
+                params = {"nprobe": ivf.nprobe, "nlist": ivf.nlist}
+                if isinstance(ivf, faiss.IndexIVFPQ):
+                    params["use_precomputed_table"] = ivf.use_precomputed_table
+                return params
+            if isinstance(self.index, faiss.IndexHNSW):
+                return {"ef_search": self.index.hnsw.efSearch}
+            return {}
+
+        def _index_type_name(self) -> str:
+            if _is_gpu_index(self.index):
+                return type(self.index).__name__
+            if isinstance(self.index, faiss.IndexHNSW):
+                return "HNSW"
+            if isinstance(self.index, faiss.IndexIVFPQ):
+                return "IVFPQ"
+            if isinstance(self.index, faiss.IndexScalarQuantizer):
+                return "SQfp16" if self.index.sq.qtype == faiss.ScalarQuantizer.QT_fp16 else "SQ8"
+            if isinstance(self.index, faiss.IndexIVFScalarQuantizer):
+                return "IVFSQ8"
+            if isinstance(self.index, faiss.IndexIVFFlat):
+                return "IVFFlat"
+            return "FlatL2"
+
+        def _note_write(self, added: int = 0, persist: bool = True) -> None:
+            """Mark the store dirty and save it if the flush policy says so."""
+            self._dirty = True
+            self._epoch += 1
+            self._pending_adds += added
+            if persist and (
+                self.flush_interval <= 0
+                or self._pending_adds >= self.flush_every
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            ):
+                self._save()
+
+        def flush(self) -> None:
+            """Write pending changes to disk, if there are any."""
+            if self._dirty:
+                self.save()
+
+        def save(self) -> None:
+            """Write the store to disk, e.g. after adds made with persist=False."""
+            self._check_writable()
+            self._save()
+
+        def _save_arrays(self) -> None:
+            _save_records(self.path, self.texts, self.metadata)
+            if self.embeddings is not None:
+                # A file object keeps np.save from appending ".npy" to the name
+                _replace_file(f"{self.path}.embeddings", lambda f: np.save(f, self.embeddings))
+            self._disk_version = _disk_version(self.path)
+            self._dirty = False
+            self._pending_adds = 0
+            self._last_flush = time.monotonic()
+
         def _save(self) -> None:
             try:
-                faiss.write_index(self.index, self.path)
-                with open(f"{self.path}.texts", "wb") as f:
-                    pickle.dump(self.texts, f)
-                with open(f"{self.path}.metadata", "wb") as f:
-                    pickle.dump(self.metadata, f)
-                if self.embeddings is not None:
-                    np.save(f"{self.path}.embeddings", self.embeddings)
+                tmp_index_path = f"{self.path}.tmp"
+                index = faiss.index_gpu_to_cpu(self.index) if _is_gpu_index(self.index) else self.index
+                faiss.write_index(index, tmp_index_path)
+                os.replace(tmp_index_path, self.path)
+                self._save_arrays()
             except Exception as e:
                 logger.error(f"Error saving index: {e}")
 
         def clear(self) -> None:
+            self._check_writable()
             self._initialize_index()
             self.texts = []
             self.metadata = []
             self.embeddings = None
-            self._save()
+            self._tombstones = _Tombstones(self.metadata)
+            self._note_write()
 
         def __len__(self) -> int:
             return self.index.ntotal
@@ -138,60 +1037,244 @@ if FAISS_AVAILABLE:
 else:
     # Lightweight numpy fallback for environments without faiss
     class FaissStore:
-        def __init__(self, dim: int = 1536, path: str = "vector_store/faiss.index", use_ivf: bool = False):
+        def __init__(
+            self,
+            dim: int = 1536,
+            path: str = "vector_store/faiss.index",
+            use_ivf: bool = False,
+            ivf_threshold: Optional[int] = None,
+            nprobe: int = 16,
+            index_type: str = "flat",
+            nlist: int = 4096,
+            pq_m: int = 48,
+            read_only: bool = False,
+            spec: Optional[str] = None,
+            expected_size: Optional[int] = None,
+            ef_search: int = HNSW_EF_SEARCH,
+            flush_interval: float = 0.0,
+            flush_every: int = FLUSH_PENDING_ADDS,
+            cache_size: int = QUERY_CACHE_SIZE,
+            cache_ttl: float = QUERY_CACHE_TTL_SECONDS,
+            storage_dtype: str = "fp32",
+            use_precomputed_table: int = 0,
+            device: str = "cpu",
+            search_threads: Optional[int] = None,
+        ):
+            # Index layout, quantization and OpenMP options only apply to the FAISS backend
+            if index_type not in INDEX_TYPES:
+                raise ValueError(f"Unknown index_type {index_type!r}; expected one of {INDEX_TYPES}")
+            if storage_dtype not in STORAGE_DTYPES:
+                raise ValueError(f"Unknown storage_dtype {storage_dtype!r}; expected one of {tuple(STORAGE_DTYPES)}")
+            if device not in DEVICES:
+                raise ValueError(f"Unknown device {device!r}; expected one of {DEVICES}")
             self.dim = dim
             self.path = path
+            self.read_only = read_only
+            # Writes are saved immediately when flush_interval is 0; otherwise the
+            # store is marked dirty and saved by the debounce policy or flush()
+            self.flush_interval = flush_interval
+            self.flush_every = flush_every
+            self._dirty = False
+            self._pending_adds = 0
+            self._last_flush = time.monotonic()
+            # Repeat queries are answered from an LRU+TTL cache; _epoch is bumped
+            # on every write so cached results never outlive the data they came from
+            self._query_cache = QueryCache(cache_size, cache_ttl) if cache_size > 0 else None
+            self._epoch = 0
             self.texts: List[str] = []
             self.metadata: List[Dict] = []
+            # Vectors are kept in storage_dtype; int8 codes are (x - zero_point) / scale
+            # with one scale for all dimensions, so int8 distances rank like float ones
+            self.storage_dtype = storage_dtype
+            self._dtype = STORAGE_DTYPES[storage_dtype]
+            self._scale: Optional[float] = None
+            self._zero_point: Optional[np.ndarray] = None
+            # Per-dimension value range the int8 codes cover; widened (and the
+            # stored codes re-encoded) whenever an add falls outside it
+            self._lo: Optional[np.ndarray] = None
+            self._hi: Optional[np.ndarray] = None
+            # Embeddings and their cached squared row norms (for the L2 expansion)
+            # live in growth buffers whose first _n rows are in use
             self.embeddings: Optional[np.ndarray] = None
             Path(self.path).parent.mkdir(parents=True, exist_ok=True)
             self._load()
 
+        @property
+        def embeddings(self) -> Optional[np.ndarray]:
+            """Stored vectors: a zero-copy view of the used rows of the growth buffer."""
+            return None if self._buf is None else self._buf[:self._n]
+
+        @embeddings.setter
+        def embeddings(self, value: Optional[np.ndarray]) -> None:
+            self._buf = value
+            self._n = 0 if value is None else value.shape[0]
+            self._sqnorms = None
+            if value is None:
+                self._scale = None
+                self._zero_point = None
+                self._lo = None
+                self._hi = None
+
+        def _append_embeddings(self, embeddings_float32: np.ndarray) -> None:
+            b = embeddings_float32.shape[0]
+            self._buf = _reserve(self._buf, self._n, b, (self.dim,), self._dtype)
+            if self._dtype is np.int8:
+                self._fit_range(embeddings_float32)
+            self._buf[self._n:self._n + b] = self._encode(embeddings_float32)
+            self._n += b
+
+        def _fit_range(self, x: np.ndarray) -> None:
+            """
+            Widen the int8 range to cover float32 rows ``x``, re-encoding stored codes if it changes.
+
+            A widened range is doubled around its centre, so a corpus that keeps
+            growing past its range is re-encoded O(log N) times rather than on
+            every add, and the rounding error of early rows stays bounded.
+            """
+            lo, hi = x.min(axis=0), x.max(axis=0)
+            if self._scale is not None and self._lo is None and self._n:
+                # Codes loaded from disk: recover the range they cover
+                self._lo = self._decode(self.embeddings.min(axis=0))
+                self._hi = self._decode(self.embeddings.max(axis=0))
+            if self._lo is not None:
+                if (lo >= self._lo).all() and (hi <= self._hi).all():
+                    return
+                lo, hi = np.minimum(lo, self._lo), np.maximum(hi, self._hi)
+                centre, span = (lo + hi) / 2, hi - lo
+                lo, hi = centre - span, centre + span
+            stored = self._decode(self.embeddings) if self._n else None
+            self._lo, self._hi = lo, hi
+            self._zero_point = ((lo + hi) / 2).astype(np.float32)
+            self._scale = float((hi - lo).max()) / 254 or 1.0
+            if stored is not None:
+                self._buf[:self._n] = self._encode(stored)
+
+        def _encode(self, x: np.ndarray) -> np.ndarray:
+            """Convert float32 rows to storage_dtype (values outside the int8 range are clipped)."""
+            if self._dtype is np.float32:
+                return x
+            if self._dtype is np.float16:
+                return x.astype(np.float16)
+            if self._scale is None:
+                self._fit_range(x)
+            return np.clip(np.rint((x - self._zero_point) / self._scale), -127, 127).astype(np.int8)
+
+        def _decode(self, rows: np.ndarray) -> np.ndarray:
+            """Convert stored rows back to float32."""
+            if rows.dtype == np.int8:
+                return rows.astype(np.float32) * self._scale + self._zero_point
+            return np.asarray(rows, dtype=np.float32)
+
         def _load(self):
             try:
-                texts_path = Path(f"{self.path}.texts")
-                if texts_path.exists():
-                    with open(texts_path, "rb") as f:
-                        self.texts = pickle.load(f)
-                metadata_path = Path(f"{self.path}.metadata")
-                if metadata_path.exists():
-                    with open(metadata_path, "rb") as f:
-                        self.metadata = pickle.load(f)
-                embeddings_path = Path(f"{self.path}.embeddings")
-                if embeddings_path.exists():
-                    self.embeddings = np.load(embeddings_path)
+                self._disk_version = _disk_version(self.path)
+                self.texts, self.metadata = _load_records(self.path)
+                embeddings_path = _embeddings_file(self.path)
+                if embeddings_path is not None:
+                    embeddings = np.load(embeddings_path, mmap_mode="r" if self.read_only or MMAP_EMBEDDINGS else None)
+                    self.embeddings = embeddings
+                    if embeddings.dtype == np.int8:
+                        quant = np.load(f"{self.path}.quant")
+                        self._scale, self._zero_point = float(quant[0]), quant[1:]
+                    if embeddings.dtype != self._dtype:
+                        # Saved with another storage_dtype; re-encode once
+                        decoded = self._decode(embeddings)
+                        self.embeddings = None
+                        self.embeddings = self._encode(decoded)
             except Exception as e:
                 logger.warning(f"Could not load existing store: {e}")
                 self.texts = []
                 self.metadata = []
                 self.embeddings = None
+            self._tombstones = _Tombstones(self.metadata)
 
-        def add(self, embeddings: np.ndarray, texts: List[str], metadata: Optional[List[Dict]] = None) -> None:
-            if embeddings.shape[1] != self.dim:
-                raise ValueError(f"Embedding dimension {embeddings.shape[1]} does not match store dimension {self.dim}")
-            embeddings_float32 = embeddings.astype("float32")
-            if self.embeddings is None:
-                self.embeddings = embeddings_float32
-            else:
-                self.embeddings = np.vstack([self.embeddings, embeddings_float32])
+        def add(self, embeddings: np.ndarray, texts: List[str], metadata: Optional[List[Dict]] = None, persist: bool = True) -> None:
+            self._check_writable()
+            # C-contiguous float32 so the BLAS products never copy
+            embeddings_float32 = _as_rows(embeddings, self.dim)
+            if self._dtype is np.float32:
+                b = embeddings_float32.shape[0]
+                n = self._n
+                self._get_sqnorms()
+                self._sqnorms = _reserve(self._sqnorms, n, b, ())
+                np.einsum("ij,ij->i", embeddings_float32, embeddings_float32, out=self._sqnorms[n:n + b])
+            self._append_embeddings(embeddings_float32)
             self.texts.extend(texts)
             if metadata:
                 self.metadata.extend(metadata)
             else:
                 self.metadata.extend([{} for _ in texts])
-            self._save()
+            self._tombstones.extend(len(texts))
+            self._note_write(len(texts), persist)
 
         def search(self, query_embedding: np.ndarray, k: int = 5) -> Tuple[List[str], List[float], List[int]]:
             if self.embeddings is None or len(self.texts) == 0:
                 return [], [], []
-            q = query_embedding.astype("float32").reshape(1, -1)
-            # L2 distances
-            dists = np.linalg.norm(self.embeddings - q, axis=1)
-            idxs = np.argsort(dists)[:k]
-            results_texts = [self.texts[int(i)] for i in idxs]
-            results_distances = [float(dists[int(i)]) for i in idxs]
+            q = _as_rows(query_embedding, self.dim)[0]
+            cache_key = self._cache_key(q, k)
+            if cache_key is not None:
+                cached = self._query_cache.get(cache_key)
+                if cached is not None:
+                    return tuple(list(part) for part in cached)
+            idxs, dists = self._nearest(q, k)
+            results_texts = _gather_texts(self.texts, idxs.tolist())
+            results_distances = [float(d) for d in dists]
             results_indices = [int(i) for i in idxs]
-            return results_texts, results_distances, results_indices
+            result = (results_texts, results_distances, results_indices)
+            if cache_key is not None:
+                self._query_cache.put(cache_key, tuple(list(part) for part in result))
+            return result
+
+        def _nearest(self, q: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+            """Indices and L2 distances of the k rows nearest to float32 query ``q``, nearest first."""
+            if self._dtype is np.float32:
+                # L2 distances via ||x||^2 - 2 x.q + ||q||^2: a single GEMV against
+                # cached row norms, with no (N, dim) temporary
+                sq = self.embeddings @ q
+                sq *= -2.0
+                sq += self._get_sqnorms()
+                sq += float(q @ q)
+            else:
+                # Coarse scan over the narrow stored type
+                sq = quantized_sqeuclidean_distances(self._encode(q[None, :])[0], self.embeddings)
+            if self._tombstones.count:
+                sq[self._tombstones.mask] = np.inf
+            k = min(k, sq.shape[0] - self._tombstones.count)
+            if k <= 0:
+                return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+            # Partial selection of the k nearest; only those are then rescored
+            # exactly (the expansion loses precision for near-duplicates) and sorted
+            idxs = np.argpartition(sq, k - 1)[:k]
+            exact = sqeuclidean_distances(q, self._decode(self.embeddings[idxs]))
+            order = np.argsort(exact)
+            return idxs[order], np.sqrt(np.maximum(exact[order], 0.0))
+
+        def _compact(self) -> None:
+            """Drop deleted rows (renumbers rows)."""
+            live = np.flatnonzero(~self._tombstones.mask)
+            if self.embeddings is not None:
+                sqnorms = self._get_sqnorms()[live] if self._dtype is np.float32 else None
+                # Rows stay in storage_dtype, so int8 scales carry over unchanged
+                self.embeddings = np.ascontiguousarray(self.embeddings[live])
+                # Surviving rows keep their cached norms instead of a full recompute
+                self._sqnorms = sqnorms
+            self.texts = _gather_texts(self.texts, live.tolist())
+            self.metadata = [self.metadata[i] for i in live.tolist()]
+            self._tombstones = _Tombstones(self.metadata)
+            logger.info(f"Compacted vector store to {len(live)} live vectors")
+
+        def _cache_key(self, query: np.ndarray, k: int) -> Optional[Tuple[int, int, int]]:
+            if self._query_cache is None:
+                return None
+            return QueryCache.make_key(query, k, self._epoch)
+
+        def _get_sqnorms(self) -> np.ndarray:
+            """Squared L2 norm of every stored row, computed once after a load."""
+            if self._n == 0:
+                return np.empty(0, dtype=np.float32)
+            if self._sqnorms is None or self._sqnorms.shape[0] < self._n:
+                self._sqnorms = np.einsum("ij,ij->i", self.embeddings, self.embeddings)
+            return self._sqnorms[:self._n]
 
         def search_with_metadata(self, query_embedding: np.ndarray, k: int = 5) -> List[Dict]:
             texts, distances, indices = self.search(query_embedding, k)
@@ -205,35 +1288,163 @@ else:
                 })
             return results
 
+        def batch_search(
+            self, query_embeddings: np.ndarray, k: int = 5
+        ) -> Tuple[List[List[str]], List[List[float]], List[List[int]]]:
+            """
+            Search several queries with a single matrix product.
+
+            Queries already in the query cache are answered without searching.
+
+            Args:
+                query_embeddings: (Q, dim) query matrix
+                k: Number of results per query
+
+            Returns:
+                Per-query texts, distances and indices
+            """
+            queries = _query_matrix(query_embeddings, self.dim)
+            if self.embeddings is None or len(self.texts) == 0:
+                return [[] for _ in queries], [[] for _ in queries], [[] for _ in queries]
+            return _batch_with_cache(self, queries, k, self._search_rows)
+
+        def concurrent_search(
+            self, query_embeddings: np.ndarray, k: int = 5
+        ) -> Tuple[List[List[str]], List[List[float]], List[List[int]]]:
+            """
+            Search several queries split across the search thread pool.
+
+            Each pool worker scores one slice of the batch.
+
+            Args:
+                query_embeddings: (Q, dim) query matrix or list of query vectors
+                k: Number of results per query
+
+            Returns:
+                Per-query texts, distances and indices
+            """
+            queries = _query_matrix(query_embeddings, self.dim)
+            if self.embeddings is None or len(self.texts) == 0:
+                return [[] for _ in queries], [[] for _ in queries], [[] for _ in queries]
+            return _batch_with_cache(self, queries, k, lambda rows, k: _pooled_rows(self._search_rows, rows, k))
+
+        def _search_rows(self, queries: np.ndarray, k: int) -> List[SearchHits]:
+            if self._dtype is not np.float32:
+                # Quantized matrices are scanned one query at a time
+                nearest = [self._nearest(q, k) for q in queries]
+                id_rows = [idxs.tolist() for idxs, _ in nearest]
+                dist_rows = [dists.tolist() for _, dists in nearest]
+                return list(zip(_gather_text_rows(self.texts, id_rows), dist_rows, id_rows))
+            # All query-to-vector L2 distances from a single GEMM
+            sq = queries @ self.embeddings.T
+            sq *= -2.0
+            sq += self._get_sqnorms()[None, :]
+            sq += np.einsum("ij,ij->i", queries, queries)[:, None]
+            if self._tombstones.count:
+                sq[:, self._tombstones.mask] = np.inf
+            k = min(k, sq.shape[1] - self._tombstones.count)
+            if k <= 0:
+                return [([], [], []) for _ in queries]
+            idxs = np.argpartition(sq, k - 1, axis=1)[:, :k]
+            # Rescore the winners exactly, as in search()
+            diff = self.embeddings[idxs] - queries[:, None, :]
+            top = np.einsum("qkd,qkd->qk", diff, diff)
+            order = np.argsort(top, axis=1)
+            idxs = np.take_along_axis(idxs, order, axis=1)
+            top = np.sqrt(np.maximum(np.take_along_axis(top, order, axis=1), 0.0))
+            id_rows = idxs.tolist()
+            return list(zip(_gather_text_rows(self.texts, id_rows), top.tolist(), id_rows))
+
+        def search_batch_with_metadata(self, query_embeddings: np.ndarray, k: int = 5) -> List[List[Dict]]:
+            """Search several queries with one matrix product; one result list per query row."""
+            _, distances, indices = self.batch_search(query_embeddings, k)
+            return [
+                [self._result(int(idx), float(dist)) for dist, idx in zip(row_d, row_i)]
+                for row_d, row_i in zip(distances, indices)
+            ]
+
+        def _result(self, idx: int, distance: float) -> Dict:
+            return {
+                "text": self.texts[idx],
+                "distance": distance,
+                "metadata": self.metadata[idx] if idx < len(self.metadata) else {},
+                "index": idx
+            }
+
+        def _check_writable(self) -> None:
+            if self.read_only:
+                raise RuntimeError(f"Vector store at {self.path} was opened read-only")
+
+        def changed_on_disk(self) -> bool:
+            """Whether another process has saved the store since it was loaded."""
+            return _disk_version(self.path) != self._disk_version
+
         def delete(self, index: int) -> None:
-            if index < len(self.metadata):
+            self._check_writable()
+            if index < len(self.metadata) and self._tombstones.mark(index):
                 self.metadata[index]["_deleted"] = True
-                self._save()
+                if self._tombstones.should_compact():
+                    self._compact()
+                self._note_write()
 
         def get_stats(self) -> Dict:
             return {
                 "total_vectors": 0 if self.embeddings is None else int(self.embeddings.shape[0]),
                 "embedding_dimension": self.dim,
                 "index_type": "numpy_fallback",
-                "path": self.path
+                "storage_dtype": self.storage_dtype,
+                "path": self.path,
+                "query_cache": self._query_cache.get_stats() if self._query_cache is not None else {"enabled": False},
             }
 
+        def _note_write(self, added: int = 0, persist: bool = True) -> None:
+            """Mark the store dirty and save it if the flush policy says so."""
+            self._dirty = True
+            self._epoch += 1
+            self._pending_adds += added
+            if persist and (
+                self.flush_interval <= 0
+                or self._pending_adds >= self.flush_every
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            ):
+                self._save()
+
+        def flush(self) -> None:
+            """Write pending changes to disk, if there are any."""
+            if self._dirty:
+                self.save()
+
+        def save(self) -> None:
+            """Write the store to disk, e.g. after adds made with persist=False."""
+            self._check_writable()
+            self._save()
+
+        def _save_arrays(self) -> None:
+            _save_records(self.path, self.texts, self.metadata)
+            if self._scale is not None and self._dtype is np.int8:
+                quant = np.concatenate([[self._scale], self._zero_point]).astype(np.float32)
+                _replace_file(f"{self.path}.quant", lambda f: np.save(f, quant))
+            if self.embeddings is not None:
+                # A file object keeps np.save from appending ".npy" to the name
+                _replace_file(f"{self.path}.embeddings", lambda f: np.save(f, self.embeddings))
+            self._disk_version = _disk_version(self.path)
+            self._dirty = False
+            self._pending_adds = 0
+            self._last_flush = time.monotonic()
+
         def _save(self) -> None:
             try:
-                with open(f"{self.path}.texts", "wb") as f:
-                    pickle.dump(self.texts, f)
-                with open(f"{self.path}.metadata", "wb") as f:
-                    pickle.dump(self.metadata, f)
-                if self.embeddings is not None:
-                    np.save(f"{self.path}.embeddings", self.embeddings)
+                self._save_arrays()
             except Exception as e:
                 logger.error(f"Error saving store: {e}")
 
         def clear(self) -> None:
+            self._check_writable()
             self.texts = []
             self.metadata = []
             self.embeddings = None
-            self._save()
+            self._tombstones = _Tombstones(self.metadata)
+            self._note_write()
 
         def __len__(self) -> int:
             return 0 if self.embeddings is None else int(self.embeddings.shape[0])
@@ -0,0 +1,95 @@
+"""LRU + TTL cache of vector search results keyed by query embedding."""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+# xxhash keys large float32 query vectors several times faster than blake2b
+try:
+    import xxhash  # type: ignore
+except ImportError:
+    xxhash = None
+
+QUERY_CACHE_SIZE = 2000
+QUERY_CACHE_TTL_SECONDS = 300.0
+
+
+class QueryCache:
+    """
+    Thread-safe LRU of search results that also expire after a TTL.
+
+    Keys include a caller-supplied epoch; stores bump it on every write so
+    stale entries are never matched again and simply age out of the LRU,
+    instead of the whole cache being cleared.
+    """
+
+    def __init__(self, max_size: int = QUERY_CACHE_SIZE, ttl_seconds: float = QUERY_CACHE_TTL_SECONDS):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum cached queries
+            ttl_seconds: Seconds a cached result stays valid
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @staticmethod
+    def make_key(query: np.ndarray, k: int, epoch: int) -> Tuple[int, int, int]:
+        """
+        Build the cache key for a search.
+
+        Args:
+            query: Query embedding (hashed as contiguous float32)
+            k: Number of results requested
+            epoch: Store write counter
+
+        Returns:
+            Hashable key
+        """
+        raw = np.ascontiguousarray(query, dtype=np.float32).tobytes()
+        if xxhash is not None:
+            digest = xxhash.xxh64(raw).intdigest()
+        else:
+            digest = int.from_bytes(hashlib.blake2b(raw, digest_size=8).digest(), "little")
+        return (digest, k, epoch)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for ``key``, or None if missing or expired."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Cache ``value`` under ``key``, evicting the least recently used entries."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def clear(self) -> None:
+        """Drop all cached results."""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict:
+        """Get size and hit/miss/eviction counters."""
+        with self._lock:
+            return {"entries": len(self._entries), **self._stats}